@@ -0,0 +1,98 @@
+"""Move project document blobs into project_documents
+
+Revision ID: 3b9d1f0a6c42
+Revises: 8f7e9d2c4b5a
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = '3b9d1f0a6c42'
+down_revision = '8f7e9d2c4b5a'
+branch_labels = None
+depends_on = None
+
+# Documents copied per batch. Each batch commits on its own, so an
+# interrupted run resumes where it stopped when the migration is re-run.
+BATCH_SIZE = 25
+
+def _copy_documents_in_batches(conn) -> None:
+    last_id = 0
+    while True:
+        ids = [row[0] for row in conn.execute(
+            sa.text(
+                "SELECT id FROM projects "
+                "WHERE id > :last_id AND document_data IS NOT NULL "
+                "ORDER BY id LIMIT :batch_size"
+            ),
+            {"last_id": last_id, "batch_size": BATCH_SIZE}
+        )]
+        if not ids:
+            break
+        
+        conn.execute(
+            sa.text(
+                "INSERT INTO project_documents "
+                "(project_id, data, size, content_type, sha256, created_at, updated_at) "
+                "SELECT id, document_data, octet_length(document_data), document_content_type, "
+                "encode(sha256(document_data), 'hex'), now(), now() "
+                "FROM projects WHERE id = ANY(:ids) "
+                "ON CONFLICT (project_id) DO NOTHING"
+            ),
+            {"ids": ids}
+        )
+        # Keep the metadata column in step with the stored bytes
+        conn.execute(
+            sa.text(
+                "UPDATE projects SET document_size = octet_length(document_data) "
+                "WHERE id = ANY(:ids) AND document_size IS NULL"
+            ),
+            {"ids": ids}
+        )
+        last_id = ids[-1]
+        print(f"Moved documents up to project {last_id}")
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing_tables = inspector.get_table_names()
+    
+    if 'project_documents' not in existing_tables:
+        op.create_table('project_documents',
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('data', sa.LargeBinary(), nullable=True),
+            sa.Column('size', sa.Integer(), nullable=False),
+            sa.Column('content_type', sa.String(), nullable=True),
+            sa.Column('sha256', sa.String(length=64), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('project_id')
+        )
+        op.create_index(op.f('ix_project_documents_sha256'), 'project_documents', ['sha256'], unique=False)
+    
+    existing_columns = [col['name'] for col in inspector.get_columns('projects')]
+    if 'document_data' in existing_columns:
+        with op.get_context().autocommit_block():
+            _copy_documents_in_batches(conn)
+        op.drop_column('projects', 'document_data')
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing_tables = inspector.get_table_names()
+    
+    existing_columns = [col['name'] for col in inspector.get_columns('projects')]
+    if 'document_data' not in existing_columns:
+        op.add_column('projects', sa.Column('document_data', sa.LargeBinary(), nullable=True))
+    
+    if 'project_documents' in existing_tables:
+        op.execute(
+            "UPDATE projects SET document_data = d.data "
+            "FROM project_documents d WHERE d.project_id = projects.id"
+        )
+        op.drop_index(op.f('ix_project_documents_sha256'), table_name='project_documents')
+        op.drop_table('project_documents')
@@ -0,0 +1,54 @@
+"""Track blob storage backend and content hash for project images
+
+Revision ID: 5d2a7c9e4f10
+Revises: 3b9d1f0a6c42
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = '5d2a7c9e4f10'
+down_revision = '3b9d1f0a6c42'
+branch_labels = None
+depends_on = None
+
+# Images hashed per batch; batches commit on their own so a re-run resumes
+BATCH_SIZE = 200
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('project_images')]
+    
+    if 'sha256' not in existing_columns:
+        op.add_column('project_images', sa.Column('sha256', sa.String(length=64), nullable=True))
+        op.create_index(op.f('ix_project_images_sha256'), 'project_images', ['sha256'], unique=False)
+    if 'storage' not in existing_columns:
+        op.add_column('project_images', sa.Column('storage', sa.String(), nullable=True, server_default='database'))
+    
+    # Locally stored images keep no bytes in the row
+    op.alter_column('project_images', 'image_data', existing_type=sa.LargeBinary(), nullable=True)
+    
+    with op.get_context().autocommit_block():
+        while True:
+            result = conn.execute(sa.text(
+                "UPDATE project_images SET sha256 = encode(sha256(image_data), 'hex') "
+                "WHERE id IN (SELECT id FROM project_images "
+                "WHERE sha256 IS NULL AND image_data IS NOT NULL LIMIT :batch_size)"
+            ), {"batch_size": BATCH_SIZE})
+            if result.rowcount == 0:
+                break
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('project_images')]
+    
+    if 'storage' in existing_columns:
+        op.drop_column('project_images', 'storage')
+    if 'sha256' in existing_columns:
+        op.drop_index(op.f('ix_project_images_sha256'), table_name='project_images')
+        op.drop_column('project_images', 'sha256')
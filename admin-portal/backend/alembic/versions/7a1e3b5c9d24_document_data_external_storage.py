@@ -0,0 +1,25 @@
+"""Store project_documents.data uncompressed out of line for ranged reads
+
+Revision ID: 7a1e3b5c9d24
+Revises: 5d2a7c9e4f10
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = '7a1e3b5c9d24'
+down_revision = '5d2a7c9e4f10'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # EXTERNAL keeps bytea out of line but uncompressed, so substring() only
+    # fetches the TOAST chunks it needs. PDFs and DOCX files are already
+    # compressed, so little space is lost. Applies to values written from now on.
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE project_documents ALTER COLUMN data SET STORAGE EXTERNAL")
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE project_documents ALTER COLUMN data SET STORAGE EXTENDED")
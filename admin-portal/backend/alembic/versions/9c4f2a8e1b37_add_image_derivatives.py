@@ -0,0 +1,50 @@
+"""Add derivative (resized copy) columns to project_images
+
+Revision ID: 9c4f2a8e1b37
+Revises: 7a1e3b5c9d24
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = '9c4f2a8e1b37'
+down_revision = '7a1e3b5c9d24'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('project_images')]
+    
+    if 'parent_id' not in existing_columns:
+        op.add_column('project_images', sa.Column('parent_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(
+            'fk_project_images_parent_id', 'project_images', 'project_images',
+            ['parent_id'], ['id'], ondelete='CASCADE'
+        )
+        op.create_index(op.f('ix_project_images_parent_id'), 'project_images', ['parent_id'], unique=False)
+    if 'width' not in existing_columns:
+        op.add_column('project_images', sa.Column('width', sa.Integer(), nullable=True))
+    if 'height' not in existing_columns:
+        op.add_column('project_images', sa.Column('height', sa.Integer(), nullable=True))
+    
+    # Existing images get derivatives from POST /api/utils/images/derivatives
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('project_images')]
+    
+    if 'parent_id' in existing_columns:
+        op.execute("DELETE FROM project_images WHERE parent_id IS NOT NULL")
+        op.drop_index(op.f('ix_project_images_parent_id'), table_name='project_images')
+        op.drop_constraint('fk_project_images_parent_id', 'project_images', type_='foreignkey')
+        op.drop_column('project_images', 'parent_id')
+    if 'height' in existing_columns:
+        op.drop_column('project_images', 'height')
+    if 'width' in existing_columns:
+        op.drop_column('project_images', 'width')
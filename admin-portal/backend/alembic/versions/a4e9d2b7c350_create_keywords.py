@@ -0,0 +1,58 @@
+"""Create keywords and project_keywords
+
+Revision ID: a4e9d2b7c350
+Revises: f3d7a1c8e265
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'a4e9d2b7c350'
+down_revision = 'f3d7a1c8e265'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    tables = inspector.get_table_names()
+    
+    if 'keywords' not in tables:
+        op.create_table(
+            'keywords',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('label', sa.String(length=100), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+    
+    if 'project_keywords' not in tables:
+        op.create_table(
+            'project_keywords',
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('keyword_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['keyword_id'], ['keywords.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('project_id', 'keyword_id')
+        )
+    
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('project_keywords')]
+    if 'ix_project_keywords_keyword_id' not in existing_indexes:
+        op.create_index(
+            'ix_project_keywords_keyword_id', 'project_keywords', ['keyword_id', 'project_id'], unique=False
+        )
+    
+    # Existing projects are split in the background: POST /api/utils/search/keywords/backfill
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    if 'project_keywords' in tables:
+        op.drop_table('project_keywords')
+    if 'keywords' in tables:
+        op.drop_table('keywords')
@@ -0,0 +1,35 @@
+"""Record which images have had derivatives generated
+
+Revision ID: a9c4e2f7b136
+Revises: f1b8d3e6a527
+Create Date: 2026-10-19 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'a9c4e2f7b136'
+down_revision = 'f1b8d3e6a527'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing_columns = [col['name'] for col in inspector.get_columns('project_images')]
+    
+    if 'derivatives_generated' not in existing_columns:
+        op.add_column('project_images', sa.Column('derivatives_generated', sa.Boolean(), nullable=False, server_default=sa.false()))
+    
+    # Derivative generation records an original's dimensions, so sized originals have been through it
+    op.execute("""
+        UPDATE project_images SET derivatives_generated = TRUE
+        WHERE parent_id IS NULL AND width IS NOT NULL AND NOT derivatives_generated
+    """)
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing_columns = [col['name'] for col in inspector.get_columns('project_images')]
+    if 'derivatives_generated' in existing_columns:
+        op.drop_column('project_images', 'derivatives_generated')
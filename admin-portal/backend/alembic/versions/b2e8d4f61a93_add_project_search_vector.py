@@ -0,0 +1,86 @@
+"""Add weighted full-text search vector to projects
+
+Revision ID: b2e8d4f61a93
+Revises: 9c4f2a8e1b37
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = 'b2e8d4f61a93'
+down_revision = '9c4f2a8e1b37'
+branch_labels = None
+depends_on = None
+
+# Projects backfilled per batch; batches commit on their own so a re-run resumes
+BATCH_SIZE = 500
+
+# Must match SEARCH_CONFIG in app/core/search.py of both backends
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}keywords, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce({row}abstract, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce({row}author_name, '')), 'D')"
+)
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    
+    inspector = inspect(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('projects')]
+    existing_indexes = [ix['name'] for ix in inspector.get_indexes('projects')]
+    
+    if 'search_vector' not in existing_columns:
+        op.add_column('projects', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION projects_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_EXPRESSION.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS projects_search_vector ON projects")
+    op.execute("""
+        CREATE TRIGGER projects_search_vector
+        BEFORE INSERT OR UPDATE OF title, keywords, abstract, author_name ON projects
+        FOR EACH ROW EXECUTE FUNCTION projects_search_vector_update()
+    """)
+    
+    with op.get_context().autocommit_block():
+        while True:
+            result = conn.execute(sa.text(
+                f"UPDATE projects SET search_vector = {SEARCH_VECTOR_EXPRESSION.format(row='')} "
+                "WHERE id IN (SELECT id FROM projects WHERE search_vector IS NULL LIMIT :batch_size)"
+            ), {"batch_size": BATCH_SIZE})
+            if result.rowcount == 0:
+                break
+    
+    if 'ix_projects_search_vector' not in existing_indexes:
+        op.create_index(
+            'ix_projects_search_vector', 'projects', ['search_vector'],
+            unique=False, postgresql_using='gin'
+        )
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    
+    inspector = inspect(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('projects')]
+    existing_indexes = [ix['name'] for ix in inspector.get_indexes('projects')]
+    
+    op.execute("DROP TRIGGER IF EXISTS projects_search_vector ON projects")
+    op.execute("DROP FUNCTION IF EXISTS projects_search_vector_update()")
+    if 'ix_projects_search_vector' in existing_indexes:
+        op.drop_index('ix_projects_search_vector', table_name='projects')
+    if 'search_vector' in existing_columns:
+        op.drop_column('projects', 'search_vector')
@@ -0,0 +1,37 @@
+"""Create catalogue_version for public result cache invalidation
+
+Revision ID: b6c1f8e3d472
+Revises: a4e9d2b7c350
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'b6c1f8e3d472'
+down_revision = 'a4e9d2b7c350'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    if 'catalogue_version' not in inspector.get_table_names():
+        op.create_table(
+            'catalogue_version',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.BigInteger(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    
+    if conn.execute(sa.text("SELECT COUNT(*) FROM catalogue_version WHERE id = 1")).scalar() == 0:
+        op.execute("INSERT INTO catalogue_version (id, version) VALUES (1, 0)")
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if 'catalogue_version' in inspector.get_table_names():
+        op.drop_table('catalogue_version')
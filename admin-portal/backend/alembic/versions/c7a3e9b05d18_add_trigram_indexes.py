@@ -0,0 +1,51 @@
+"""Add pg_trgm GIN indexes for title and name filters
+
+Revision ID: c7a3e9b05d18
+Revises: b2e8d4f61a93
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'c7a3e9b05d18'
+down_revision = 'b2e8d4f61a93'
+branch_labels = None
+depends_on = None
+
+# Columns searched with leading-wildcard ilike or fuzzy word similarity
+TRIGRAM_COLUMNS = ['title', 'author_name', 'supervisor', 'department']
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('projects')]
+    
+    # Built concurrently so a large catalogue stays writable meanwhile
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            index_name = f'ix_projects_{column}_trgm'
+            if index_name not in existing_indexes:
+                op.create_index(
+                    index_name, 'projects', [column],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True
+                )
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('projects')]
+    for column in TRIGRAM_COLUMNS:
+        index_name = f'ix_projects_{column}_trgm'
+        if index_name in existing_indexes:
+            op.drop_index(index_name, table_name='projects')
@@ -0,0 +1,44 @@
+"""Create project_events_daily for view/download time series
+
+Revision ID: c7d2a9f4e583
+Revises: b6c1f8e3d472
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'c7d2a9f4e583'
+down_revision = 'b6c1f8e3d472'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    if 'project_events_daily' not in inspector.get_table_names():
+        op.create_table(
+            'project_events_daily',
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('views', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('downloads', sa.Integer(), server_default='0', nullable=False),
+            sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('project_id', 'date')
+        )
+    
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('project_events_daily')]
+    if 'ix_project_events_daily_date' not in existing_indexes:
+        op.create_index(
+            'ix_project_events_daily_date', 'project_events_daily', ['date', 'project_id'], unique=False
+        )
+    
+    # Lifetime totals on projects predate the table and are not back-dated into it
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if 'project_events_daily' in inspector.get_table_names():
+        op.drop_table('project_events_daily')
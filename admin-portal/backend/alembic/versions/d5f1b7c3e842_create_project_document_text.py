@@ -0,0 +1,49 @@
+"""Create project_document_text for full-text search of documents
+
+Revision ID: d5f1b7c3e842
+Revises: c7a3e9b05d18
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = 'd5f1b7c3e842'
+down_revision = 'c7a3e9b05d18'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    if 'project_document_text' not in inspector.get_table_names():
+        search_vector_type = postgresql.TSVECTOR() if conn.dialect.name == 'postgresql' else sa.Text()
+        op.create_table(
+            'project_document_text',
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('page_number', sa.Integer(), nullable=False),
+            sa.Column('document_sha256', sa.String(length=64), nullable=False),
+            sa.Column('text_compressed', sa.LargeBinary(), nullable=False),
+            sa.Column('search_vector', search_vector_type, nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['project_id'], ['project_documents.project_id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('project_id', 'page_number')
+        )
+    
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('project_document_text')]
+    if 'ix_project_document_text_search_vector' not in existing_indexes:
+        op.create_index(
+            'ix_project_document_text_search_vector', 'project_document_text', ['search_vector'],
+            unique=False, postgresql_using='gin'
+        )
+    
+    # Text is extracted in the background: POST /api/utils/search/reindex-documents
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if 'project_document_text' in inspector.get_table_names():
+        op.drop_table('project_document_text')
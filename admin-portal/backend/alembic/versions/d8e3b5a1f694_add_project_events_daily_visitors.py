@@ -0,0 +1,33 @@
+"""Add unique-visitor sketches to project_events_daily
+
+Revision ID: d8e3b5a1f694
+Revises: c7d2a9f4e583
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'd8e3b5a1f694'
+down_revision = 'c7d2a9f4e583'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing_columns = [col['name'] for col in inspector.get_columns('project_events_daily')]
+    
+    if 'visitors' not in existing_columns:
+        op.add_column('project_events_daily', sa.Column('visitors', sa.Integer(), server_default='0', nullable=False))
+    if 'visitors_hll' not in existing_columns:
+        op.add_column('project_events_daily', sa.Column('visitors_hll', sa.LargeBinary(), nullable=True))
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing_columns = [col['name'] for col in inspector.get_columns('project_events_daily')]
+    if 'visitors_hll' in existing_columns:
+        op.drop_column('project_events_daily', 'visitors_hll')
+    if 'visitors' in existing_columns:
+        op.drop_column('project_events_daily', 'visitors')
@@ -0,0 +1,38 @@
+"""Create dashboard_snapshot for precomputed admin dashboard totals
+
+Revision ID: e4a7c2d9b815
+Revises: d8e3b5a1f694
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'e4a7c2d9b815'
+down_revision = 'd8e3b5a1f694'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    if 'dashboard_snapshot' not in inspector.get_table_names():
+        op.create_table(
+            'dashboard_snapshot',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('stats', sa.JSON(), nullable=True),
+            sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    
+    # Filled by the admin portal's background refresh on its next start
+    if conn.execute(sa.text("SELECT COUNT(*) FROM dashboard_snapshot WHERE id = 1")).scalar() == 0:
+        op.execute("INSERT INTO dashboard_snapshot (id) VALUES (1)")
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if 'dashboard_snapshot' in inspector.get_table_names():
+        op.drop_table('dashboard_snapshot')
@@ -0,0 +1,36 @@
+"""Index projects on (created_at, id) for keyset pagination
+
+Revision ID: e8b2c6f4a019
+Revises: d5f1b7c3e842
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'e8b2c6f4a019'
+down_revision = 'd5f1b7c3e842'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_projects_created_at_id'
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('projects')]
+    if INDEX_NAME in existing_indexes:
+        return
+    
+    if conn.dialect.name == 'postgresql':
+        # Built concurrently so a large catalogue stays writable meanwhile
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, 'projects', ['created_at', 'id'], unique=False, postgresql_concurrently=True)
+    else:
+        op.create_index(INDEX_NAME, 'projects', ['created_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('projects')]
+    if INDEX_NAME in existing_indexes:
+        op.drop_index(INDEX_NAME, table_name='projects')
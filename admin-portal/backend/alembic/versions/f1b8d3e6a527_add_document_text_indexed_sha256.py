@@ -0,0 +1,38 @@
+"""Record which document version has had its text indexed
+
+Revision ID: f1b8d3e6a527
+Revises: e4a7c2d9b815
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'f1b8d3e6a527'
+down_revision = 'e4a7c2d9b815'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing_columns = [col['name'] for col in inspector.get_columns('project_documents')]
+    
+    if 'text_indexed_sha256' not in existing_columns:
+        op.add_column('project_documents', sa.Column('text_indexed_sha256', sa.String(length=64), nullable=True))
+    
+    # Documents whose stored text matches their current version are already indexed
+    op.execute("""
+        UPDATE project_documents SET text_indexed_sha256 = sha256
+        WHERE text_indexed_sha256 IS NULL AND EXISTS (
+            SELECT 1 FROM project_document_text t
+            WHERE t.project_id = project_documents.project_id AND t.document_sha256 = project_documents.sha256
+        )
+    """)
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    existing_columns = [col['name'] for col in inspector.get_columns('project_documents')]
+    if 'text_indexed_sha256' in existing_columns:
+        op.drop_column('project_documents', 'text_indexed_sha256')
@@ -0,0 +1,46 @@
+"""Create project_similar for related-project recommendations
+
+Revision ID: f3d7a1c8e265
+Revises: e8b2c6f4a019
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+# revision identifiers
+revision = 'f3d7a1c8e265'
+down_revision = 'e8b2c6f4a019'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    if 'project_similar' not in inspector.get_table_names():
+        op.create_table(
+            'project_similar',
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('rank', sa.Integer(), nullable=False),
+            sa.Column('similar_project_id', sa.Integer(), nullable=False),
+            sa.Column('score', sa.Float(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['similar_project_id'], ['projects.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('project_id', 'rank')
+        )
+    
+    existing_indexes = [ix['name'] for ix in inspect(conn).get_indexes('project_similar')]
+    if 'ix_project_similar_similar_project_id' not in existing_indexes:
+        op.create_index(
+            'ix_project_similar_similar_project_id', 'project_similar', ['similar_project_id'], unique=False
+        )
+    
+    # Neighbours are computed in the background: POST /api/utils/search/related/rebuild
+
+def downgrade() -> None:
+    inspector = inspect(op.get_bind())
+    if 'project_similar' in inspector.get_table_names():
+        op.drop_table('project_similar')
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from ..database import get_db
 from ..models.user import User
 from ..models.project import Project
 from ..core.auth import get_current_active_user
+from ..services.dashboard_snapshot import load_dashboard_stats
+from ..services.analytics import (
+    MAX_SERIES_DAYS, event_rollups, project_time_series, research_area_time_series, visitor_rollups
+)
 
 router = APIRouter()
 
@@ -14,48 +17,21 @@ async def get_dashboard_stats(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    # Get basic counts
-    total_projects = db.query(Project).count()
-    published_projects = db.query(Project).filter(Project.is_published == True).count()
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    
-    # Get total downloads and views
-    total_downloads = db.query(func.sum(Project.download_count)).scalar() or 0
-    total_views = db.query(func.sum(Project.view_count)).scalar() or 0
-    
-    # Get recent projects
-    recent_projects = db.query(Project).order_by(Project.created_at.desc()).limit(5).all()
-    
-    # Get projects by research area
-    research_areas = db.query(
-        Project.research_area,
-        func.count(Project.id).label('count')
-    ).filter(
-        Project.research_area.isnot(None)
-    ).group_by(Project.research_area).all()
+    # One primary-key read of the snapshot; see services/dashboard_snapshot.py
+    stats, refreshed_at = load_dashboard_stats(db)
     
     return {
-        "total_projects": total_projects,
-        "published_projects": published_projects,
-        "draft_projects": total_projects - published_projects,
-        "total_users": total_users,
-        "active_users": active_users,
-        "inactive_users": total_users - active_users,
-        "total_downloads": total_downloads,
-        "total_views": total_views,
-        "recent_projects": [
-            {
-                "id": p.id,
-                "title": p.title,
-                "author_name": p.author_name,
-                "created_at": p.created_at,
-                "is_published": p.is_published
-            } for p in recent_projects
-        ],
-        "research_areas": [
-            {"name": area, "count": count} for area, count in research_areas
-        ]
+        "total_projects": stats["total_projects"],
+        "published_projects": stats["published_projects"],
+        "draft_projects": stats["total_projects"] - stats["published_projects"],
+        "total_users": stats["total_users"],
+        "active_users": stats["active_users"],
+        "inactive_users": stats["total_users"] - stats["active_users"],
+        "total_downloads": stats["total_downloads"],
+        "total_views": stats["total_views"],
+        "recent_projects": stats["recent_projects"],
+        "research_areas": stats["research_areas"],
+        "refreshed_at": refreshed_at
     }
 
 @router.get("/activity")
@@ -88,4 +64,59 @@ async def get_recent_activity(
                 "type": "user"
             } for u in recent_users
         ]
-    }
\ No newline at end of file
+    }
+
+def _check_series_days(days: int) -> None:
+    if not 1 <= days <= MAX_SERIES_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"days must be between 1 and {MAX_SERIES_DAYS}"
+        )
+
+@router.get("/analytics/rollups")
+async def get_event_rollups(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Site-wide views and downloads over the last 7, 30 and 365 days"""
+    return event_rollups(db)
+
+@router.get("/analytics/projects/{project_id}")
+async def get_project_analytics(
+    project_id: int,
+    days: int = 30,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Daily views, downloads and unique viewers of one project, with its rollups and lifetime totals"""
+    _check_series_days(days)
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Check permissions
+    if current_user.role != "main_coordinator" and project.created_by_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return {
+        "project_id": project.id,
+        "title": project.title,
+        "total_views": project.view_count or 0,
+        "total_downloads": project.download_count or 0,
+        "rollups": event_rollups(db, project_id=project.id),
+        "unique_visitors": visitor_rollups(db, project.id),
+        "series": project_time_series(db, project.id, days)
+    }
+
+@router.get("/analytics/research-areas")
+async def get_research_area_analytics(
+    days: int = 30,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Daily views and downloads per research area"""
+    _check_series_days(days)
+    return {
+        "days": days,
+        "research_areas": research_area_time_series(db, days)
+    }
@@ -1,25 +1,35 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form, Response, BackgroundTasks
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import and_
 import io
 from datetime import datetime
 import csv
 
 from ..database import get_db
 from ..models.user import User
-from ..models.project import Project, ProjectImage
+from ..models.project import Project, ProjectImage, ProjectDocument, Keyword, ProjectKeyword
 from ..schemas.project import (
     ProjectCreate, ProjectUpdate, ProjectResponse, ProjectImageResponse,
     ImageUploadResponse, SetFeaturedImageRequest, ReorderImagesRequest
 )
 from ..core.auth import get_current_active_user
 from ..core.config import settings
+from ..core.cache import blob_cache, image_cache_key, invalidate_project
+from ..core.counters import counter_buffer
+from ..core.pagination import count_rows, paginate
+from ..core.search import SEARCH_SCOPES, apply_fulltext_search, apply_text_search, attach_page_hits, fuzzy_match, use_fuzzy_threshold
+from ..core.http_cache import accepts_media_type, is_not_modified, make_etag, not_modified_response, validator_headers
 from ..core.constants import RESEARCH_AREAS, DEGREE_TYPES, ACADEMIC_YEARS, INSTITUTIONS
 from ..services.database_storage import database_storage
+from ..services.blob_store import local_blob_store
 from ..services.database_image_service import DatabaseImageService
 from ..services.document_image_extractor import DocumentImageExtractor
+from ..services.document_text import index_document_text_background
+from ..services.related_projects import update_related_projects_background
+from ..services.keywords import normalize_keyword, sync_project_keywords
+from ..services.dashboard_snapshot import load_dashboard_stats, project_aggregates
 
 router = APIRouter()
 
@@ -34,21 +44,126 @@ def create_slug(title: str) -> str:
     slug = re.sub(r'[-\s]+', '-', slug)
     return slug.strip('-')
 
+def document_response(db: Session, request: Request, project: Project, disposition: str, default_content_type: str):
+    """
+    Serve a project's document from whichever storage backend holds it
+    
+    A matching If-None-Match / If-Modified-Since gets a 304 answered from the
+    metadata row, without reading the document bytes.
+    """
+    document = db.query(ProjectDocument).filter(ProjectDocument.project_id == project.id).first()
+    if not document:
+        return None
+    
+    content_type = document.content_type or default_content_type
+    etag = make_etag(document.sha256)
+    last_modified = document.updated_at or document.created_at
+    headers = {
+        "Content-Disposition": f"{disposition}; filename=\"{project.document_filename}\"",
+        "Cache-Control": "private, no-cache",
+        **validator_headers(etag, last_modified)
+    }
+    
+    # Locally stored blobs are sent straight from disk
+    path = database_storage.get_document_path(project, document)
+    if path is not None and not path.is_file():
+        return None
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
+    if path is not None:
+        return FileResponse(path, media_type=content_type, headers=headers)
+    
+    # Checked before Content-Length goes out, so missing bytes are a 404, not a short body
+    if document.size is None or not database_storage.has_document_data(db, project.id, document.sha256):
+        return None
+    headers["Content-Length"] = str(document.size)
+    return StreamingResponse(
+        database_storage.iter_document_chunks(project.id, document.sha256, document.size),
+        media_type=content_type,
+        headers=headers
+    )
+
+# Encodings preferred over the stored JPEG/PNG, best first, when the client lists them
+NEGOTIATED_IMAGE_TYPES = ("image/avif", "image/webp")
+
+def select_image_variant(db: Session, image: ProjectImage, width: Optional[int], accept: Optional[str]) -> ProjectImage:
+    """
+    Pick the image variant to serve for a requested display width and Accept header
+    
+    The size is the narrowest one at least `width` wide, or the original's
+    when none is or no width was asked for. At that size AVIF or WebP is
+    preferred when the client lists it; otherwise the JPEG/PNG is served.
+    """
+    if image.parent_id is not None or not image.width:
+        return image
+    variants = db.query(ProjectImage).filter(ProjectImage.parent_id == image.id).all()
+    
+    target = image.width
+    if width and 0 < width < image.width:
+        wider = [v.width for v in variants if v.width and v.width >= width]
+        if wider:
+            target = min(wider)
+    candidates = [v for v in variants if v.width == target]
+    
+    for media_type in NEGOTIATED_IMAGE_TYPES:
+        if accepts_media_type(accept, media_type):
+            for variant in candidates:
+                if variant.content_type == media_type:
+                    return variant
+    for variant in candidates:
+        if variant.content_type not in NEGOTIATED_IMAGE_TYPES:
+            return variant
+    return image
+
+def image_response(db: Session, request: Request, image: ProjectImage):
+    """
+    Serve a project image from whichever storage backend holds it
+    
+    image is loaded without its bytes; a revalidation that matches the ETag or
+    Last-Modified is answered with 304 before the blob column is read.
+    """
+    media_type = image.content_type or "image/jpeg"
+    etag = make_etag(image.sha256)
+    headers = {
+        "Cache-Control": "public, max-age=86400",
+        "Content-Disposition": f'inline; filename="{image.filename}"',
+        # The same URL serves AVIF/WebP/JPEG/PNG depending on Accept
+        "Vary": "Accept",
+        **validator_headers(etag, image.created_at)
+    }
+    if is_not_modified(request, etag, image.created_at):
+        return not_modified_response(headers)
+    
+    if image.storage == "local":
+        path = local_blob_store.path_for(image.sha256)
+        if not path.is_file():
+            raise HTTPException(status_code=404, detail="Image not found")
+        return FileResponse(path, media_type=media_type, headers=headers)
+    
+    # Hot images are served from the in-process cache, keyed by content hash
+    cache_key = image_cache_key(image)
+    data = blob_cache.get(cache_key)
+    if data is None:
+        data = db.query(ProjectImage.image_data).filter(ProjectImage.id == image.id).scalar()
+        if data is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+        blob_cache.set(cache_key, data)
+    return Response(content=data, media_type=media_type, headers=headers)
+
 # Background task for image extraction
 async def extract_images_background(
-    document_data: bytes,
-    document_filename: str,
+    file_result: dict,
     project_id: int,
     extract_tables: bool = True
 ):
-    """Extract images in the background after project creation"""
+    """Extract images in the background from an upload's spool file, then release it"""
     from ..database import SessionLocal
     db = SessionLocal()
     try:
         print(f"🔄 Starting background image extraction for project {project_id}")
         extracted_count = await document_extractor.extract_images_from_document(
-            document_data,
-            document_filename,
+            file_result["path"],
+            file_result["filename"],
             project_id,
             db,
             extract_tables=extract_tables
@@ -58,31 +173,34 @@ async def extract_images_background(
         print(f"❌ Background image extraction failed for project {project_id}: {e}")
     finally:
         db.close()
+        database_storage.discard_spool(file_result)
 
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     search: Optional[str] = None,
     research_area: Optional[str] = None,
     degree_type: Optional[str] = None,
     is_published: Optional[bool] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all projects with filters"""
+    """
+    Get all projects with filters
+    
+    Newest first, or by relevance when searching. Pass the X-Next-Cursor
+    response header back as cursor for the next page; skip still works
+    but gets slower the deeper it goes.
+    """
     query = db.query(Project)
+    rank = None
     
     # Apply filters
     if search:
-        query = query.filter(
-            or_(
-                Project.title.ilike(f"%{search}%"),
-                Project.abstract.ilike(f"%{search}%"),
-                Project.author_name.ilike(f"%{search}%"),
-                Project.keywords.ilike(f"%{search}%")
-            )
-        )
+        query, rank = apply_text_search(query, db, search)
     
     if research_area:
         query = query.filter(Project.research_area == research_area)
@@ -97,7 +215,12 @@ async def get_projects(
     if current_user.role != "main_coordinator":
         query = query.filter(Project.created_by_id == current_user.id)
     
-    projects = query.offset(skip).limit(limit).all()
+    if rank is not None:
+        projects, next_cursor = paginate(query, "relevance", rank, limit, skip, cursor)
+    else:
+        projects, next_cursor = paginate(query, "created", Project.created_at, limit, skip, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     # Add image URLs to response
     for project in projects:
@@ -186,25 +309,17 @@ async def create_project(
         counter += 1
     
     # Handle file upload
-    document_filename = None
-    document_size = None
-    document_data = None
-    document_content_type = None
-    document_storage = "database"
+    file_result = None
     
     if file and file.filename:
         try:
             # Process file for database storage
             file_result = await database_storage.upload_file(file)
             
-            document_filename = file_result["filename"]
-            document_size = file_result["size"]
-            document_data = file_result["data"]
-            document_content_type = file_result["content_type"]
-            document_storage = file_result["storage"]
-            
-            print(f"✅ File processed for database storage: {document_filename}")
+            print(f"✅ File processed for {file_result['storage']} storage: {file_result['filename']}")
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -228,33 +343,37 @@ async def create_project(
         meta_description=meta_description,
         meta_keywords=meta_keywords,
         is_published=is_published,
-        document_filename=document_filename,
-        document_size=document_size,
-        document_data=document_data,
-        document_content_type=document_content_type,
-        document_storage=document_storage,
         created_by_id=current_user.id,
         view_count=0,
         download_count=0
     )
     
+    if file_result:
+        database_storage.attach_to_project(db_project, file_result)
+    
     try:
         db.add(db_project)
+        db.flush()
+        sync_project_keywords(db, db_project)
         db.commit()
         db.refresh(db_project)
         print(f"✅ Project created successfully: {db_project.title}")
         
         # Schedule image extraction as background task if document was uploaded
-        if file and file.filename and document_data:
+        # (the task releases the spool file when it is done)
+        if file_result:
             background_tasks.add_task(
                 extract_images_background,
-                document_data,
-                document_filename,
+                file_result,
                 db_project.id,
                 extract_tables
             )
+            background_tasks.add_task(index_document_text_background, db_project.id)
             print(f"📋 Scheduled background image extraction for project {db_project.id}")
         
+        if db_project.is_published:
+            background_tasks.add_task(update_related_projects_background, [db_project.id])
+        
         # Add image URLs to response
         for img in db_project.image_records:
             img.image_url = f"/api/projects/{db_project.id}/images/{img.id}"
@@ -262,6 +381,8 @@ async def create_project(
         return db_project
     except Exception as e:
         db.rollback()
+        if file_result:
+            database_storage.discard_spool(file_result)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create project"
@@ -348,6 +469,7 @@ async def update_project(
         project.abstract = abstract
     if keywords is not None:
         project.keywords = keywords
+        sync_project_keywords(db, project)
     if academic_year is not None:
         project.academic_year = academic_year
     if department is not None:
@@ -367,39 +489,25 @@ async def update_project(
     
     # Handle file removal
     if remove_file:
-        project.document_filename = None
-        project.document_size = None
-        project.document_data = None
-        project.document_content_type = None
-        project.document_storage = "database"
+        database_storage.detach_from_project(project)
         print(f"🗑️  File removed from project: {project.title}")
     
     # Handle new file upload
+    file_result = None
     if file and file.filename:
         try:
             # Process new file for database storage
             file_result = await database_storage.upload_file(file)
             
-            project.document_filename = file_result["filename"]
-            project.document_size = file_result["size"]
-            project.document_data = file_result["data"]
-            project.document_content_type = file_result["content_type"]
-            project.document_storage = file_result["storage"]
+            database_storage.attach_to_project(project, file_result)
             
             print(f"✅ File updated for project: {project.title}")
-            
-            # Extract images if requested
-            if extract_images:
-                background_tasks.add_task(
-                    extract_images_background,
-                    file_result["data"],
-                    file_result["filename"],
-                    project.id,
-                    extract_tables
-                )
-                print(f"📋 Scheduled background image extraction for updated document")
                 
+        except HTTPException:
+            raise
         except Exception as e:
+            if file_result:
+                database_storage.discard_spool(file_result)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to process uploaded file: {str(e)}"
@@ -409,6 +517,25 @@ async def update_project(
         db.commit()
         db.refresh(project)
         
+        if file_result:
+            background_tasks.add_task(index_document_text_background, project.id)
+            
+            # Extract images if requested (the task releases the spool file)
+            if extract_images:
+                background_tasks.add_task(
+                    extract_images_background,
+                    file_result,
+                    project.id,
+                    extract_tables
+                )
+                print(f"📋 Scheduled background image extraction for updated document")
+            else:
+                database_storage.discard_spool(file_result)
+        
+        # Recommendations follow the text they are computed from
+        if project.is_published and (is_published or any(value is not None for value in (title, abstract, keywords))):
+            background_tasks.add_task(update_related_projects_background, [project.id])
+        
         # Add image URLs to response
         for img in project.image_records:
             img.image_url = f"/api/projects/{project.id}/images/{img.id}"
@@ -416,6 +543,8 @@ async def update_project(
         return project
     except Exception as e:
         db.rollback()
+        if file_result:
+            database_storage.discard_spool(file_result)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update project"
@@ -440,6 +569,7 @@ async def delete_project(
     try:
         db.delete(project)
         db.commit()
+        invalidate_project(project_id)
         return {"message": "Project deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -452,6 +582,7 @@ async def delete_project(
 @router.get("/{project_id}/download")
 async def download_project_file(
     project_id: int,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -464,24 +595,20 @@ async def download_project_file(
     if current_user.role != "main_coordinator" and project.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    if not project.document_data:
+    response = document_response(db, request, project, "attachment", "application/octet-stream")
+    if response is None:
         raise HTTPException(status_code=404, detail="No file available for download")
     
-    # Increment download counter
-    project.download_count = (project.download_count or 0) + 1
-    db.commit()
+    # Increment download counter (a 304 revalidation is not a new download)
+    if response.status_code != 304:
+        counter_buffer.add(project.id, downloads=1)
     
-    return StreamingResponse(
-        io.BytesIO(project.document_data),
-        media_type=project.document_content_type or "application/octet-stream",
-        headers={
-            "Content-Disposition": f"attachment; filename=\"{project.document_filename}\""
-        }
-    )
+    return response
 
 @router.get("/{project_id}/view")
 async def view_project_file(
     project_id: int,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -494,20 +621,15 @@ async def view_project_file(
     if current_user.role != "main_coordinator" and project.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    if not project.document_data:
+    response = document_response(db, request, project, "inline", "application/pdf")
+    if response is None:
         raise HTTPException(status_code=404, detail="No file available for viewing")
     
     # Increment view counter
-    project.view_count = (project.view_count or 0) + 1
-    db.commit()
+    if response.status_code != 304:
+        counter_buffer.add(project.id, views=1)
     
-    return StreamingResponse(
-        io.BytesIO(project.document_data),
-        media_type=project.document_content_type or "application/pdf",
-        headers={
-            "Content-Disposition": f"inline; filename=\"{project.document_filename}\""
-        }
-    )
+    return response
 
 @router.put("/{project_id}/document")
 async def update_project_document(
@@ -528,28 +650,27 @@ async def update_project_document(
     if current_user.role != "main_coordinator" and project.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    # Process new file
+    file_result = await database_storage.upload_file(file)
+    
     try:
-        # Process new file
-        file_result = await database_storage.upload_file(file)
+        database_storage.attach_to_project(project, file_result)
+        
+        db.commit()
+        db.refresh(project)
         
-        project.document_filename = file_result["filename"]
-        project.document_size = file_result["size"]
-        project.document_data = file_result["data"]
-        project.document_content_type = file_result["content_type"]
-        project.document_storage = file_result["storage"]
+        background_tasks.add_task(index_document_text_background, project.id)
         
         if extract_images:
-            # Extract images in background
+            # Extract images in background (the task releases the spool file)
             background_tasks.add_task(
                 extract_images_background,
-                file_result["data"],
-                file_result["filename"],
+                file_result,
                 project.id,
                 extract_tables
             )
-        
-        db.commit()
-        db.refresh(project)
+        else:
+            database_storage.discard_spool(file_result)
         
         return {
             "message": "Document updated successfully",
@@ -558,6 +679,7 @@ async def update_project_document(
         }
     except Exception as e:
         db.rollback()
+        database_storage.discard_spool(file_result)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update document: {str(e)}"
@@ -578,15 +700,11 @@ async def delete_project_file(
     if current_user.role != "main_coordinator" and project.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    if not project.document_data:
+    if not project.has_document:
         raise HTTPException(status_code=404, detail="No file to delete")
     
     # Clear file fields
-    project.document_filename = None
-    project.document_size = None
-    project.document_data = None
-    project.document_content_type = None
-    project.document_storage = "database"
+    database_storage.detach_from_project(project)
     
     try:
         db.commit()
@@ -603,9 +721,16 @@ async def delete_project_file(
 async def get_project_image(
     project_id: int,
     image_id: int,
+    request: Request,
+    w: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Serve image from database (public endpoint - no auth required)"""
+    """
+    Serve image from database (public endpoint - no auth required)
+    
+    ?w= selects a resized derivative: the narrowest one at least that wide.
+    AVIF/WebP encodings are served to clients that list them in Accept.
+    """
     image = db.query(ProjectImage).filter(
         ProjectImage.id == image_id,
         ProjectImage.project_id == project_id
@@ -614,14 +739,7 @@ async def get_project_image(
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    return Response(
-        content=image.image_data,
-        media_type=image.content_type or "image/jpeg",
-        headers={
-            "Cache-Control": "public, max-age=86400",
-            "Content-Disposition": f'inline; filename="{image.filename}"'
-        }
-    )
+    return image_response(db, request, select_image_variant(db, image, w, request.headers.get("accept")))
 
 @router.post("/{project_id}/images", response_model=ImageUploadResponse)
 async def upload_project_images(
@@ -640,7 +758,10 @@ async def upload_project_images(
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Check image limit
-    current_image_count = db.query(ProjectImage).filter(ProjectImage.project_id == project_id).count()
+    current_image_count = db.query(ProjectImage).filter(
+        ProjectImage.project_id == project_id,
+        ProjectImage.parent_id.is_(None)
+    ).count()
     if current_image_count + len(files) > 20:
         raise HTTPException(status_code=400, detail="Maximum 20 images allowed")
     
@@ -680,7 +801,8 @@ async def delete_project_image(
     # Get image
     image = db.query(ProjectImage).filter(
         ProjectImage.id == image_id,
-        ProjectImage.project_id == project_id
+        ProjectImage.project_id == project_id,
+        ProjectImage.parent_id.is_(None)
     ).first()
     
     if not image:
@@ -692,6 +814,7 @@ async def delete_project_image(
     # Reorder remaining images
     remaining_images = db.query(ProjectImage).filter(
         ProjectImage.project_id == project_id,
+        ProjectImage.parent_id.is_(None),
         ProjectImage.order_index > image.order_index
     ).all()
     
@@ -699,6 +822,7 @@ async def delete_project_image(
         img.order_index -= 1
     
     db.commit()
+    invalidate_project(project_id)
     return {"message": "Image deleted successfully"}
 
 @router.put("/{project_id}/featured-image")
@@ -731,6 +855,7 @@ async def set_featured_image(
     
     image.is_featured = True
     db.commit()
+    invalidate_project(project_id)
     
     return {"message": "Featured image updated"}
 
@@ -764,6 +889,7 @@ async def reorder_images(
         db.query(ProjectImage).filter(ProjectImage.id == image_id).update({"order_index": idx})
     
     db.commit()
+    invalidate_project(project_id)
     return {"message": "Images reordered successfully"}
 
 @router.post("/{project_id}/extract-images")
@@ -782,20 +908,24 @@ async def extract_images_from_project_document(
     if current_user.role != "main_coordinator" and project.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    if not project.document_data:
-        raise HTTPException(status_code=400, detail="No document uploaded")
-    
-    # Extract images and tables
-    extracted_count = await document_extractor.extract_images_from_document(
-        project.document_data,
-        project.document_filename,
-        project_id,
-        db,
-        extract_tables=extract_tables
-    )
+    with database_storage.document_file(db, project) as document_path:
+        if not document_path:
+            raise HTTPException(status_code=400, detail="No document uploaded")
+        
+        # Extract images and tables
+        extracted_count = await document_extractor.extract_images_from_document(
+            document_path,
+            project.document_filename,
+            project_id,
+            db,
+            extract_tables=extract_tables
+        )
     
     # Get breakdown of extracted items
-    all_images = db.query(ProjectImage).filter(ProjectImage.project_id == project_id).all()
+    all_images = db.query(ProjectImage).filter(
+        ProjectImage.project_id == project_id,
+        ProjectImage.parent_id.is_(None)
+    ).all()
     table_count = sum(1 for img in all_images if img.filename.startswith('table_'))
     figure_count = sum(1 for img in all_images if img.filename.startswith('figure_'))
     
@@ -811,6 +941,7 @@ async def extract_images_from_project_document(
 @router.patch("/{project_id}/toggle-publish")
 async def toggle_project_publish_status(
     project_id: int,
+    background_tasks: BackgroundTasks = BackgroundTasks(),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -828,6 +959,8 @@ async def toggle_project_publish_status(
     try:
         db.commit()
         db.refresh(project)
+        if project.is_published:
+            background_tasks.add_task(update_related_projects_background, [project.id])
         status_text = "published" if project.is_published else "unpublished"
         return {
             "message": f"Project {status_text} successfully",
@@ -860,14 +993,17 @@ async def get_project_stats(
     if current_user.role != "main_coordinator" and project.created_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    image_count = db.query(ProjectImage).filter(ProjectImage.project_id == project_id).count()
+    image_count = db.query(ProjectImage).filter(
+        ProjectImage.project_id == project_id,
+        ProjectImage.parent_id.is_(None)
+    ).count()
     
     return {
         "view_count": project.view_count or 0,
         "download_count": project.download_count or 0,
         "image_count": image_count,
         "document_size": project.document_size or 0,
-        "has_document": bool(project.document_data),
+        "has_document": project.has_document,
         "is_published": project.is_published
     }
 
@@ -877,45 +1013,27 @@ async def get_projects_summary(
     db: Session = Depends(get_db)
 ):
     """Get summary statistics for all projects"""
-    query = db.query(Project)
-    
-    # Filter by user if not main coordinator
-    if current_user.role != "main_coordinator":
-        query = query.filter(Project.created_by_id == current_user.id)
-    
-    total_projects = query.count()
-    published_projects = query.filter(Project.is_published == True).count()
-    unpublished_projects = query.filter(Project.is_published == False).count()
-    
-    # Get projects with documents
-    projects_with_docs = query.filter(Project.document_data != None).count()
-    
-    # Get total views and downloads
-    stats = query.with_entities(
-        func.sum(Project.view_count).label('total_views'),
-        func.sum(Project.download_count).label('total_downloads')
-    ).first()
-    
-    # Get total images count
-    image_query = db.query(func.count(ProjectImage.id))
-    if current_user.role != "main_coordinator":
-        image_query = image_query.join(Project).filter(Project.created_by_id == current_user.id)
-    total_images = image_query.scalar() or 0
+    # Site-wide totals come from the dashboard snapshot; a user's own in one aggregate query
+    if current_user.role == "main_coordinator":
+        stats, _ = load_dashboard_stats(db)
+    else:
+        stats = project_aggregates(db, created_by_id=current_user.id)
     
     return {
-        "total_projects": total_projects,
-        "published_projects": published_projects,
-        "unpublished_projects": unpublished_projects,
-        "projects_with_documents": projects_with_docs,
-        "total_views": stats.total_views or 0,
-        "total_downloads": stats.total_downloads or 0,
-        "total_images": total_images
+        "total_projects": stats["total_projects"],
+        "published_projects": stats["published_projects"],
+        "unpublished_projects": stats["total_projects"] - stats["published_projects"],
+        "projects_with_documents": stats["projects_with_documents"],
+        "total_views": stats["total_views"],
+        "total_downloads": stats["total_downloads"],
+        "total_images": stats["total_images"]
     }
 
 # Batch operations
 @router.post("/batch/publish")
 async def batch_publish_projects(
     project_ids: List[int],
+    background_tasks: BackgroundTasks = BackgroundTasks(),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -934,6 +1052,7 @@ async def batch_publish_projects(
     )
     
     db.commit()
+    background_tasks.add_task(update_related_projects_background, project_ids)
     
     return {
         "message": f"Published {updated} projects",
@@ -989,6 +1108,8 @@ async def batch_delete_projects(
         db.delete(project)
     
     db.commit()
+    for project_id in project_ids:
+        invalidate_project(project_id)
     
     return {
         "message": f"Deleted {deleted_count} projects",
@@ -998,6 +1119,8 @@ async def batch_delete_projects(
 # Search and filter endpoints
 @router.get("/search/advanced")
 async def advanced_search(
+    q: Optional[str] = None,
+    scope: str = "metadata",
     title: Optional[str] = None,
     author: Optional[str] = None,
     supervisor: Optional[str] = None,
@@ -1012,29 +1135,64 @@ async def advanced_search(
     is_published: Optional[bool] = None,
     created_after: Optional[datetime] = None,
     created_before: Optional[datetime] = None,
+    fuzzy: bool = False,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    count: str = "exact",
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Advanced search with multiple filters"""
+    """
+    Advanced search with multiple filters
+    
+    q is a free-text query (websearch syntax) over title, keywords, abstract
+    and author; matches are ordered by relevance. scope=fulltext also
+    searches document contents and reports matching pages in page_hits.
+    With fuzzy=true the title,
+    author, supervisor and department filters tolerate misspellings and
+    results are ordered by trigram similarity. Otherwise newest first.
+    
+    next_cursor fetches the following page via cursor (skip is kept for
+    old clients). count=estimate reports the planner's row estimate
+    instead of counting, count=none skips the total.
+    """
     query = db.query(Project)
+    rank = similarity = None
     
     # Apply user filter if not main coordinator
     if current_user.role != "main_coordinator":
         query = query.filter(Project.created_by_id == current_user.id)
     
+    if scope not in SEARCH_SCOPES:
+        raise HTTPException(status_code=400, detail=f"Invalid scope. Allowed: {', '.join(SEARCH_SCOPES)}")
+    fulltext = scope == "fulltext" and bool(q)
+    
     # Apply filters
-    if title:
-        query = query.filter(Project.title.ilike(f"%{title}%"))
-    if author:
-        query = query.filter(Project.author_name.ilike(f"%{author}%"))
-    if supervisor:
-        query = query.filter(Project.supervisor.ilike(f"%{supervisor}%"))
+    if fulltext:
+        query, rank = apply_fulltext_search(query, db, q)
+    elif q:
+        query, rank = apply_text_search(query, db, q)
+    # Name and title filters; substring matches use the trigram indexes too
+    name_filters = [
+        (Project.title, title),
+        (Project.author_name, author),
+        (Project.supervisor, supervisor),
+        (Project.department, department)
+    ]
+    if fuzzy:
+        use_fuzzy_threshold(db)
+        for column, term in name_filters:
+            if term:
+                criterion, score = fuzzy_match(db, column, term)
+                query = query.filter(criterion)
+                similarity = score if similarity is None else similarity + score
+    else:
+        for column, term in name_filters:
+            if term:
+                query = query.filter(column.ilike(f"%{term}%"))
     if institution:
         query = query.filter(Project.institution == institution)
-    if department:
-        query = query.filter(Project.department.ilike(f"%{department}%"))
     if research_area:
         query = query.filter(Project.research_area == research_area)
     if degree_type:
@@ -1042,12 +1200,19 @@ async def advanced_search(
     if academic_year:
         query = query.filter(Project.academic_year == academic_year)
     if keywords:
-        query = query.filter(Project.keywords.ilike(f"%{keywords}%"))
+        # Whole-keyword match through the project_keywords index
+        query = query.filter(
+            Project.id.in_(
+                db.query(ProjectKeyword.project_id).join(
+                    Keyword, Keyword.id == ProjectKeyword.keyword_id
+                ).filter(Keyword.name == normalize_keyword(keywords))
+            )
+        )
     if has_document is not None:
         if has_document:
-            query = query.filter(Project.document_data != None)
+            query = query.filter(Project.has_document)
         else:
-            query = query.filter(Project.document_data == None)
+            query = query.filter(~Project.has_document)
     if is_published is not None:
         query = query.filter(Project.is_published == is_published)
     if created_after:
@@ -1055,18 +1220,24 @@ async def advanced_search(
     if created_before:
         query = query.filter(Project.created_at <= created_before)
     
-    # Handle has_images filter
+    # Handle has_images filter (EXISTS rather than join + DISTINCT, which cannot order by rank)
     if has_images is not None:
         if has_images:
-            query = query.join(ProjectImage).distinct()
+            query = query.filter(Project.image_records.any())
         else:
-            query = query.outerjoin(ProjectImage).filter(ProjectImage.id == None)
+            query = query.filter(~Project.image_records.any())
     
     # Get total count before pagination
-    total_count = query.count()
+    total_count, total_is_estimate = count_rows(db, query, count)
     
     # Apply pagination
-    projects = query.offset(skip).limit(limit).all()
+    if similarity is not None:
+        rows, next_cursor = paginate(query, "similarity", similarity, limit, skip, cursor)
+    elif rank is not None:
+        rows, next_cursor = paginate(query, "relevance", rank, limit, skip, cursor)
+    else:
+        rows, next_cursor = paginate(query, "created", Project.created_at, limit, skip, cursor)
+    projects = attach_page_hits(rows) if fulltext else rows
     
     # Add image URLs to response
     for project in projects:
@@ -1075,8 +1246,10 @@ async def advanced_search(
     
     return {
         "total": total_count,
+        "total_is_estimate": total_is_estimate,
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         "projects": projects
     }
 
@@ -1110,7 +1283,8 @@ async def export_projects_csv(
     # Write data
     for project in projects:
         image_count = db.query(ProjectImage).filter(
-            ProjectImage.project_id == project.id
+            ProjectImage.project_id == project.id,
+            ProjectImage.parent_id.is_(None)
         ).count()
         
         writer.writerow([
@@ -1128,7 +1302,7 @@ async def export_projects_csv(
             project.created_at.strftime("%Y-%m-%d %H:%M:%S") if project.created_at else "",
             project.view_count or 0,
             project.download_count or 0,
-            "Yes" if project.document_data else "No",
+            "Yes" if project.has_document else "No",
             image_count
         ])
     
@@ -1175,4 +1349,4 @@ async def get_institutions(
 @router.get("/health")
 async def health_check():
     """Check if the projects API is working"""
-    return {"status": "healthy", "service": "projects", "storage": "database"}
+    return {"status": "healthy", "service": "projects", "storage": database_storage.backend}
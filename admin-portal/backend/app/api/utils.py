@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import Dict, List, Any
 from datetime import datetime
@@ -7,9 +7,17 @@ from ..database import get_db
 from ..core.constants import RESEARCH_AREAS, DEGREE_TYPES, ACADEMIC_YEARS, INSTITUTIONS
 from ..core.auth import get_current_active_user
 from ..core.config import settings
+from ..core.cache import blob_cache
+from ..core.counters import counter_buffer
 from ..models.user import User
 from ..models.project import Project
 from ..services.database_storage import database_storage
+from ..services.blob_migrator import migrate_database_blobs
+from ..services.image_derivatives import generate_missing_derivatives
+from ..services.document_text import reindex_all_documents
+from ..services.related_projects import rebuild_related_projects
+from ..services.keywords import backfill_project_keywords
+from ..services.dashboard_snapshot import load_dashboard_stats
 
 router = APIRouter()
 
@@ -65,18 +73,11 @@ async def get_system_info(
             detail="Not enough permissions"
         )
     
-    # Get database stats
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    total_projects = db.query(Project).count()
-    published_projects = db.query(Project).filter(Project.is_published == True).count()
-    projects_with_files = db.query(Project).filter(Project.document_data.isnot(None)).count()
-    
-    # Calculate total file storage used
-    from sqlalchemy import func
-    total_file_size = db.query(func.sum(Project.document_size)).filter(
-        Project.document_size.isnot(None)
-    ).scalar() or 0
+    # Get database stats from the dashboard snapshot
+    stats, refreshed_at = load_dashboard_stats(db)
+    total_projects = stats["total_projects"]
+    published_projects = stats["published_projects"]
+    total_file_size = stats["total_file_size"]
     
     return {
         "system": {
@@ -88,18 +89,19 @@ async def get_system_info(
             "allowed_file_types": settings.ALLOWED_FILE_TYPES
         },
         "database": {
-            "total_users": total_users,
-            "active_users": active_users,
+            "total_users": stats["total_users"],
+            "active_users": stats["active_users"],
             "total_projects": total_projects,
             "published_projects": published_projects,
             "unpublished_projects": total_projects - published_projects,
-            "projects_with_files": projects_with_files,
+            "projects_with_files": stats["projects_with_documents"],
             "total_file_size_bytes": total_file_size,
-            "total_file_size_mb": round(total_file_size / 1024 / 1024, 2)
+            "total_file_size_mb": round(total_file_size / 1024 / 1024, 2),
+            "refreshed_at": refreshed_at
         },
         "storage": {
             "backend": settings.STORAGE_BACKEND,
-            "type": "database",
+            "type": database_storage.backend,
             "status": "healthy"
         },
         "constants": {
@@ -127,7 +129,7 @@ async def test_storage(
         
         return {
             "status": "success",
-            "backend": "database",
+            "backend": database_storage.backend,
             "health_check": health_check,
             "message": "Database storage is working correctly"
         }
@@ -135,10 +137,121 @@ async def test_storage(
     except Exception as e:
         return {
             "status": "error",
-            "backend": "database",
+            "backend": database_storage.backend,
             "message": f"Database storage error: {str(e)}"
         }
 
+@router.post("/storage/migrate")
+async def migrate_storage(
+    background_tasks: BackgroundTasks,
+    batch_size: int = 20,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Move database-stored blobs into the local blob store in the background (admin only)"""
+    if current_user.role != "main_coordinator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if database_storage.backend != "local":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Blob migration requires STORAGE_BACKEND=local"
+        )
+    
+    background_tasks.add_task(migrate_database_blobs, batch_size)
+    return {
+        "message": "Blob migration scheduled",
+        "backend": database_storage.backend,
+        "batch_size": batch_size
+    }
+
+@router.get("/cache/metrics")
+async def get_cache_metrics(
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Hit/miss/eviction counters of this worker's image cache and counter buffer (admin only)"""
+    if current_user.role != "main_coordinator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return {"blob_cache": blob_cache.stats(), "counters": counter_buffer.stats()}
+
+@router.post("/images/derivatives")
+async def generate_image_derivatives(
+    background_tasks: BackgroundTasks,
+    batch_size: int = 20,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Generate resized derivatives for existing images in the background (admin only)"""
+    if current_user.role != "main_coordinator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    background_tasks.add_task(generate_missing_derivatives, batch_size)
+    return {
+        "message": "Image derivative generation scheduled",
+        "widths": settings.IMAGE_DERIVATIVE_WIDTHS,
+        "batch_size": batch_size
+    }
+
+@router.post("/search/reindex-documents")
+async def reindex_documents(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Extract and index document text for full-text search in the background (admin only)"""
+    if current_user.role != "main_coordinator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    background_tasks.add_task(reindex_all_documents)
+    return {"message": "Document text indexing scheduled"}
+
+@router.post("/search/related/rebuild")
+async def rebuild_related(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Recompute related-project recommendations from scratch in the background (admin only)"""
+    if current_user.role != "main_coordinator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    background_tasks.add_task(rebuild_related_projects)
+    return {
+        "message": "Related projects rebuild scheduled",
+        "k": settings.RELATED_PROJECTS_K
+    }
+
+@router.post("/search/keywords/backfill")
+async def backfill_keywords(
+    background_tasks: BackgroundTasks,
+    batch_size: int = 200,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Split existing projects' keywords into the keyword index in the background (admin only)"""
+    if current_user.role != "main_coordinator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    background_tasks.add_task(backfill_project_keywords, batch_size)
+    return {
+        "message": "Keyword backfill scheduled",
+        "batch_size": batch_size
+    }
+
 @router.post("/test-upload")
 async def test_file_upload(
     file: UploadFile = File(...),
@@ -154,6 +267,7 @@ async def test_file_upload(
     try:
         # Test file processing
         result = await database_storage.upload_file(file)
+        database_storage.discard_spool(result)
         
         return {
             "success": True,
@@ -259,7 +373,7 @@ async def get_file_stats(
     # Get file statistics from database
     from sqlalchemy import func
     
-    total_files = db.query(Project).filter(Project.document_data.isnot(None)).count()
+    total_files = db.query(Project).filter(Project.has_document).count()
     total_size = db.query(func.sum(Project.document_size)).filter(Project.document_size.isnot(None)).scalar() or 0
     
     # Get file type distribution
@@ -298,5 +412,5 @@ async def get_file_stats(
             for filename, size, title in largest_files
         ],
         "average_file_size_mb": round((total_size / total_files) / 1024 / 1024, 2) if total_files > 0 else 0,
-        "storage_backend": "database"
+        "storage_backend": database_storage.backend
     }
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .config import settings
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache of bytes values, bounded by their total size
+    
+    Entries expire after ttl_seconds. Values above max_entry_bytes are never
+    cached, so one large document cannot flush the hot images. Keys should
+    include the content hash, so replaced content is a miss rather than a
+    stale hit.
+    """
+    
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: bytes) -> bool:
+        """Cache a value; returns False when it is too large to be cached"""
+        size = len(value)
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+        return True
+    
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._size = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+    
+    def _remove(self, key: Hashable) -> None:
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+# Bytes of database-held images
+blob_cache = ByteLRUCache(
+    max_bytes=settings.BLOB_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.BLOB_CACHE_MAX_ENTRY_BYTES,
+    ttl_seconds=settings.BLOB_CACHE_TTL_SECONDS
+)
+
+def image_cache_key(image: Any) -> Tuple:
+    """(kind, project id, image id, variant id, content hash) for an image or one of its derivatives"""
+    return ("image", image.project_id, image.parent_id or image.id, image.id, image.sha256)
+
+def document_cache_key(document: Any) -> Tuple:
+    return ("document", document.project_id, document.sha256)
+
+def invalidate_project(project_id: int) -> int:
+    """Drop all cached bytes of a project's images and document"""
+    return blob_cache.invalidate_where(lambda key: key[1] == project_id)
@@ -0,0 +1,63 @@
+from itertools import chain
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..models.project import (
+    CatalogueVersion, Keyword, Project, ProjectDocument, ProjectDocumentText, ProjectImage, ProjectKeyword
+)
+
+# Rows that show up in public listings and search results
+CATALOGUE_MODELS = (Project, ProjectImage, ProjectDocument, ProjectDocumentText, Keyword, ProjectKeyword)
+
+# Project columns that change without the catalogue changing
+COUNTER_COLUMNS = frozenset({"view_count", "download_count", "updated_at"})
+
+def _edits_catalogue(obj) -> bool:
+    if not isinstance(obj, CATALOGUE_MODELS):
+        return False
+    if isinstance(obj, Project):
+        changed = {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+        return bool(changed - COUNTER_COLUMNS)
+    return True
+
+def _after_flush(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still describe the flushed changes here
+    if any(isinstance(obj, CATALOGUE_MODELS) for obj in chain(session.new, session.deleted)) or any(
+        _edits_catalogue(obj) for obj in session.dirty
+    ):
+        session.info["catalogue_changed"] = True
+
+def _do_orm_execute(state) -> None:
+    # Bulk query.update()/delete() (batch publish, batch delete) bypass flush
+    if (state.is_update or state.is_delete) and state.bind_mapper is not None:
+        if issubclass(state.bind_mapper.class_, CATALOGUE_MODELS):
+            state.session.info["catalogue_changed"] = True
+
+def _before_commit(session: Session) -> None:
+    session.flush()
+    if not session.info.pop("catalogue_changed", False):
+        return
+    result = session.execute(
+        update(CatalogueVersion).where(CatalogueVersion.id == 1).values(version=CatalogueVersion.version + 1),
+        execution_options={"synchronize_session": False}
+    )
+    if result.rowcount == 0:
+        session.add(CatalogueVersion(id=1, version=1))
+        session.flush()
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("catalogue_changed", None)
+
+def track_catalogue_changes(session_factory: sessionmaker) -> None:
+    """
+    Bump catalogue_version in every commit that changes public content
+    
+    The bump shares the transaction of the change, so a reader can never
+    see the new version with the old data. Counter-only updates to
+    projects do not count as changes.
+    """
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+    event.listen(session_factory, "before_commit", _before_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
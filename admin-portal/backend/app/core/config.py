@@ -31,7 +31,27 @@ class Settings(BaseSettings):
     ALLOWED_FILE_TYPES: List[str] = [".pdf", ".doc", ".docx", ".txt", ".rtf"]
     
     # Storage Backend
-    STORAGE_BACKEND: str = "database"  # Always database now
+    STORAGE_BACKEND: str = "database"  # "database" (bytea columns) or "local" (content-addressed files)
+    BLOB_STORE_PATH: str = "blobstore"  # Root of the local blob store, shared with the public site
+    
+    # In-process cache of hot image bytes
+    BLOB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64MB per worker
+    BLOB_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024  # Larger images are always read from the database
+    BLOB_CACHE_TTL_SECONDS: int = 3600
+    
+    # Image derivatives - resized copies generated at upload/extraction time
+    IMAGE_DERIVATIVE_WIDTHS: List[int] = [320, 640, 1280]
+    
+    # View/download increments are buffered per worker and written in batches
+    COUNTER_FLUSH_SECONDS: float = 5.0
+    COUNTER_MAX_PENDING: int = 1000  # Projects with pending increments that trigger an early flush
+    
+    # Admin dashboard totals are served from a snapshot row refreshed in the background
+    DASHBOARD_REFRESH_SECONDS: int = 300  # Scheduled refresh; also bounds staleness of view/download totals
+    DASHBOARD_REFRESH_DEBOUNCE_SECONDS: float = 2.0  # Writes within this window share one refresh
+    
+    # Related projects kept per published project
+    RELATED_PROJECTS_K: int = 10
     
     # Admin Portal
     PROJECT_NAME: str = "Literature Review Database - Admin Portal"
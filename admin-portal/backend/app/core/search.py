@@ -0,0 +1,154 @@
+import re
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import Float, cast, func, null, or_, text as sql_text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models.project import Project, ProjectDocumentText
+
+# Text search configuration; must match the one used by the projects_search_vector trigger
+SEARCH_CONFIG = "english"
+
+# Search scopes: project metadata only, or metadata plus document contents
+SEARCH_SCOPES = ("metadata", "fulltext")
+
+# Page numbers reported per project for a full-text match
+MAX_PAGE_HITS = 20
+
+# Minimum trigram word similarity (0-1) for a fuzzy name/title match
+FUZZY_THRESHOLD = 0.3
+
+def is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def apply_text_search(query: Query, db: Session, text: str) -> Tuple[Query, Optional[ColumnElement]]:
+    """
+    Filter a Project query by a free-text search
+    
+    On PostgreSQL the weighted search_vector is matched with
+    websearch_to_tsquery (quoted phrases, OR, -exclusions) through its GIN
+    index. Other databases (local SQLite) fall back to substring matching.
+    Returns the query and a relevance expression to order by (None without
+    PostgreSQL); ordering is left to the caller's pagination.
+    """
+    text = text.strip()
+    if not text:
+        return query, None
+    
+    if is_postgres(db):
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+        query = query.filter(Project.search_vector.op("@@")(ts_query))
+        return query, _as_double(func.ts_rank(Project.search_vector, ts_query))
+    
+    pattern = f"%{text}%"
+    return query.filter(
+        or_(
+            Project.title.ilike(pattern),
+            Project.abstract.ilike(pattern),
+            Project.author_name.ilike(pattern),
+            Project.keywords.ilike(pattern)
+        )
+    ), None
+
+def apply_fulltext_search(query: Query, db: Session, text: str) -> Tuple[Query, Optional[ColumnElement]]:
+    """
+    Filter a Project query by metadata or document contents (scope=fulltext)
+    
+    Rows come back as (Project, page_hits) tuples, page_hits being the
+    matching page numbers in page order (None for metadata-only matches).
+    The relevance expression is metadata rank plus best page rank. Other
+    databases fall back to the metadata search, without page hits.
+    """
+    text = text.strip()
+    if not text:
+        return query.add_columns(null()), None
+    if not is_postgres(db):
+        query, rank = apply_text_search(query, db, text)
+        return query.add_columns(null()), rank
+    
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    page_hits = db.query(
+        ProjectDocumentText.project_id.label("project_id"),
+        func.max(func.ts_rank(ProjectDocumentText.search_vector, ts_query)).label("rank"),
+        func.array_agg(
+            aggregate_order_by(ProjectDocumentText.page_number, ProjectDocumentText.page_number)
+        ).label("pages")
+    ).filter(
+        ProjectDocumentText.search_vector.op("@@")(ts_query)
+    ).group_by(ProjectDocumentText.project_id).subquery()
+    
+    metadata_match = Project.search_vector.op("@@")(ts_query)
+    rank = func.coalesce(func.ts_rank(Project.search_vector, ts_query), 0) + func.coalesce(page_hits.c.rank, 0)
+    query = query.outerjoin(
+        page_hits, page_hits.c.project_id == Project.id
+    ).filter(
+        or_(metadata_match, page_hits.c.project_id.isnot(None))
+    ).add_columns(page_hits.c.pages)
+    return query, _as_double(rank)
+
+def _as_double(rank: ColumnElement) -> ColumnElement:
+    # ts_rank is a float4; as a double its text form round-trips exactly, so
+    # a rank carried in a pagination cursor compares equal to the row's own
+    return cast(rank, Float(precision=53))
+
+def attach_page_hits(rows) -> List[Project]:
+    """Unpack (Project, page_hits) rows, setting project.page_hits for the response"""
+    projects = []
+    for project, pages in rows:
+        project.page_hits = list(pages or [])[:MAX_PAGE_HITS]
+        projects.append(project)
+    return projects
+
+def use_fuzzy_threshold(db: Session) -> None:
+    """Set the pg_trgm %> threshold for the current transaction (no-op elsewhere)"""
+    if is_postgres(db):
+        db.execute(
+            sql_text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(FUZZY_THRESHOLD)}
+        )
+
+def fuzzy_match(db: Session, column: ColumnElement, term: str) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    (criterion, score) for a typo-tolerant match of term inside column
+    
+    On PostgreSQL this is pg_trgm word similarity; the %> operator is served
+    by the column's gin_trgm_ops index (call use_fuzzy_threshold first). On
+    SQLite the same measure comes from the word_similarity function that
+    register_sqlite_functions installs.
+    """
+    score = _as_double(func.word_similarity(term, column))
+    if is_postgres(db):
+        return column.op("%>")(term), score
+    return score >= FUZZY_THRESHOLD, score
+
+def _trigrams(text: Optional[str]) -> Set[str]:
+    """Trigrams of each word, padded the way pg_trgm does it"""
+    grams = set()
+    for word in re.findall(r"\w+", (text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _word_similarity(needle: Optional[str], haystack: Optional[str]) -> float:
+    """
+    Approximation of pg_trgm word_similarity for SQLite
+    
+    The best trigram similarity between needle and any run of consecutive
+    words in haystack as long as the needle.
+    """
+    needle_grams = _trigrams(needle)
+    words = re.findall(r"\w+", (haystack or "").lower())
+    if not needle_grams or not words:
+        return 0.0
+    span = max(1, len(re.findall(r"\w+", needle.lower())))
+    best = 0.0
+    for start in range(max(1, len(words) - span + 1)):
+        grams = _trigrams(" ".join(words[start:start + span]))
+        best = max(best, len(needle_grams & grams) / len(needle_grams | grams))
+    return best
+
+def register_sqlite_functions(dbapi_connection, connection_record) -> None:
+    """Install word_similarity() on SQLite connections used for local development"""
+    dbapi_connection.create_function("word_similarity", 2, _word_similarity, deterministic=True)
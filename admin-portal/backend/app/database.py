@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .core.config import settings
@@ -10,7 +10,22 @@ engine = create_engine(
     pool_recycle=300,    # Recycle connections every 5 minutes
 )
 
+# SQLite (local development) gets a Python word_similarity() for fuzzy search
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        from .core.search import register_sqlite_functions
+        register_sqlite_functions(dbapi_connection, connection_record)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Commits that change public content bump catalogue_version for the public site's caches
+from .core.catalogue import track_catalogue_changes
+track_catalogue_changes(SessionLocal)
+
+# Commits that change projects, images or users refresh the dashboard snapshot
+from .services.dashboard_snapshot import track_dashboard_changes
+track_dashboard_changes(SessionLocal)
 Base = declarative_base()
 
 def get_db():
@@ -4,9 +4,12 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 import os
+import threading
 from pathlib import Path
 
 from .core.config import settings
+from .core.counters import counter_buffer
+from .services.dashboard_snapshot import dashboard_refresher
 from .database import engine
 from .models import Base
 from .api import auth, users, dashboard, projects, utils, profile
@@ -73,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers with /api prefix
@@ -117,7 +121,17 @@ async def startup_event():
     print(f"📦 Storage Backend: {settings.STORAGE_BACKEND}")
     print(f"📁 Max file size: {settings.MAX_FILE_SIZE / 1024 / 1024:.1f}MB")
     print(f"📄 Allowed file types: {', '.join(settings.ALLOWED_FILE_TYPES)}")
-    print(f"✅ Database Storage configured")
+    print(f"✅ Document storage configured ({settings.STORAGE_BACKEND})")
+    
+    # Move any remaining bytea blobs out of the database when serving from the local store
+    if settings.STORAGE_BACKEND == "local":
+        from .services.blob_migrator import migrate_database_blobs
+        threading.Thread(target=migrate_database_blobs, name="blob-migrator", daemon=True).start()
+        print(f"🔄 Background blob migration started")
+    
+    # Dashboard totals are served from a snapshot kept fresh in the background
+    dashboard_refresher.start()
+    print(f"🔄 Dashboard snapshot refresh every {settings.DASHBOARD_REFRESH_SECONDS}s")
     
     # Verify directories
     print(f"\n📁 Directory Status:")
@@ -141,6 +155,12 @@ async def startup_event():
             print(f"   {methods:8} {route.path}")
     print(f"{'='*60}\n")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write buffered view/download counts before the worker exits"""
+    flushed = counter_buffer.flush()
+    print(f"✅ Flushed view/download counters for {flushed} projects")
+
 # API root endpoint
 @app.get("/api")
 async def api_root():
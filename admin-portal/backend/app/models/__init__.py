@@ -1,5 +1,5 @@
 from .base import BaseModel, Base
 from .user import User
-from .project import Project, ProjectImage
+from .project import Project, ProjectImage, ProjectDocument, ProjectDocumentText, ProjectSimilar, Keyword, ProjectKeyword, CatalogueVersion, ProjectEventDaily, DashboardSnapshot
 
-__all__ = ['BaseModel', 'Base', 'User', 'Project', 'ProjectImage']
+__all__ = ['BaseModel', 'Base', 'User', 'Project', 'ProjectImage', 'ProjectDocument', 'ProjectDocumentText', 'ProjectSimilar', 'Keyword', 'ProjectKeyword', 'CatalogueVersion', 'ProjectEventDaily', 'DashboardSnapshot']
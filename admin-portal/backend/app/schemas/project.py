@@ -77,6 +77,8 @@ class ProjectResponse(ProjectBase):
     document_size: Optional[int] = None
     document_content_type: Optional[str] = None
     document_storage: Optional[str] = None
+    has_document: bool = False
+    page_hits: List[int] = []  # Matching document pages, filled for scope=fulltext searches
     
     # Metadata
     created_by_id: Optional[int] = None
@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.hll import HyperLogLog
+from ..models.project import Project, ProjectEventDaily
+
+# Trailing windows, in days, reported by the dashboard rollups
+ROLLUP_WINDOWS = (7, 30, 365)
+
+# Longest time series served, in days
+MAX_SERIES_DAYS = 365
+
+def window_start(days: int, today: Optional[date] = None) -> date:
+    """First UTC day of the trailing window of `days` days ending today"""
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=days - 1)
+
+def event_rollups(db: Session, project_id: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Views and downloads over each of ROLLUP_WINDOWS
+    
+    One scan of the longest window; the shorter ones are FILTERed sums
+    of the same rows.
+    """
+    today = datetime.now(timezone.utc).date()
+    columns = []
+    for days in ROLLUP_WINDOWS:
+        in_window = ProjectEventDaily.date >= window_start(days, today)
+        columns.append(func.coalesce(func.sum(ProjectEventDaily.views).filter(in_window), 0))
+        columns.append(func.coalesce(func.sum(ProjectEventDaily.downloads).filter(in_window), 0))
+    
+    query = db.query(*columns).filter(ProjectEventDaily.date >= window_start(max(ROLLUP_WINDOWS), today))
+    if project_id is not None:
+        query = query.filter(ProjectEventDaily.project_id == project_id)
+    row = query.one()
+    
+    return {
+        f"{days}d": {"views": int(row[2 * i]), "downloads": int(row[2 * i + 1])}
+        for i, days in enumerate(ROLLUP_WINDOWS)
+    }
+
+def visitor_rollups(db: Session, project_id: int) -> Dict[str, int]:
+    """
+    Estimated distinct viewers of a project over each of ROLLUP_WINDOWS
+    
+    Unique viewers do not add up across days, so the day sketches are
+    merged instead: a viewer seen on several days counts once.
+    """
+    today = datetime.now(timezone.utc).date()
+    rows = db.query(ProjectEventDaily.date, ProjectEventDaily.visitors_hll).filter(
+        ProjectEventDaily.project_id == project_id,
+        ProjectEventDaily.date >= window_start(max(ROLLUP_WINDOWS), today),
+        ProjectEventDaily.visitors_hll.isnot(None)
+    ).all()
+    
+    sketches = {f"{days}d": HyperLogLog() for days in ROLLUP_WINDOWS}
+    for day, data in rows:
+        sketch = HyperLogLog.from_bytes(data)
+        for days in ROLLUP_WINDOWS:
+            if day >= window_start(days, today):
+                sketches[f"{days}d"].merge(sketch)
+    return {window: sketch.count() for window, sketch in sketches.items()}
+
+def _zero_filled(
+    counts: Dict[date, Dict[str, int]], start: date, days: int, fields: Tuple[str, ...] = ("views", "downloads")
+) -> List[Dict[str, Any]]:
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        day_counts = counts.get(day, {})
+        series.append({"date": day.isoformat(), **{field: day_counts.get(field, 0) for field in fields}})
+    return series
+
+def project_time_series(db: Session, project_id: int, days: int) -> List[Dict[str, Any]]:
+    """Daily views, downloads and estimated unique viewers of one project over the last `days` days, zero-filled"""
+    start = window_start(days)
+    rows = db.query(
+        ProjectEventDaily.date, ProjectEventDaily.views, ProjectEventDaily.downloads, ProjectEventDaily.visitors
+    ).filter(
+        ProjectEventDaily.project_id == project_id,
+        ProjectEventDaily.date >= start
+    ).all()
+    counts = {
+        day: {"views": views, "downloads": downloads, "visitors": visitors}
+        for day, views, downloads, visitors in rows
+    }
+    return _zero_filled(counts, start, days, fields=("views", "downloads", "visitors"))
+
+def research_area_time_series(db: Session, days: int) -> List[Dict[str, Any]]:
+    """Daily views and downloads per research area over the last `days` days, busiest area first"""
+    start = window_start(days)
+    rows = db.query(
+        Project.research_area,
+        ProjectEventDaily.date,
+        func.sum(ProjectEventDaily.views),
+        func.sum(ProjectEventDaily.downloads)
+    ).join(
+        Project, Project.id == ProjectEventDaily.project_id
+    ).filter(
+        ProjectEventDaily.date >= start
+    ).group_by(Project.research_area, ProjectEventDaily.date).all()
+    
+    by_area: Dict[str, Dict[date, Dict[str, int]]] = {}
+    for area, day, views, downloads in rows:
+        counts = by_area.setdefault(area or "Unspecified", {}).setdefault(day, {"views": 0, "downloads": 0})
+        counts["views"] += int(views or 0)
+        counts["downloads"] += int(downloads or 0)
+    
+    areas = [
+        {
+            "research_area": area,
+            "views": sum(day_counts["views"] for day_counts in counts.values()),
+            "downloads": sum(day_counts["downloads"] for day_counts in counts.values()),
+            "series": _zero_filled(counts, start, days)
+        } for area, counts in by_area.items()
+    ]
+    areas.sort(key=lambda area: (-area["views"], area["research_area"]))
+    return areas
@@ -0,0 +1,85 @@
+import time
+from typing import Dict
+
+from sqlalchemy.orm import Session, undefer
+
+from ..models.project import Project, ProjectImage, ProjectDocument
+from .blob_store import local_blob_store
+
+def migrate_database_blobs(batch_size: int = 20) -> Dict[str, int]:
+    """
+    Move bytea document and image blobs into the local blob store
+    
+    Works in small committed batches with SKIP LOCKED, so it can run in the
+    background next to live traffic and from more than one worker at a time.
+    """
+    from ..database import SessionLocal
+    db = SessionLocal()
+    moved = {"documents": 0, "images": 0, "removed_blobs": 0}
+    try:
+        print("🔄 Moving database blobs to the local blob store")
+        while True:
+            documents = db.query(ProjectDocument).options(undefer(ProjectDocument.data)).filter(
+                ProjectDocument.data.isnot(None)
+            ).with_for_update(skip_locked=True).limit(batch_size).all()
+            if not documents:
+                break
+            
+            for document in documents:
+                document.sha256 = local_blob_store.put_bytes(document.data)
+                document.data = None
+                # Keep updated_at untouched - the document content did not change
+                db.query(Project).filter(Project.id == document.project_id).update(
+                    {"document_storage": "local", "updated_at": Project.updated_at},
+                    synchronize_session=False
+                )
+            db.commit()
+            moved["documents"] += len(documents)
+        
+        while True:
+            images = db.query(ProjectImage).options(undefer(ProjectImage.image_data)).filter(
+                ProjectImage.image_data.isnot(None)
+            ).with_for_update(skip_locked=True).limit(batch_size).all()
+            if not images:
+                break
+            
+            for image in images:
+                image.sha256 = local_blob_store.put_bytes(image.image_data)
+                image.image_data = None
+                image.storage = "local"
+            db.commit()
+            moved["images"] += len(images)
+        
+        moved["removed_blobs"] = collect_unreferenced_blobs(db)
+        print(f"✅ Blob migration completed: {moved}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Blob migration failed: {e}")
+    finally:
+        db.close()
+    
+    return moved
+
+def collect_unreferenced_blobs(db: Session, min_age_seconds: int = 3600) -> int:
+    """
+    Delete blob files no document or image refers to any more
+    
+    Files younger than min_age_seconds are kept, since their rows may not
+    be committed yet.
+    """
+    referenced = {
+        sha256 for (sha256,) in db.query(ProjectDocument.sha256).join(
+            Project, Project.id == ProjectDocument.project_id
+        ).filter(Project.document_storage == "local")
+    }
+    referenced.update(
+        sha256 for (sha256,) in db.query(ProjectImage.sha256).filter(ProjectImage.storage == "local")
+    )
+    
+    cutoff = time.time() - min_age_seconds
+    removed = 0
+    for path in local_blob_store.iter_blobs():
+        if path.name not in referenced and path.stat().st_mtime < cutoff:
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+from ..core.config import settings
+
+class LocalBlobStore:
+    """
+    Content-addressed blob store on the local filesystem
+    
+    Blobs are named by their sha256 and fanned out as ab/cd/<sha256>, so
+    identical uploads resolve to the same file and are stored only once.
+    Files are hard-linked into place, which keeps writes atomic and lets an
+    already spooled upload enter the store without being copied.
+    """
+    name = "local"
+    
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+        self.tmp_dir = self.root / "tmp"
+    
+    def spool_dir(self) -> Path:
+        """Directory for files on their way into the store, created on first use"""
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        return self.tmp_dir
+    
+    def path_for(self, sha256: str) -> Path:
+        """Get the path of a blob from its sha256"""
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+    
+    def exists(self, sha256: str) -> bool:
+        return self.path_for(sha256).is_file()
+    
+    def put_bytes(self, data: bytes) -> str:
+        """Store bytes and return their sha256"""
+        sha256 = hashlib.sha256(data).hexdigest()
+        if self.exists(sha256):
+            self._touch(sha256)
+            return sha256
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.spool_dir())
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            self._link_into_place(tmp_path, sha256)
+        finally:
+            os.unlink(tmp_path)
+        return sha256
+    
+    def put_file(self, src_path: str, sha256: str) -> str:
+        """Store an already hashed file by hard-linking it into the store"""
+        if self.exists(sha256):
+            self._touch(sha256)
+        else:
+            self._link_into_place(src_path, sha256)
+        return sha256
+    
+    def read_bytes(self, sha256: str) -> bytes:
+        return self.path_for(sha256).read_bytes()
+    
+    def delete(self, sha256: str) -> bool:
+        path = self.path_for(sha256)
+        if path.is_file():
+            path.unlink()
+            return True
+        return False
+    
+    def iter_blobs(self) -> Iterator[Path]:
+        """Iterate over every stored blob file"""
+        for path in self.root.glob("??/??/*"):
+            if path.is_file():
+                yield path
+    
+    def _touch(self, sha256: str) -> None:
+        # A reused blob counts as fresh, so garbage collection leaves it alone
+        os.utime(self.path_for(sha256))
+    
+    def _link_into_place(self, src_path: str, sha256: str) -> None:
+        target = self.path_for(sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src_path, target)
+        except FileExistsError:
+            # Identical content was stored concurrently
+            pass
+        except OSError:
+            # Source is on another filesystem - copy next to the store, then rename atomically
+            fd, tmp_path = tempfile.mkstemp(dir=self.spool_dir())
+            os.close(fd)
+            shutil.copyfile(src_path, tmp_path)
+            os.replace(tmp_path, target)
+
+# Initialize store
+local_blob_store = LocalBlobStore(settings.BLOB_STORE_PATH)
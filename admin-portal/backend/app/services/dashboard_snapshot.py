@@ -0,0 +1,168 @@
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core.config import settings
+from ..models.project import DashboardSnapshot, Project, ProjectImage
+from ..models.user import User
+
+# Rows whose changes show up on the dashboard
+DASHBOARD_MODELS = (Project, ProjectImage, User)
+
+def project_aggregates(db: Session, created_by_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Project, image and user totals in one statement
+    
+    Every project count is a FILTERed aggregate over a single scan of
+    projects; images and users are scalar subqueries of the same SELECT.
+    With created_by_id only that user's projects and images are counted,
+    and user totals are left out.
+    """
+    images = select(func.count(ProjectImage.id)).where(ProjectImage.parent_id.is_(None))
+    if created_by_id is not None:
+        images = images.join(Project, Project.id == ProjectImage.project_id).where(Project.created_by_id == created_by_id)
+    
+    columns = [
+        func.count(Project.id).label("total_projects"),
+        func.count(Project.id).filter(Project.is_published == True).label("published_projects"),
+        func.count(Project.id).filter(Project.has_document).label("projects_with_documents"),
+        func.coalesce(func.sum(Project.view_count), 0).label("total_views"),
+        func.coalesce(func.sum(Project.download_count), 0).label("total_downloads"),
+        func.coalesce(func.sum(Project.document_size), 0).label("total_file_size"),
+        images.correlate(None).scalar_subquery().label("total_images")
+    ]
+    if created_by_id is None:
+        columns.append(select(func.count(User.id)).scalar_subquery().label("total_users"))
+        columns.append(select(func.count(User.id)).where(User.is_active == True).scalar_subquery().label("active_users"))
+    
+    stmt = select(*columns).select_from(Project)
+    if created_by_id is not None:
+        stmt = stmt.where(Project.created_by_id == created_by_id)
+    return {key: int(value or 0) for key, value in db.execute(stmt).one()._mapping.items()}
+
+def compute_dashboard_stats(db: Session) -> Dict[str, Any]:
+    """Everything the dashboard shows, in JSON-ready form"""
+    recent_projects = db.query(
+        Project.id, Project.title, Project.author_name, Project.created_at, Project.is_published
+    ).order_by(Project.created_at.desc(), Project.id.desc()).limit(5).all()
+    
+    research_areas = db.query(
+        Project.research_area,
+        func.count(Project.id).label('count')
+    ).filter(
+        Project.research_area.isnot(None)
+    ).group_by(Project.research_area).all()
+    
+    return {
+        **project_aggregates(db),
+        "recent_projects": [
+            {
+                "id": p.id,
+                "title": p.title,
+                "author_name": p.author_name,
+                "created_at": p.created_at.isoformat() if p.created_at else None,
+                "is_published": p.is_published
+            } for p in recent_projects
+        ],
+        "research_areas": [
+            {"name": area, "count": count} for area, count in research_areas
+        ]
+    }
+
+def refresh_dashboard_snapshot() -> None:
+    """Recompute the dashboard totals into the snapshot row"""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        stats = compute_dashboard_stats(db)
+        snapshot = db.get(DashboardSnapshot, 1)
+        if snapshot is None:
+            snapshot = DashboardSnapshot(id=1)
+            db.add(snapshot)
+        snapshot.stats = stats
+        snapshot.refreshed_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Dashboard snapshot refresh failed: {e}")
+    finally:
+        db.close()
+
+class DashboardRefresher:
+    """
+    Daemon thread that refreshes the dashboard snapshot
+    
+    Runs once at start, every interval_seconds after that, and shortly
+    after request() - writes within debounce_seconds of each other
+    share one refresh.
+    """
+    
+    def __init__(self, interval_seconds: float, debounce_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.debounce_seconds = debounce_seconds
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.refreshes = 0
+    
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dashboard-refresh", daemon=True)
+                self._thread.start()
+    
+    def request(self) -> None:
+        self.start()
+        self._wake.set()
+    
+    def _run(self) -> None:
+        while True:
+            refresh_dashboard_snapshot()
+            self.refreshes += 1
+            if self._wake.wait(self.interval_seconds):
+                time.sleep(self.debounce_seconds)
+            self._wake.clear()
+
+dashboard_refresher = DashboardRefresher(
+    interval_seconds=settings.DASHBOARD_REFRESH_SECONDS,
+    debounce_seconds=settings.DASHBOARD_REFRESH_DEBOUNCE_SECONDS
+)
+
+def load_dashboard_stats(db: Session) -> Tuple[Dict[str, Any], Optional[datetime]]:
+    """(stats, refreshed_at) from the snapshot; computed live, with a refresh requested, before the first one"""
+    snapshot = db.get(DashboardSnapshot, 1)
+    if snapshot is None or snapshot.stats is None:
+        dashboard_refresher.request()
+        return compute_dashboard_stats(db), None
+    return snapshot.stats, snapshot.refreshed_at
+
+def _after_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, DASHBOARD_MODELS) for obj in chain(session.new, session.deleted)) or any(
+        isinstance(obj, DASHBOARD_MODELS) and session.is_modified(obj) for obj in session.dirty
+    ):
+        session.info["dashboard_changed"] = True
+
+def _do_orm_execute(state) -> None:
+    # Bulk query.update()/delete() (batch publish, batch delete) bypass flush
+    if (state.is_update or state.is_delete) and state.bind_mapper is not None:
+        if issubclass(state.bind_mapper.class_, DASHBOARD_MODELS):
+            state.session.info["dashboard_changed"] = True
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop("dashboard_changed", False):
+        dashboard_refresher.request()
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("dashboard_changed", None)
+
+def track_dashboard_changes(session_factory: sessionmaker) -> None:
+    """Request a snapshot refresh after every commit that changes projects, images or users"""
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+    event.listen(session_factory, "after_commit", _after_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
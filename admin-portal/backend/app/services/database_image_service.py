@@ -1,11 +1,14 @@
 import io
+import hashlib
 from typing import Optional, List
 from fastapi import UploadFile, HTTPException
 from sqlalchemy.orm import Session
 from PIL import Image
 from pathlib import Path
 
+from ..core.config import settings
 from ..models.project import ProjectImage
+from .blob_store import local_blob_store
 
 class DatabaseImageService:
     def __init__(self):
@@ -35,15 +38,15 @@ class DatabaseImageService:
         content_type = self._get_content_type(file.filename)
         
         # Create database record
-        db_image = ProjectImage(
-            project_id=project_id,
+        db_image = self._build_image_record(
+            optimized_content,
             filename=file.filename,
             content_type=content_type,
-            image_size=len(optimized_content),
-            image_data=optimized_content,
+            project_id=project_id,
             order_index=order_index,
             is_featured=is_featured
         )
+        self._attach_derivatives(db_image, optimized_content)
         
         db.add(db_image)
         db.commit()
@@ -68,15 +71,15 @@ class DatabaseImageService:
         content_type = self._get_content_type(filename)
         
         # Create database record
-        db_image = ProjectImage(
-            project_id=project_id,
+        db_image = self._build_image_record(
+            optimized_content,
             filename=filename,
             content_type=content_type,
-            image_size=len(optimized_content),
-            image_data=optimized_content,
+            project_id=project_id,
             order_index=order_index,
             is_featured=is_featured
         )
+        self._attach_derivatives(db_image, optimized_content)
         
         db.add(db_image)
         db.commit()
@@ -84,6 +87,118 @@ class DatabaseImageService:
         
         return db_image
 
+    def _build_image_record(
+        self,
+        content: bytes,
+        filename: str,
+        content_type: str,
+        project_id: int,
+        order_index: int,
+        is_featured: bool
+    ) -> ProjectImage:
+        """Build an image record, placing the bytes in the configured storage backend"""
+        storage = "local" if settings.STORAGE_BACKEND == "local" else "database"
+        if storage == "local":
+            sha256 = local_blob_store.put_bytes(content)
+        else:
+            sha256 = hashlib.sha256(content).hexdigest()
+        
+        return ProjectImage(
+            project_id=project_id,
+            filename=filename,
+            content_type=content_type,
+            image_size=len(content),
+            image_data=content if storage == "database" else None,
+            sha256=sha256,
+            storage=storage,
+            order_index=order_index,
+            is_featured=is_featured
+        )
+
+    def _attach_derivatives(self, db_image: ProjectImage, content: bytes) -> None:
+        """
+        Record an original's dimensions and add resized and re-encoded copies
+        
+        One derivative is generated per configured width smaller than the
+        original, plus WebP (and AVIF where Pillow can write it) encodings at
+        every size including the original's. Each is a sibling ProjectImage
+        row pointing at its parent; pairs that already exist are skipped.
+        """
+        # Marked even when nothing comes of it, so the backfill moves on
+        db_image.derivatives_generated = True
+        try:
+            img = Image.open(io.BytesIO(content))
+            img.load()
+        except Exception:
+            # Undecodable images are served as stored
+            return
+        
+        db_image.width, db_image.height = img.size
+        
+        # Encode derivatives the way _optimize_image_bytes stored the original
+        is_jpeg = img.format == 'JPEG'
+        base_format = 'JPEG' if is_jpeg else 'PNG'
+        if is_jpeg and img.mode != 'RGB':
+            img = img.convert('RGB')
+        elif not is_jpeg and img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            img = img.convert('RGBA')
+        
+        existing = {(d.width, d.content_type) for d in db_image.derivatives}
+        stem = Path(db_image.filename).stem
+        
+        sizes = [(img.width, img.height, img, content)]
+        for width in sorted(set(settings.IMAGE_DERIVATIVE_WIDTHS)):
+            if width >= img.width:
+                break
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.Resampling.LANCZOS)
+            data = self._encode(resized, base_format)
+            if (width, f'image/{base_format.lower()}') not in existing:
+                self._add_derivative(db_image, data, f"{stem}-{width}w.{'jpg' if is_jpeg else 'png'}", width, height)
+            sizes.append((width, height, resized, data))
+        
+        for width, height, rendition, base_data in sizes:
+            suffix = "" if width == img.width else f"-{width}w"
+            for format in self._modern_formats(is_jpeg):
+                content_type = f'image/{format.lower()}'
+                if (width, content_type) in existing:
+                    continue
+                data = self._encode(rendition, format, lossless=not is_jpeg)
+                # Only worth keeping if it beats the JPEG/PNG at the same size
+                if len(data) < len(base_data):
+                    self._add_derivative(db_image, data, f"{stem}{suffix}.{format.lower()}", width, height)
+
+    def _modern_formats(self, is_jpeg: bool) -> List[str]:
+        """Extra encodings to precompute; AVIF only for photos, where it pays off"""
+        Image.init()
+        formats = ['WEBP'] if 'WEBP' in Image.SAVE else []
+        if is_jpeg and 'AVIF' in Image.SAVE:
+            formats.insert(0, 'AVIF')
+        return formats
+
+    def _encode(self, img: Image.Image, format: str, lossless: bool = False) -> bytes:
+        """Encode an image; PNG sources (tables, diagrams) use lossless WebP to keep text sharp"""
+        output = io.BytesIO()
+        if format == 'WEBP':
+            img.save(output, format=format, lossless=lossless, quality=80, method=6)
+        elif format == 'AVIF':
+            img.save(output, format=format, quality=60)
+        else:
+            img.save(output, format=format, optimize=True, quality=80)
+        return output.getvalue()
+
+    def _add_derivative(self, db_image: ProjectImage, data: bytes, filename: str, width: int, height: int) -> None:
+        derivative = self._build_image_record(
+            data,
+            filename=filename,
+            content_type=self._get_content_type(filename),
+            project_id=db_image.project_id,
+            order_index=db_image.order_index,
+            is_featured=False
+        )
+        derivative.width, derivative.height = width, height
+        db_image.derivatives.append(derivative)
+
     def _get_content_type(self, filename: str) -> str:
         """Get content type from filename"""
         ext = Path(filename).suffix.lower()
@@ -92,7 +207,8 @@ class DatabaseImageService:
             '.jpeg': 'image/jpeg',
             '.png': 'image/png',
             '.gif': 'image/gif',
-            '.webp': 'image/webp'
+            '.webp': 'image/webp',
+            '.avif': 'image/avif'
         }
         return content_types.get(ext, 'image/png')
 
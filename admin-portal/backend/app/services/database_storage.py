@@ -1,12 +1,29 @@
 from fastapi import UploadFile, HTTPException
 import os
-from typing import Dict, Any, Optional
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
 from ..core.config import settings
+from ..models.project import Project, ProjectDocument
+from .blob_store import local_blob_store
+
+STORAGE_BACKENDS = ("database", "local")
+
+# Uploads are read, hashed and spooled in chunks of this size
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# Database-held documents are paged out to clients in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
 
 class DatabaseStorageService:
     def __init__(self):
         """Initialize Database Storage Service"""
-        print("✅ Database Storage initialized")
+        self.backend = settings.STORAGE_BACKEND if settings.STORAGE_BACKEND in STORAGE_BACKENDS else "database"
+        print(f"✅ Document storage initialized (backend: {self.backend})")
     
     async def upload_file(
         self, 
@@ -15,7 +32,7 @@ class DatabaseStorageService:
         filename: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Process file for database storage
+        Stream an upload to a spool file, hashing and size-checking as it goes
         
         Args:
             file: FastAPI UploadFile object
@@ -23,37 +40,62 @@ class DatabaseStorageService:
             filename: Not used for database storage (kept for compatibility)
             
         Returns:
-            Dict with file information for database storage
+            Dict with file information; "path" is the spool file, which the
+            caller releases with discard_spool() once it has been consumed
         """
+        spool_path = None
         try:
             # Validate file
             await self._validate_file(file)
             
-            # Read file content
-            file_content = await file.read()
-            file_size = len(file_content)
+            # Spool next to the blob store so local storage can hard-link the file in
+            spool_dir = local_blob_store.spool_dir() if self.backend == "local" else None
+            fd, spool_path = tempfile.mkstemp(suffix=os.path.splitext(file.filename)[1].lower(), dir=spool_dir)
+            
+            hasher = hashlib.sha256()
+            file_size = 0
+            with os.fdopen(fd, "wb") as spool:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    if file_size > settings.MAX_FILE_SIZE:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large. Max: {settings.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"
+                        )
+                    hasher.update(chunk)
+                    spool.write(chunk)
             
-            print(f"📁 Processing file for database storage: {file.filename} ({file_size / 1024 / 1024:.2f} MB)")
+            print(f"📁 Processed file for {self.backend} storage: {file.filename} ({file_size / 1024 / 1024:.2f} MB)")
             
-            # Return file data for database storage
-            result = {
+            return {
                 "filename": file.filename,
                 "size": file_size,
-                "data": file_content,  # Raw bytes to store in database
+                "path": spool_path,
                 "content_type": file.content_type or "application/octet-stream",
-                "storage": "database"
+                "sha256": hasher.hexdigest(),
+                "storage": self.backend
             }
             
-            print(f"✅ File processed for database storage: {file.filename}")
-            return result
-            
         except HTTPException:
+            self._remove_spool(spool_path)
             raise
         except Exception as e:
+            self._remove_spool(spool_path)
             error_msg = f"File processing failed for {file.filename}: {str(e)}"
             print(f"❌ {error_msg}")
             raise HTTPException(status_code=500, detail=error_msg)
     
+    def discard_spool(self, file_result: Dict[str, Any]) -> None:
+        """Remove the spool file of a processed upload"""
+        self._remove_spool(file_result.get("path"))
+    
+    def _remove_spool(self, path: Optional[str]) -> None:
+        if path and os.path.exists(path):
+            os.unlink(path)
+    
     async def _validate_file(self, file: UploadFile) -> None:
         """Validate file before processing"""
         if not file.filename:
@@ -66,18 +108,113 @@ class DatabaseStorageService:
                 status_code=400,
                 detail=f"File type {file_extension} not allowed. Allowed: {', '.join(settings.ALLOWED_FILE_TYPES)}"
             )
+    
+    def attach_to_project(self, project: Project, file_result: Dict[str, Any]) -> None:
+        """
+        Attach a processed upload to a project
         
-        # Check file size
-        current_pos = file.file.tell()
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(current_pos)
+        Metadata is kept on the projects row; the bytes go to project_documents
+        """
+        project.document_filename = file_result["filename"]
+        project.document_size = file_result["size"]
+        project.document_content_type = file_result["content_type"]
+        project.document_storage = file_result["storage"]
         
-        if file_size > settings.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large: {file_size / 1024 / 1024:.1f}MB. Max: {settings.MAX_FILE_SIZE / 1024 / 1024:.1f}MB"
-            )
+        document = project.document
+        if document is None:
+            document = ProjectDocument()
+            project.document = document
+        if file_result["storage"] == "local":
+            local_blob_store.put_file(file_result["path"], file_result["sha256"])
+            document.data = None
+        else:
+            # bytea has to be bound as one value, so this is the only full read of the upload
+            with open(file_result["path"], "rb") as f:
+                document.data = f.read()
+        document.size = file_result["size"]
+        document.content_type = file_result["content_type"]
+        document.sha256 = file_result["sha256"]
+    
+    def detach_from_project(self, project: Project) -> None:
+        """Remove the document (metadata and bytes) from a project"""
+        project.document_filename = None
+        project.document_size = None
+        project.document_content_type = None
+        project.document_storage = "database"
+        project.document = None
+    
+    def has_document_data(self, db: Session, project_id: int, sha256: str) -> bool:
+        """Check that a database-held document's bytes are still stored under this sha256"""
+        return db.query(ProjectDocument.project_id).filter(
+            ProjectDocument.project_id == project_id,
+            ProjectDocument.sha256 == sha256,
+            ProjectDocument.data.isnot(None)
+        ).first() is not None
+    
+    def get_document_path(self, project: Project, document: ProjectDocument) -> Optional[Path]:
+        """Get the blob store path of a locally stored document, or None if it is in the database"""
+        if project.document_storage != "local":
+            return None
+        return local_blob_store.path_for(document.sha256)
+    
+    def iter_document_chunks(self, project_id: int, sha256: str, size: int) -> Iterator[bytes]:
+        """
+        Stream a database-held document in DOWNLOAD_CHUNK_SIZE pieces
+        
+        Each chunk is a substring() read, so memory per download stays flat
+        whatever the document size. A sync generator: Starlette iterates it in
+        the threadpool, and it uses its own session because it outlives the
+        request, committed after every read so a slow client does not hold a
+        pooled connection. Matching on sha256 aborts the stream rather than
+        splicing two versions together if the document is replaced mid-download.
+        """
+        from ..database import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            offset = 0
+            while offset < size:
+                chunk = db.query(
+                    func.substring(ProjectDocument.data, offset + 1, DOWNLOAD_CHUNK_SIZE)
+                ).filter(
+                    ProjectDocument.project_id == project_id,
+                    ProjectDocument.sha256 == sha256
+                ).scalar()
+                db.commit()
+                if not chunk:
+                    # Raising aborts the connection instead of ending a short body cleanly
+                    raise IOError(f"Document of project {project_id} changed or vanished mid-download")
+                offset += len(chunk)
+                yield chunk
+        finally:
+            db.close()
+    
+    @contextmanager
+    def document_file(self, db: Session, project: Project) -> Iterator[Optional[str]]:
+        """
+        Yield a filesystem path holding a project's document, or None if there is none
+        
+        Local blobs are used in place; database blobs are written to a temp
+        file that is removed on exit.
+        """
+        if project.document_storage == "local":
+            sha256 = db.query(ProjectDocument.sha256).filter(ProjectDocument.project_id == project.id).scalar()
+            yield str(local_blob_store.path_for(sha256)) if sha256 and local_blob_store.exists(sha256) else None
+            return
+        
+        data = db.query(ProjectDocument.data).filter(ProjectDocument.project_id == project.id).scalar()
+        if data is None:
+            yield None
+            return
+        
+        fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(project.document_filename or "")[1].lower())
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            del data
+            yield tmp_path
+        finally:
+            os.unlink(tmp_path)
     
     async def delete_file(self, file_id: str) -> bool:
         """
@@ -95,7 +232,7 @@ class DatabaseStorageService:
         """Check health of database storage"""
         return {
             "status": "healthy",
-            "storage": "database",
+            "storage": self.backend,
             "max_file_size_mb": settings.MAX_FILE_SIZE / 1024 / 1024,
             "allowed_types": settings.ALLOWED_FILE_TYPES
         }
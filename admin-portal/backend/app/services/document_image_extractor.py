@@ -1,9 +1,7 @@
 import io
-import os
 import uuid
 from pathlib import Path
 from typing import List, Tuple
-import tempfile
 from sqlalchemy.orm import Session
 import matplotlib.pyplot as plt
 import matplotlib
@@ -23,23 +21,23 @@ class DocumentImageExtractor:
     
     async def extract_images_from_document(
         self, 
-        document_data: bytes, 
+        document_path: str, 
         filename: str, 
         project_id: int,
         db: Session,
         extract_tables: bool = True
     ) -> int:
-        """Extract images and tables from document and save to database."""
+        """Extract images and tables from a document file and save to database."""
         file_ext = Path(filename).suffix.lower()
         
         if file_ext == '.pdf':
-            return await self._extract_from_pdf(document_data, project_id, db, extract_tables)
+            return await self._extract_from_pdf(document_path, project_id, db, extract_tables)
         elif file_ext in ['.docx', '.doc']:
-            return await self._extract_from_docx(document_data, project_id, db, extract_tables)
+            return await self._extract_from_docx(document_path, project_id, db, extract_tables)
         else:
             return 0
     
-    async def _extract_from_pdf(self, pdf_data: bytes, project_id: int, db: Session, extract_tables: bool = True) -> int:
+    async def _extract_from_pdf(self, pdf_path: str, project_id: int, db: Session, extract_tables: bool = True) -> int:
         """Extract images and tables from PDF and save to database"""
         extracted_count = 0
         
@@ -47,76 +45,68 @@ class DocumentImageExtractor:
             import fitz  # PyMuPDF
             import tabula
             
-            # Save PDF temporarily for tabula
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                tmp_file.write(pdf_data)
-                tmp_path = tmp_file.name
+            # Extract regular images first (pages are read from the file on demand)
+            pdf_document = fitz.open(pdf_path, filetype="pdf")
             
-            try:
-                # Extract regular images first
-                pdf_document = fitz.open(stream=pdf_data, filetype="pdf")
-                
-                # Get current image count for ordering
-                from ..models.project import ProjectImage
-                current_count = db.query(ProjectImage).filter(ProjectImage.project_id == project_id).count()
-                
-                print(f"Starting extraction from PDF with {len(pdf_document)} pages")
+            # Get current image count for ordering
+            from ..models.project import ProjectImage
+            current_count = db.query(ProjectImage).filter(
+                ProjectImage.project_id == project_id,
+                ProjectImage.parent_id.is_(None)
+            ).count()
+            
+            print(f"Starting extraction from PDF with {len(pdf_document)} pages")
+            
+            # Extract images
+            for page_num in range(len(pdf_document)):
+                page = pdf_document.load_page(page_num)
+                image_list = page.get_images()
                 
-                # Extract images
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document.load_page(page_num)
-                    image_list = page.get_images()
-                    
-                    for img_index, img in enumerate(image_list):
-                        try:
-                            # Extract image
-                            xref = img[0]
-                            base_image = pdf_document.extract_image(xref)
-                            image_bytes = base_image["image"]
-                            
-                            # Skip small images
-                            if len(image_bytes) < self.min_image_size:
-                                print(f"Skipping small image: {len(image_bytes)} bytes")
-                                continue
-                            
-                            # Generate filename
-                            ext = base_image.get('ext', 'png')
-                            filename = f"figure_p{page_num + 1}_img{img_index + 1}.{ext}"
-                            
-                            # Save to database
-                            await self.db_image_service.save_image_bytes_to_db(
-                                image_bytes=image_bytes,
-                                filename=filename,
-                                project_id=project_id,
-                                db=db,
-                                order_index=current_count + extracted_count,
-                                is_featured=(current_count == 0 and extracted_count == 0)
-                            )
-                            
-                            extracted_count += 1
-                            print(f"Extracted figure from page {page_num + 1}")
-                            
-                        except Exception as e:
-                            print(f"Failed to extract image {img_index} from page {page_num}: {e}")
+                for img_index, img in enumerate(image_list):
+                    try:
+                        # Extract image
+                        xref = img[0]
+                        base_image = pdf_document.extract_image(xref)
+                        image_bytes = base_image["image"]
+                        
+                        # Skip small images
+                        if len(image_bytes) < self.min_image_size:
+                            print(f"Skipping small image: {len(image_bytes)} bytes")
                             continue
-                
-                pdf_document.close()
-                
-                # Extract tables if requested
-                if extract_tables:
-                    print(f"Starting table extraction from PDF...")
-                    tables_extracted = await self._extract_tables_from_pdf(
-                        tmp_path, 
-                        project_id, 
-                        db, 
-                        current_count + extracted_count
-                    )
-                    extracted_count += tables_extracted
-                
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+                        
+                        # Generate filename
+                        ext = base_image.get('ext', 'png')
+                        filename = f"figure_p{page_num + 1}_img{img_index + 1}.{ext}"
+                        
+                        # Save to database
+                        await self.db_image_service.save_image_bytes_to_db(
+                            image_bytes=image_bytes,
+                            filename=filename,
+                            project_id=project_id,
+                            db=db,
+                            order_index=current_count + extracted_count,
+                            is_featured=(current_count == 0 and extracted_count == 0)
+                        )
+                        
+                        extracted_count += 1
+                        print(f"Extracted figure from page {page_num + 1}")
+                        
+                    except Exception as e:
+                        print(f"Failed to extract image {img_index} from page {page_num}: {e}")
+                        continue
+            
+            pdf_document.close()
+            
+            # Extract tables if requested
+            if extract_tables:
+                print(f"Starting table extraction from PDF...")
+                tables_extracted = await self._extract_tables_from_pdf(
+                    pdf_path, 
+                    project_id, 
+                    db, 
+                    current_count + extracted_count
+                )
+                extracted_count += tables_extracted
             
             print(f"Successfully extracted {extracted_count} images and tables from PDF")
             
@@ -352,120 +342,111 @@ class DocumentImageExtractor:
             traceback.print_exc()
             return None
     
-    async def _extract_from_docx(self, docx_data: bytes, project_id: int, db: Session, extract_tables: bool = True) -> int:
+    async def _extract_from_docx(self, docx_path: str, project_id: int, db: Session, extract_tables: bool = True) -> int:
         """Extract images and tables from DOCX and save to database"""
         extracted_count = 0
         
         try:
             import zipfile
-            import tempfile
             from docx import Document
             
             # Get current image count for ordering
             from ..models.project import ProjectImage
-            current_count = db.query(ProjectImage).filter(ProjectImage.project_id == project_id).count()
-            
-            # Save DOCX temporarily
-            with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp_file:
-                tmp_file.write(docx_data)
-                tmp_path = tmp_file.name
+            current_count = db.query(ProjectImage).filter(
+                ProjectImage.project_id == project_id,
+                ProjectImage.parent_id.is_(None)
+            ).count()
             
-            try:
-                # Extract images from DOCX
-                with zipfile.ZipFile(tmp_path, 'r') as docx_zip:
-                    # Images are stored in word/media/
-                    for file_info in docx_zip.filelist:
-                        if file_info.filename.startswith('word/media/') and not file_info.is_dir():
-                            try:
-                                # Extract image
-                                image_data = docx_zip.read(file_info.filename)
-                                
-                                # Skip small images
-                                if len(image_data) < self.min_image_size:
-                                    continue
-                                
-                                # Get filename
-                                filename = f"figure_{Path(file_info.filename).name}"
-                                
-                                # Save to database
-                                await self.db_image_service.save_image_bytes_to_db(
-                                    image_bytes=image_data,
-                                    filename=filename,
-                                    project_id=project_id,
-                                    db=db,
-                                    order_index=current_count + extracted_count,
-                                    is_featured=(current_count == 0 and extracted_count == 0)
-                                )
-                                
-                                extracted_count += 1
-                                print(f"Extracted image: {filename}")
-                                
-                            except Exception as e:
-                                print(f"Failed to extract image {file_info.filename}: {e}")
-                                continue
-                
-                # Extract tables from DOCX if requested
-                if extract_tables:
-                    print("Extracting tables from DOCX...")
-                    doc = Document(tmp_path)
-                    table_count = 0
-                    
-                    for table_idx, table in enumerate(doc.tables):
+            # Extract images from DOCX
+            with zipfile.ZipFile(docx_path, 'r') as docx_zip:
+                # Images are stored in word/media/
+                for file_info in docx_zip.filelist:
+                    if file_info.filename.startswith('word/media/') and not file_info.is_dir():
                         try:
-                            # Convert table to pandas DataFrame
-                            data = []
-                            for row in table.rows:
-                                row_data = []
-                                for cell in row.cells:
-                                    # Get cell text and clean it
-                                    cell_text = cell.text.strip()
-                                    # Handle merged cells
-                                    row_data.append(cell_text)
-                                data.append(row_data)
+                            # Extract image
+                            image_data = docx_zip.read(file_info.filename)
+                            
+                            # Skip small images
+                            if len(image_data) < self.min_image_size:
+                                continue
+                            
+                            # Get filename
+                            filename = f"figure_{Path(file_info.filename).name}"
+                            
+                            # Save to database
+                            await self.db_image_service.save_image_bytes_to_db(
+                                image_bytes=image_data,
+                                filename=filename,
+                                project_id=project_id,
+                                db=db,
+                                order_index=current_count + extracted_count,
+                                is_featured=(current_count == 0 and extracted_count == 0)
+                            )
+                            
+                            extracted_count += 1
+                            print(f"Extracted image: {filename}")
                             
-                            if len(data) >= self.min_table_rows:  # Valid table
-                                # Ensure all rows have same number of columns
-                                max_cols = max(len(row) for row in data)
-                                for row in data:
-                                    while len(row) < max_cols:
-                                        row.append('')
-                                
-                                df = pd.DataFrame(data)
-                                
-                                # Clean and validate table
-                                df = self._clean_table(df)
-                                
-                                if self._is_valid_table(df):
-                                    # Convert to image
-                                    table_image_bytes = await self._table_to_image_enhanced(df, table_count + 1)
-                                    
-                                    if table_image_bytes:
-                                        filename = f"table_{table_count + 1}.png"
-                                        
-                                        # Save to database
-                                        await self.db_image_service.save_image_bytes_to_db(
-                                            image_bytes=table_image_bytes,
-                                            filename=filename,
-                                            project_id=project_id,
-                                            db=db,
-                                            order_index=current_count + extracted_count,
-                                            is_featured=False
-                                        )
-                                        
-                                        extracted_count += 1
-                                        table_count += 1
-                                        print(f"Extracted table {table_count}")
-                                
                         except Exception as e:
-                            print(f"Failed to extract table {table_idx}: {e}")
+                            print(f"Failed to extract image {file_info.filename}: {e}")
                             continue
+            
+            # Extract tables from DOCX if requested
+            if extract_tables:
+                print("Extracting tables from DOCX...")
+                doc = Document(docx_path)
+                table_count = 0
                 
-                print(f"Successfully extracted {extracted_count} images and tables from DOCX")
-                
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+                for table_idx, table in enumerate(doc.tables):
+                    try:
+                        # Convert table to pandas DataFrame
+                        data = []
+                        for row in table.rows:
+                            row_data = []
+                            for cell in row.cells:
+                                # Get cell text and clean it
+                                cell_text = cell.text.strip()
+                                # Handle merged cells
+                                row_data.append(cell_text)
+                            data.append(row_data)
+                        
+                        if len(data) >= self.min_table_rows:  # Valid table
+                            # Ensure all rows have same number of columns
+                            max_cols = max(len(row) for row in data)
+                            for row in data:
+                                while len(row) < max_cols:
+                                    row.append('')
+                            
+                            df = pd.DataFrame(data)
+                            
+                            # Clean and validate table
+                            df = self._clean_table(df)
+                            
+                            if self._is_valid_table(df):
+                                # Convert to image
+                                table_image_bytes = await self._table_to_image_enhanced(df, table_count + 1)
+                                
+                                if table_image_bytes:
+                                    filename = f"table_{table_count + 1}.png"
+                                    
+                                    # Save to database
+                                    await self.db_image_service.save_image_bytes_to_db(
+                                        image_bytes=table_image_bytes,
+                                        filename=filename,
+                                        project_id=project_id,
+                                        db=db,
+                                        order_index=current_count + extracted_count,
+                                        is_featured=False
+                                    )
+                                    
+                                    extracted_count += 1
+                                    table_count += 1
+                                    print(f"Extracted table {table_count}")
+                            
+                    except Exception as e:
+                        print(f"Failed to extract table {table_idx}: {e}")
+                        continue
+            
+            print(f"Successfully extracted {extracted_count} images and tables from DOCX")
             
         except Exception as e:
             print(f"Error extracting from DOCX: {e}")
@@ -0,0 +1,133 @@
+import os
+import zlib
+from typing import Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.search import SEARCH_CONFIG, is_postgres
+from ..models.project import Project, ProjectDocument, ProjectDocumentText
+from .database_storage import database_storage
+
+# DOCX and plain text have no pages; their text is split into pseudo-pages of about this size
+PSEUDO_PAGE_CHARS = 3000
+
+# Document types extract_pages() can read; .doc and .rtf need external converters
+EXTRACTABLE_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+def index_document_text(db: Session, project_id: int) -> int:
+    """
+    Extract a project's document text page by page and index it for search
+    
+    Runs once per document version: if the current sha256 has already been
+    processed, even to no text at all, nothing is done. Returns the number
+    of pages indexed.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    document = db.query(ProjectDocument).filter(ProjectDocument.project_id == project_id).first()
+    if not project or not document:
+        return 0
+    
+    if document.text_indexed_sha256 == document.sha256:
+        return 0
+    
+    # Unsupported types are settled without writing the document out
+    pages = []
+    if os.path.splitext(project.document_filename or "")[1].lower() in EXTRACTABLE_EXTENSIONS:
+        with database_storage.document_file(db, project) as document_path:
+            if document_path is None:
+                return 0
+            pages = extract_pages(document_path, project.document_filename or "")
+    
+    db.query(ProjectDocumentText).filter(
+        ProjectDocumentText.project_id == project_id
+    ).delete(synchronize_session=False)
+    
+    postgres = is_postgres(db)
+    for page_number, text in enumerate(pages, start=1):
+        # Empty pages (scans) are kept so page numbers match the document
+        db.add(ProjectDocumentText(
+            project_id=project_id,
+            page_number=page_number,
+            document_sha256=document.sha256,
+            text_compressed=zlib.compress(text.encode("utf-8"), 6),
+            search_vector=func.to_tsvector(SEARCH_CONFIG, text) if postgres else None
+        ))
+    document.text_indexed_sha256 = document.sha256
+    db.commit()
+    return len(pages)
+
+def extract_pages(document_path: str, filename: str) -> List[str]:
+    """Plain text of each page of a PDF, or of each pseudo-page of a DOCX/TXT file"""
+    ext = os.path.splitext(filename)[1].lower()
+    
+    if ext == '.pdf':
+        import fitz
+        with fitz.open(document_path, filetype="pdf") as pdf_document:
+            return [_clean(page.get_text("text")) for page in pdf_document]
+    
+    if ext == '.docx':
+        from docx import Document
+        paragraphs = [paragraph.text for paragraph in Document(document_path).paragraphs]
+        return _paginate(paragraphs)
+    
+    if ext == '.txt':
+        with open(document_path, "r", encoding="utf-8", errors="replace") as f:
+            return _paginate(f.read().splitlines())
+    
+    # Anything outside EXTRACTABLE_EXTENSIONS is not indexed
+    return []
+
+def _clean(text: str) -> str:
+    # PostgreSQL text cannot hold NUL characters
+    return text.replace("\x00", "").strip()
+
+def _paginate(lines: List[str]) -> List[str]:
+    pages, current, size = [], [], 0
+    for line in lines:
+        current.append(line)
+        size += len(line) + 1
+        if size >= PSEUDO_PAGE_CHARS:
+            pages.append(_clean("\n".join(current)))
+            current, size = [], 0
+    if current:
+        pages.append(_clean("\n".join(current)))
+    return pages
+
+def index_document_text_background(project_id: int) -> None:
+    """Background task wrapper around index_document_text with its own session"""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        pages = index_document_text(db, project_id)
+        if pages:
+            print(f"✅ Indexed {pages} document pages for project {project_id}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Document text indexing failed for project {project_id}: {e}")
+    finally:
+        db.close()
+
+def reindex_all_documents() -> Dict[str, int]:
+    """Index every document whose text is missing or stale; unchanged ones are skipped"""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    counts = {"documents": 0, "pages": 0, "failed": 0}
+    try:
+        print("🔄 Indexing document text")
+        project_ids = [project_id for (project_id,) in db.query(ProjectDocument.project_id).order_by(ProjectDocument.project_id)]
+        for project_id in project_ids:
+            try:
+                pages = index_document_text(db, project_id)
+            except Exception as e:
+                db.rollback()
+                counts["failed"] += 1
+                print(f"❌ Document text indexing failed for project {project_id}: {e}")
+                continue
+            if pages:
+                counts["documents"] += 1
+                counts["pages"] += pages
+        print(f"✅ Document text indexing completed: {counts}")
+    finally:
+        db.close()
+    return counts
@@ -0,0 +1,58 @@
+from typing import Dict
+
+from sqlalchemy.orm import undefer
+
+from ..models.project import ProjectImage
+from .blob_store import local_blob_store
+from .database_image_service import DatabaseImageService
+
+def generate_missing_derivatives(batch_size: int = 20) -> Dict[str, int]:
+    """
+    Generate resized and WebP/AVIF derivatives for images missing them
+    
+    Originals not yet marked derivatives_generated are processed in
+    committed SKIP LOCKED batches, walking ids upwards. The mark is set
+    even when no WebP beats the original or the image cannot be decoded,
+    so later runs skip them. Derivatives that already exist are not
+    regenerated.
+    """
+    from ..database import SessionLocal
+    db = SessionLocal()
+    image_service = DatabaseImageService()
+    counts = {"images": 0, "derivatives": 0}
+    last_id = 0
+    try:
+        print("🔄 Generating missing image derivatives")
+        while True:
+            images = db.query(ProjectImage).options(undefer(ProjectImage.image_data)).filter(
+                ProjectImage.parent_id.is_(None),
+                ProjectImage.derivatives_generated == False,
+                ProjectImage.id > last_id
+            ).order_by(ProjectImage.id).with_for_update(skip_locked=True).limit(batch_size).all()
+            if not images:
+                break
+            
+            for image in images:
+                last_id = image.id
+                if image.storage == "local":
+                    if not image.sha256 or not local_blob_store.exists(image.sha256):
+                        continue
+                    content = local_blob_store.read_bytes(image.sha256)
+                else:
+                    content = image.image_data
+                if not content:
+                    continue
+                
+                image_service._attach_derivatives(image, content)
+                counts["images"] += 1
+                counts["derivatives"] += len(image.derivatives)
+            db.commit()
+        
+        print(f"✅ Image derivatives generated: {counts}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Image derivative generation failed: {e}")
+    finally:
+        db.close()
+    
+    return counts
@@ -0,0 +1,81 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..models.project import Keyword, Project, ProjectKeyword
+
+# Longest keyword kept; the columns are String(100)
+MAX_KEYWORD_LENGTH = 100
+
+def normalize_keyword(text: str) -> str:
+    """The form keywords are matched in: lowercased, whitespace collapsed"""
+    return " ".join(text.split()).lower()
+
+def parse_keywords(text: Optional[str]) -> List[Tuple[str, str]]:
+    """(name, label) pairs of a comma/semicolon separated keyword string, in order, without duplicates"""
+    keywords = {}
+    for part in re.split(r"[,;]", text or ""):
+        label = " ".join(part.split())[:MAX_KEYWORD_LENGTH]
+        if label:
+            keywords.setdefault(normalize_keyword(label), label)
+    return list(keywords.items())
+
+def sync_project_keywords(db: Session, project: Project) -> None:
+    """
+    Make project_keywords match project.keywords
+    
+    Missing keywords are inserted with ON CONFLICT DO NOTHING, so two
+    projects introducing the same keyword at once cannot collide. The
+    project must have an id (flush first); the caller commits.
+    """
+    keywords = parse_keywords(project.keywords)
+    keyword_ids = set()
+    if keywords:
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        db.execute(
+            insert(Keyword).values([{"name": name, "label": label} for name, label in keywords]).on_conflict_do_nothing(
+                index_elements=["name"]
+            )
+        )
+        keyword_ids = {
+            keyword_id for (keyword_id,) in db.query(Keyword.id).filter(Keyword.name.in_([name for name, _ in keywords]))
+        }
+    
+    current = {
+        keyword_id for (keyword_id,) in db.query(ProjectKeyword.keyword_id).filter(ProjectKeyword.project_id == project.id)
+    }
+    stale = current - keyword_ids
+    if stale:
+        db.query(ProjectKeyword).filter(
+            ProjectKeyword.project_id == project.id,
+            ProjectKeyword.keyword_id.in_(stale)
+        ).delete(synchronize_session=False)
+    db.add_all(ProjectKeyword(project_id=project.id, keyword_id=keyword_id) for keyword_id in keyword_ids - current)
+
+def backfill_project_keywords(batch_size: int = 200) -> Dict[str, int]:
+    """Split every project's keywords into project_keywords, in committed batches by id"""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    counts = {"projects": 0}
+    last_id = 0
+    try:
+        print("🔄 Backfilling project keywords")
+        while True:
+            projects = db.query(Project).filter(Project.id > last_id).order_by(Project.id).limit(batch_size).all()
+            if not projects:
+                break
+            for project in projects:
+                sync_project_keywords(db, project)
+                last_id = project.id
+            db.commit()
+            counts["projects"] += len(projects)
+        print(f"✅ Project keywords backfilled: {counts}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Project keyword backfill failed: {e}")
+    finally:
+        db.close()
+    return counts
@@ -0,0 +1,188 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.project import Project, ProjectSimilar
+
+# Neighbours below this cosine similarity are not worth recommending
+MIN_SIMILARITY = 0.05
+
+# Rows of the similarity matrix computed per sparse product
+SIMILARITY_BLOCK_ROWS = 256
+
+# Common words that would otherwise make every abstract look alike
+STOP_WORDS = frozenset("""
+a about above after again against all also among an and any are as at be because been before being between both but by
+can could did do does during each few for from further had has have having how however i if in into is it its itself
+more most no nor not of off on once only or other our out over own same should so some such than that the their them
+then there these they this those through to too under until up upon using very was we were what when where which while
+who whom why will with within without would study research project thesis results
+""".split())
+
+def _words(text: Optional[str]) -> List[str]:
+    return [word for word in re.findall(r"[a-z][a-z0-9]+", (text or "").lower()) if word not in STOP_WORDS]
+
+def _terms(project) -> List[str]:
+    """Terms of a project; title and keywords count double, they say more than the abstract"""
+    return 2 * (_words(project.title) + _words(project.keywords)) + _words(project.abstract)
+
+def tfidf_matrix(documents: List[List[str]]) -> csr_matrix:
+    """
+    L2-normalised TF-IDF rows for tokenised documents
+    
+    Sublinear term frequency (1 + log tf) and smoothed idf, so the dot
+    product of two rows is their cosine similarity.
+    """
+    vocabulary: Dict[str, int] = {}
+    indptr, indices, data = [0], [], []
+    for terms in documents:
+        counts = Counter(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    
+    matrix = csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(documents), max(len(vocabulary), 1))
+    )
+    matrix.data = 1.0 + np.log(matrix.data)
+    
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1.0 + len(documents)) / (1.0 + document_frequency)) + 1.0
+    matrix = (matrix @ diags(idf)).tocsr()
+    
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (diags(1.0 / norms) @ matrix).tocsr()
+
+def _neighbours(matrix: csr_matrix, ids: List[int], rows: List[int], k: int) -> Iterable[Tuple[int, List[Tuple[int, float]]]]:
+    """(project id, [(similar id, score), ...] best first) for the given matrix rows, computed in blocks"""
+    for start in range(0, len(rows), SIMILARITY_BLOCK_ROWS):
+        block = rows[start:start + SIMILARITY_BLOCK_ROWS]
+        similarities = (matrix[block] @ matrix.T).tocsr()
+        for offset, row in enumerate(block):
+            begin, end = similarities.indptr[offset], similarities.indptr[offset + 1]
+            columns, scores = similarities.indices[begin:end], similarities.data[begin:end]
+            keep = (columns != row) & (scores >= MIN_SIMILARITY)
+            columns, scores = columns[keep], scores[keep]
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+                columns, scores = columns[top], scores[top]
+            order = np.lexsort((columns, -scores))
+            yield ids[row], [(ids[columns[i]], float(scores[i])) for i in order]
+
+def _replace_neighbours(db: Session, project_id: int, neighbours: List[Tuple[int, float]]) -> None:
+    db.query(ProjectSimilar).filter(ProjectSimilar.project_id == project_id).delete(synchronize_session=False)
+    db.add_all(
+        ProjectSimilar(project_id=project_id, rank=rank, similar_project_id=similar_id, score=score)
+        for rank, (similar_id, score) in enumerate(neighbours, start=1)
+    )
+
+def _load_corpus(db: Session) -> Tuple[List[int], csr_matrix]:
+    projects = db.query(Project.id, Project.title, Project.abstract, Project.keywords).filter(
+        Project.is_published == True
+    ).order_by(Project.id).all()
+    return [project.id for project in projects], tfidf_matrix([_terms(project) for project in projects])
+
+def rebuild_related_projects() -> Dict[str, int]:
+    """Recompute the neighbours of every published project, replacing project_similar"""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    k = settings.RELATED_PROJECTS_K
+    counts = {"projects": 0, "pairs": 0}
+    try:
+        print("🔄 Rebuilding related projects")
+        ids, matrix = _load_corpus(db)
+        db.query(ProjectSimilar).delete(synchronize_session=False)
+        for project_id, neighbours in _neighbours(matrix, ids, list(range(len(ids))), k):
+            _replace_neighbours(db, project_id, neighbours)
+            counts["projects"] += 1
+            counts["pairs"] += len(neighbours)
+        db.commit()
+        print(f"✅ Related projects rebuilt: {counts}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Related projects rebuild failed: {e}")
+    finally:
+        db.close()
+    return counts
+
+def update_related_projects(db: Session, project_ids: List[int]) -> Dict[str, int]:
+    """
+    Compute neighbours for new or edited published projects
+    
+    Targets are the given projects plus their current neighbours. Only
+    their rows of the similarity matrix are computed; other projects'
+    lists are merged with the new scores, so a newly published project
+    also shows up as related to its neighbours. Vectors use the current
+    corpus and other lists only see targets' own top k, so results drift
+    slightly from a full rebuild until the next one.
+    """
+    k = settings.RELATED_PROJECTS_K
+    counts = {"projects": 0, "updated_neighbours": 0}
+    ids, matrix = _load_corpus(db)
+    row_of = {project_id: row for row, project_id in enumerate(ids)}
+    changed = [project_id for project_id in project_ids if project_id in row_of]
+    if not changed:
+        return counts
+    targets = set(changed)
+    targets.update(
+        similar_id for (similar_id,) in db.query(ProjectSimilar.similar_project_id).filter(
+            ProjectSimilar.project_id.in_(changed)
+        ) if similar_id in row_of
+    )
+    
+    # Candidates for other projects' lists: (other id) -> {target id: score}
+    offers: Dict[int, Dict[int, float]] = {}
+    for project_id, neighbours in _neighbours(matrix, ids, sorted(row_of[t] for t in targets), k):
+        _replace_neighbours(db, project_id, neighbours)
+        counts["projects"] += 1
+        for similar_id, score in neighbours:
+            if similar_id not in targets:
+                offers.setdefault(similar_id, {})[project_id] = score
+    
+    # Lists still holding a target under its old score are rewritten too
+    for (project_id,) in db.query(ProjectSimilar.project_id).filter(
+        ProjectSimilar.similar_project_id.in_(targets),
+        ProjectSimilar.project_id.notin_(targets)
+    ).distinct():
+        offers.setdefault(project_id, {})
+    
+    current: Dict[int, List[Tuple[int, float]]] = {}
+    for row in db.query(ProjectSimilar).filter(
+        ProjectSimilar.project_id.in_(offers.keys())
+    ).order_by(ProjectSimilar.project_id, ProjectSimilar.rank):
+        current.setdefault(row.project_id, []).append((row.similar_project_id, row.score))
+    
+    for project_id, offered in offers.items():
+        # Targets' old scores are stale; they are replaced by the offers
+        existing = current.get(project_id, [])
+        merged = [(similar_id, score) for similar_id, score in existing if similar_id not in targets]
+        merged += offered.items()
+        merged = sorted(merged, key=lambda pair: (-pair[1], pair[0]))[:k]
+        if merged != existing:
+            _replace_neighbours(db, project_id, merged)
+            counts["updated_neighbours"] += 1
+    
+    db.commit()
+    return counts
+
+def update_related_projects_background(project_ids: List[int]) -> None:
+    """Background task wrapper around update_related_projects with its own session"""
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        counts = update_related_projects(db, project_ids)
+        if counts["projects"]:
+            print(f"✅ Related projects updated: {counts}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Related projects update failed: {e}")
+    finally:
+        db.close()
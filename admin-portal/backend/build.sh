@@ -29,6 +29,7 @@ print('Creating/updating database tables...')
 Base.metadata.create_all(bind=engine)
 print('✓ Database tables ready')
 "
+alembic upgrade head
 
 echo "4. Testing database storage..."
 python -c "
@@ -1,5 +1,8 @@
 import axios, { AxiosResponse } from 'axios';
-import { User, Project, DashboardStats, LoginRequest, AuthResponse, FormConstants } from '../types';
+import {
+  User, Project, DashboardStats, LoginRequest, AuthResponse, FormConstants,
+  EventRollups, ProjectAnalytics, ResearchAreaAnalytics
+} from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8001/api';
 
@@ -168,6 +171,21 @@ class AdminApiService {
     return response.data;
   }
 
+  async getEventRollups(): Promise<EventRollups> {
+    const response = await this.api.get('/dashboard/analytics/rollups');
+    return response.data;
+  }
+
+  async getProjectAnalytics(projectId: number, days: number = 30): Promise<ProjectAnalytics> {
+    const response = await this.api.get(`/dashboard/analytics/projects/${projectId}`, { params: { days } });
+    return response.data;
+  }
+
+  async getResearchAreaAnalytics(days: number = 30): Promise<ResearchAreaAnalytics> {
+    const response = await this.api.get('/dashboard/analytics/research-areas', { params: { days } });
+    return response.data;
+  }
+
   // Users
   async getUsers(): Promise<User[]> {
     const response = await this.api.get('/users/');
@@ -435,6 +453,7 @@ class AdminApiService {
 
   // Advanced search
   async advancedSearchProjects(params: {
+    q?: string;
     title?: string;
     author?: string;
     supervisor?: string;
@@ -449,9 +468,13 @@ class AdminApiService {
     is_published?: boolean;
     created_after?: string;
     created_before?: string;
+    fuzzy?: boolean;
+    scope?: 'metadata' | 'fulltext';
     skip?: number;
     limit?: number;
-  }): Promise<{ total: number; projects: Project[] }> {
+    cursor?: string;
+    count?: 'exact' | 'estimate' | 'none';
+  }): Promise<{ total: number | null; total_is_estimate: boolean; next_cursor: string | null; projects: Project[] }> {
     const response = await this.api.get('/projects/search/advanced', { params });
     return response.data;
   }
@@ -113,6 +113,47 @@ export interface DashboardStats {
     name: string;
     count: number;
   }>;
+  refreshed_at: string | null;
+}
+
+// Analytics Types
+export interface EventCounts {
+  views: number;
+  downloads: number;
+}
+
+export interface EventRollups {
+  '7d': EventCounts;
+  '30d': EventCounts;
+  '365d': EventCounts;
+}
+
+export interface DailyEventCounts extends EventCounts {
+  date: string;
+}
+
+export interface ProjectAnalytics {
+  project_id: number;
+  title: string;
+  total_views: number;
+  total_downloads: number;
+  rollups: EventRollups;
+  unique_visitors: {
+    '7d': number;
+    '30d': number;
+    '365d': number;
+  };
+  series: Array<DailyEventCounts & {
+    visitors: number;
+  }>;
+}
+
+export interface ResearchAreaAnalytics {
+  days: number;
+  research_areas: Array<EventCounts & {
+    research_area: string;
+    series: DailyEventCounts[];
+  }>;
 }
 
 export interface LoginRequest {
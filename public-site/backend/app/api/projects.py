@@ -1,19 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from typing import List, Optional
-import io
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
+from fastapi.responses import StreamingResponse, FileResponse
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from pydantic import TypeAdapter
+import json
 import logging
 
 from ..database import get_db
-from ..models.project import Project, ProjectImage
+from ..models.project import Project, ProjectImage, ProjectSimilar
 from ..schemas.project import ProjectResponse, ProjectStats, ProjectFileInfo
 from ..core.config import settings
+from ..core.counters import counter_buffer
+from ..core.visitors import visitor_hash
+from ..core.cache import (
+    blob_cache, catalogue_version, facet_cache, image_cache_key, image_meta_cache, published_projects, search_cache, site_cache
+)
+from ..core.pagination import paginate
+from ..core.search import (
+    SEARCH_SCOPES, apply_fulltext_search, apply_text_search, attach_page_hits, facet_counts, keyword_cloud, keyword_criterion,
+    normalize_search
+)
+from ..core.http_cache import accepts_media_type, is_not_modified, make_etag, not_modified_response, validator_headers
+from ..core.http_range import if_range_matches, parse_range
+from ..services.blob_store import local_blob_store
+from ..services import document_store
+from ..services.suggest_index import suggest_index
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def document_response(
+    db: Session,
+    project: Project,
+    request: Request,
+    disposition: str,
+    filename: str,
+    extra_headers: Optional[Dict[str, str]] = None
+) -> Optional[Response]:
+    """
+    Serve a project's document from project_documents or the local blob store
+    
+    The body is streamed in fixed-size chunks. A single byte range (Range,
+    honouring If-Range) is answered with 206 and only that slice is read, so
+    seeking in a PDF viewer does not pull the whole blob. A matching
+    If-None-Match / If-Modified-Since gets a 304 without touching the bytes.
+    """
+    document = document_store.get_document(db, project.id)
+    if not document:
+        return None
+    
+    content_type = document.content_type or "application/octet-stream"
+    etag = make_etag(document.sha256)
+    last_modified = document.updated_at or document.created_at
+    headers = {
+        "Content-Disposition": f'{disposition}; filename="{filename}"',
+        "Content-Type": content_type,
+        "Accept-Ranges": "bytes",
+        **validator_headers(etag, last_modified),
+        **(extra_headers or {})
+    }
+    
+    if not document_store.is_available(db, project, document):
+        return None
+    
+    # Revalidation is answered from the metadata row alone
+    if is_not_modified(request, etag, last_modified):
+        del headers["Content-Type"]
+        return not_modified_response(headers)
+    
+    byte_range = None
+    if if_range_matches(request.headers.get("if-range"), etag, last_modified):
+        byte_range = parse_range(request.headers.get("range"), document.size)
+    
+    status_code = 200
+    start, end = 0, document.size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{document.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    # Small database-held documents come from the blob cache; the rest is streamed
+    data = document_store.cached_bytes(db, project, document)
+    if data is not None:
+        return Response(content=data[start:end + 1], status_code=status_code, media_type=content_type, headers=headers)
+    
+    return StreamingResponse(
+        document_store.iter_range(project, document, start, end - start + 1),
+        status_code=status_code,
+        media_type=content_type,
+        headers=headers
+    )
+
+# Encodings preferred over the stored JPEG/PNG, best first, when the client lists them
+NEGOTIATED_IMAGE_TYPES = ("image/avif", "image/webp")
+
+class ImageMeta(NamedTuple):
+    """The columns needed to serve an image variant, detached from any session"""
+    id: int
+    project_id: int
+    parent_id: Optional[int]
+    filename: str
+    content_type: Optional[str]
+    sha256: Optional[str]
+    storage: Optional[str]
+    created_at: Optional[datetime]
+    width: Optional[int]
+    
+    @classmethod
+    def from_row(cls, image: ProjectImage) -> "ImageMeta":
+        return cls(
+            id=image.id,
+            project_id=image.project_id,
+            parent_id=image.parent_id,
+            filename=image.filename,
+            content_type=image.content_type,
+            sha256=image.sha256,
+            storage=image.storage,
+            created_at=image.created_at,
+            width=image.width
+        )
+
+def load_image_family(db: Session, image: ProjectImage) -> Tuple[ImageMeta, Tuple[ImageMeta, ...]]:
+    """An image and its derivatives (none for a derivative or an unsized image), detached from the session"""
+    if image.parent_id is not None or not image.width:
+        return ImageMeta.from_row(image), ()
+    variants = db.query(ProjectImage).filter(ProjectImage.parent_id == image.id).all()
+    return ImageMeta.from_row(image), tuple(ImageMeta.from_row(variant) for variant in variants)
+
+def select_image_variant(
+    image: ImageMeta, variants: Sequence[ImageMeta], width: Optional[int], accept: Optional[str]
+) -> ImageMeta:
+    """
+    Pick the image variant to serve for a requested display width and Accept header
+    
+    The size is the narrowest one at least `width` wide, or the original's
+    when none is or no width was asked for. At that size AVIF or WebP is
+    preferred when the client lists it; otherwise the JPEG/PNG is served.
+    """
+    if not variants:
+        return image
+    
+    target = image.width
+    if width and 0 < width < image.width:
+        wider = [v.width for v in variants if v.width and v.width >= width]
+        if wider:
+            target = min(wider)
+    candidates = [v for v in variants if v.width == target]
+    
+    for media_type in NEGOTIATED_IMAGE_TYPES:
+        if accepts_media_type(accept, media_type):
+            for variant in candidates:
+                if variant.content_type == media_type:
+                    return variant
+    for variant in candidates:
+        if variant.content_type not in NEGOTIATED_IMAGE_TYPES:
+            return variant
+    return image
+
+def image_response(db: Session, request: Request, image: ImageMeta) -> Response:
+    """
+    Serve a project image from the database or the local blob store
+    
+    image is loaded without its bytes; a revalidation that matches the ETag or
+    Last-Modified is answered with 304 before the blob column is read.
+    """
+    etag = make_etag(image.sha256)
+    headers = {
+        "Cache-Control": "public, max-age=86400",
+        "Content-Disposition": f'inline; filename="{image.filename}"',
+        # The same URL serves AVIF/WebP/JPEG/PNG depending on Accept
+        "Vary": "Accept",
+        **validator_headers(etag, image.created_at)
+    }
+    if is_not_modified(request, etag, image.created_at):
+        return not_modified_response(headers)
+    
+    if image.storage == "local":
+        path = local_blob_store.path_for(image.sha256)
+        if not path.is_file():
+            raise HTTPException(status_code=404, detail="Image not found")
+        return FileResponse(path, media_type=image.content_type, headers=headers)
+    
+    # Hot images are served from the in-process cache, keyed by content hash
+    cache_key = image_cache_key(image)
+    data = blob_cache.get(cache_key)
+    if data is None:
+        data = db.query(ProjectImage.image_data).filter(ProjectImage.id == image.id).scalar()
+        if data is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+        blob_cache.set(cache_key, data)
+    return Response(content=data, media_type=image.content_type, headers=headers)
+
+# Serializes list responses once, for the search cache
+project_list_adapter = TypeAdapter(List[ProjectResponse])
+
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(
     skip: int = 0,
@@ -21,19 +204,81 @@ async def get_projects(
     search: Optional[str] = None,
     research_area: Optional[str] = None,
     degree_type: Optional[str] = None,
+    institution: Optional[str] = None,
+    academic_year: Optional[str] = None,
+    keyword: Optional[str] = None,
+    scope: str = "metadata",
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Project).filter(Project.is_published == True)
+    """
+    List published projects
+    
+    Newest first, or by relevance when searching. scope=fulltext also
+    searches document contents and reports the matching page numbers in
+    page_hits. keyword matches one whole keyword. The X-Next-Cursor
+    response header, passed back as cursor, fetches the next page; skip is
+    still accepted.
     
-    if search:
-        query = query.filter(
-            or_(
-                Project.title.ilike(f"%{search}%"),
-                Project.abstract.ilike(f"%{search}%"),
-                Project.author_name.ilike(f"%{search}%"),
-                Project.keywords.ilike(f"%{search}%")
-            )
+    Serialized responses are cached per catalogue version and normalized
+    filters, so repeated searches cost one version check until the admin
+    portal changes something.
+    """
+    if scope not in SEARCH_SCOPES:
+        raise HTTPException(status_code=400, detail=f"Invalid scope. Allowed: {', '.join(SEARCH_SCOPES)}")
+    search = normalize_search(search)
+    fulltext = scope == "fulltext" and bool(search)
+    
+    cache_key = (
+        "projects",
+        catalogue_version.current(db),
+        search,
+        scope if fulltext else "metadata",
+        research_area,
+        degree_type,
+        institution,
+        academic_year,
+        " ".join((keyword or "").split()).lower() or None,
+        cursor,
+        0 if cursor else skip,
+        limit
+    )
+    cached = search_cache.get(cache_key)
+    if cached is None:
+        projects, next_cursor = list_projects(
+            db, skip, limit, search, fulltext, research_area, degree_type, institution, academic_year, keyword, cursor
         )
+        # The next-page cursor is stored in front of the body; cursors never contain a newline
+        cached = (next_cursor or "").encode() + b"\n" + project_list_adapter.dump_json(
+            project_list_adapter.validate_python(projects, from_attributes=True)
+        )
+        search_cache.set(cache_key, cached)
+    
+    next_cursor, _, body = cached.partition(b"\n")
+    headers = {"X-Next-Cursor": next_cursor.decode()} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def list_projects(
+    db: Session,
+    skip: int,
+    limit: int,
+    search: Optional[str],
+    fulltext: bool,
+    research_area: Optional[str],
+    degree_type: Optional[str],
+    institution: Optional[str],
+    academic_year: Optional[str],
+    keyword: Optional[str],
+    cursor: Optional[str]
+):
+    """One page of published projects for get_projects, and the next page's cursor"""
+    query = db.query(Project).filter(Project.is_published == True)
+    rank = None
+    
+    if fulltext:
+        query, rank = apply_fulltext_search(query, db, search)
+    elif search:
+        query, rank = apply_text_search(query, db, search)
     
     if research_area:
         query = query.filter(Project.research_area == research_area)
@@ -41,95 +286,212 @@ async def get_projects(
     if degree_type:
         query = query.filter(Project.degree_type == degree_type)
     
-    projects = query.offset(skip).limit(limit).all()
-    return projects
+    if institution:
+        query = query.filter(Project.institution == institution)
+    
+    if academic_year:
+        query = query.filter(Project.academic_year == academic_year)
+    
+    if keyword:
+        query = query.filter(keyword_criterion(db, keyword))
+    
+    if rank is not None:
+        rows, next_cursor = paginate(query, "relevance", rank, limit, skip, cursor)
+    else:
+        rows, next_cursor = paginate(query, "created", Project.created_at, limit, skip, cursor)
+    
+    return (attach_page_hits(rows) if fulltext else rows), next_cursor
 
-@router.get("/featured", response_model=List[ProjectResponse])
-async def get_featured_projects(limit: int = 6, db: Session = Depends(get_db)):
+def site_cache_response(request: Request, key: tuple, compute, db: Session) -> Response:
+    """
+    Serve a site-wide JSON body from site_cache with Cache-Control and ETag
+    
+    compute(db) renders the body; it may run in a background thread with
+    its own session, so it must not use anything from the request.
+    """
+    catalogue_version.current(db)
+    body, etag = site_cache.get(key, compute, db)
+    headers = {"Cache-Control": site_cache.cache_control(), **validator_headers(etag, None)}
+    if is_not_modified(request, etag, None):
+        return not_modified_response(headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def render_featured_projects(db: Session, limit: int) -> bytes:
     projects = db.query(Project).filter(
         Project.is_published == True
     ).order_by(Project.view_count.desc()).limit(limit).all()
-    return projects
+    return project_list_adapter.dump_json(project_list_adapter.validate_python(projects, from_attributes=True))
 
-@router.get("/stats")
-async def get_site_stats(db: Session = Depends(get_db)):
-    total_projects = db.query(Project).filter(Project.is_published == True).count()
-    total_institutions = db.query(func.count(func.distinct(Project.institution))).filter(
-        Project.is_published == True,
-        Project.institution.isnot(None)
-    ).scalar()
-    total_research_areas = db.query(func.count(func.distinct(Project.research_area))).filter(
-        Project.is_published == True,
-        Project.research_area.isnot(None)
-    ).scalar()
-    total_downloads = db.query(func.sum(Project.download_count)).filter(
-        Project.is_published == True
-    ).scalar() or 0
-    total_views = db.query(func.sum(Project.view_count)).filter(
-        Project.is_published == True
-    ).scalar() or 0
+def render_site_stats(db: Session) -> bytes:
+    # One pass over published projects
+    stats = db.query(
+        func.count(Project.id),
+        func.count(func.distinct(Project.institution)),
+        func.count(func.distinct(Project.research_area)),
+        func.coalesce(func.sum(Project.download_count), 0),
+        func.coalesce(func.sum(Project.view_count), 0)
+    ).filter(Project.is_published == True).one()
     
-    return {
-        "total_projects": total_projects,
-        "total_institutions": total_institutions,
-        "total_research_areas": total_research_areas,
-        "total_downloads": total_downloads,
-        "total_views": total_views
-    }
+    return json.dumps({
+        "total_projects": stats[0],
+        "total_institutions": stats[1],
+        "total_research_areas": stats[2],
+        "total_downloads": int(stats[3]),
+        "total_views": int(stats[4])
+    }).encode()
 
-@router.get("/research-areas/list")
-async def get_research_areas(db: Session = Depends(get_db)):
-    areas = db.query(Project.research_area).filter(
-        Project.research_area.isnot(None),
+def render_distinct_values(db: Session, column) -> bytes:
+    values = db.query(column).filter(
+        column.isnot(None),
         Project.is_published == True
     ).distinct().all()
-    return [area[0] for area in areas if area[0]]
+    return json.dumps([value[0] for value in values if value[0]]).encode()
+
+@router.get("/featured", response_model=List[ProjectResponse])
+async def get_featured_projects(request: Request, limit: int = Query(6, ge=1, le=24), db: Session = Depends(get_db)):
+    return site_cache_response(request, ("featured", limit), lambda session: render_featured_projects(session, limit), db)
+
+@router.get("/stats")
+async def get_site_stats(request: Request, db: Session = Depends(get_db)):
+    return site_cache_response(request, ("stats",), render_site_stats, db)
+
+@router.get("/research-areas/list")
+async def get_research_areas(request: Request, db: Session = Depends(get_db)):
+    return site_cache_response(
+        request, ("research_areas",), lambda session: render_distinct_values(session, Project.research_area), db
+    )
 
 @router.get("/institutions/list")
-async def get_institutions(db: Session = Depends(get_db)):
-    institutions = db.query(Project.institution).filter(
-        Project.institution.isnot(None),
-        Project.is_published == True
-    ).distinct().all()
-    return [inst[0] for inst in institutions if inst[0]]
+async def get_institutions(request: Request, db: Session = Depends(get_db)):
+    return site_cache_response(
+        request, ("institutions",), lambda session: render_distinct_values(session, Project.institution), db
+    )
+
+@router.get("/facets")
+async def get_facets(
+    response: Response,
+    search: Optional[str] = None,
+    research_area: Optional[str] = None,
+    degree_type: Optional[str] = None,
+    institution: Optional[str] = None,
+    academic_year: Optional[str] = None,
+    keyword: Optional[str] = None,
+    scope: str = "metadata",
+    db: Session = Depends(get_db)
+):
+    """
+    Counts per research area, degree type, institution and academic year
+    
+    Takes the same filters and search scope as the project list. Each
+    facet is counted under the other active filters, so a selected
+    value's alternatives keep their counts. Results are cached per filter
+    signature.
+    """
+    if scope not in SEARCH_SCOPES:
+        raise HTTPException(status_code=400, detail=f"Invalid scope. Allowed: {', '.join(SEARCH_SCOPES)}")
+    filters = {
+        "research_area": research_area,
+        "degree_type": degree_type,
+        "institution": institution,
+        "academic_year": academic_year
+    }
+    search = normalize_search(search)
+    fulltext = scope == "fulltext" and bool(search)
+    cache_key = (search, "fulltext" if fulltext else "metadata", " ".join((keyword or "").split()).lower() or None, tuple(filters.values()))
+    
+    # Clears facet_cache when an admin edit has bumped the catalogue version
+    catalogue_version.current(db)
+    facets = facet_cache.get(cache_key)
+    if facets is None:
+        query = db.query(Project).filter(Project.is_published == True)
+        if fulltext:
+            query, _ = apply_fulltext_search(query, db, search)
+        elif search:
+            query, _ = apply_text_search(query, db, search)
+        if keyword:
+            query = query.filter(keyword_criterion(db, keyword))
+        facets = facet_counts(query, db, filters)
+        facet_cache.set(cache_key, facets)
+    
+    response.headers["Cache-Control"] = f"public, max-age={settings.FACET_CACHE_TTL_SECONDS}"
+    return facets
+
+@router.get("/keywords/cloud")
+async def get_keyword_cloud(
+    response: Response,
+    limit: int = 50,
+    research_area: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Most used keywords of published projects with their counts, for a keyword cloud"""
+    limit = max(1, min(limit, 200))
+    cache_key = ("keyword_cloud", limit, research_area)
+    
+    catalogue_version.current(db)
+    cloud = facet_cache.get(cache_key)
+    if cloud is None:
+        cloud = keyword_cloud(db, limit, research_area)
+        facet_cache.set(cache_key, cloud)
+    
+    response.headers["Cache-Control"] = f"public, max-age={settings.FACET_CACHE_TTL_SECONDS}"
+    return cloud
+
+@router.get("/suggest")
+async def suggest(
+    q: str = "",
+    limit: int = 8,
+    db: Session = Depends(get_db)
+):
+    """
+    Typeahead completions for titles, authors, supervisors and keywords
+    
+    Served from the in-memory suggest index, heaviest (most viewed) first.
+    Title completions carry the project's slug.
+    """
+    return suggest_index.suggest(db, q, max(1, min(limit, 20)))
 
 # Add endpoint to serve images
 @router.get("/{project_id}/images/{image_id}")
 async def get_project_image(
     project_id: int,
     image_id: int,
+    request: Request,
+    w: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Serve image from database"""
-    # Get image from database
-    image = db.query(ProjectImage).filter(
-        ProjectImage.id == image_id,
-        ProjectImage.project_id == project_id
-    ).first()
+    """
+    Serve image from database
     
-    if not image:
-        raise HTTPException(status_code=404, detail="Image not found")
+    ?w= selects a resized derivative: the narrowest one at least that wide.
+    AVIF/WebP encodings are served to clients that list them in Accept.
+    """
+    # An image's derivatives are memoised, so a hot thumbnail costs no query
+    # at all; the variant for w and Accept is picked from them in memory
+    cache_key = (project_id, image_id)
+    family = image_meta_cache.get(cache_key)
+    if family is None:
+        if not published_projects.contains(db, project_id):
+            raise HTTPException(status_code=404, detail="Project not found or not published")
+        
+        # One light query: image columns only (bytes are deferred), joined on the published flag
+        image = db.query(ProjectImage).join(
+            Project,
+            and_(Project.id == ProjectImage.project_id, Project.is_published == True)
+        ).filter(
+            ProjectImage.id == image_id,
+            ProjectImage.project_id == project_id
+        ).first()
+        
+        if not image:
+            raise HTTPException(status_code=404, detail="Image not found")
+        
+        family = load_image_family(db, image)
+        image_meta_cache.set(cache_key, family)
     
-    # Check if project is published
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.is_published == True
-    ).first()
-    
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found or not published")
-    
-    return Response(
-        content=image.image_data,
-        media_type=image.content_type,
-        headers={
-            "Cache-Control": "public, max-age=86400",
-            "Content-Disposition": f'inline; filename="{image.filename}"'
-        }
-    )
+    return image_response(db, request, select_image_variant(*family, w, request.headers.get("accept")))
 
 @router.get("/{slug}", response_model=ProjectResponse)
-async def get_project(slug: str, db: Session = Depends(get_db)):
+async def get_project(slug: str, request: Request, db: Session = Depends(get_db)):
     project = db.query(Project).filter(
         Project.slug == slug,
         Project.is_published == True
@@ -141,17 +503,63 @@ async def get_project(slug: str, db: Session = Depends(get_db)):
             detail="Project not found"
         )
     
-    # Increment view count
-    project.view_count = (project.view_count or 0) + 1
-    db.commit()
+    # Increment view count (written by the counter flush, not this request)
+    counter_buffer.add(project.id, views=1, visitor=visitor_hash(request))
     
     # Log to verify images are included
     logger.info(f"Project {slug} - Image records: {len(project.image_records) if project.image_records else 0}")
     
     return project
 
+@router.get("/{slug}/related")
+async def get_related_projects(
+    slug: str,
+    response: Response,
+    limit: int = 5,
+    db: Session = Depends(get_db)
+):
+    """
+    Published projects most similar to this one, closest first
+    
+    Neighbours are precomputed by the admin portal (TF-IDF over title,
+    abstract and keywords), so this is one lookup on project_similar's
+    primary key.
+    """
+    source = aliased(Project)
+    rows = db.query(
+        Project.id,
+        Project.title,
+        Project.slug,
+        Project.author_name,
+        Project.research_area,
+        Project.institution,
+        Project.academic_year,
+        ProjectSimilar.score
+    ).join(
+        ProjectSimilar, ProjectSimilar.similar_project_id == Project.id
+    ).join(
+        source, and_(source.id == ProjectSimilar.project_id, source.slug == slug, source.is_published == True)
+    ).filter(
+        Project.is_published == True
+    ).order_by(ProjectSimilar.rank).limit(max(1, min(limit, 20))).all()
+    
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "slug": row.slug,
+            "author_name": row.author_name,
+            "research_area": row.research_area,
+            "institution": row.institution,
+            "academic_year": row.academic_year,
+            "score": round(row.score, 4)
+        }
+        for row in rows
+    ]
+
 @router.get("/{project_slug}/view-document")
-async def view_project_document(project_slug: str, db: Session = Depends(get_db)):
+async def view_project_document(project_slug: str, request: Request, db: Session = Depends(get_db)):
     """Serve document for inline viewing in browser"""
     logger.info(f"📄 Serving document for viewing: {project_slug}")
     
@@ -161,28 +569,22 @@ async def view_project_document(project_slug: str, db: Session = Depends(get_db)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if not project.document_data:
-        raise HTTPException(status_code=404, detail="No document found for this project")
-    
-    # The document_data is already in binary format, not base64
-    file_data = project.document_data
-    
-    # Determine content type
     filename = project.document_filename or f"{project_slug}_document"
-    content_type = project.document_content_type or "application/octet-stream"
     
     # Return file with inline disposition for viewing in browser
-    return Response(
-        content=file_data,
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f'inline; filename="{filename}"',
-            "Content-Type": content_type,
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
+    response = document_response(
+        db,
+        project,
+        request,
+        "inline",
+        filename,
+        # Revalidate on every view so a replaced document shows up at once
+        {"Cache-Control": "public, no-cache"}
     )
+    if response is None:
+        raise HTTPException(status_code=404, detail="No document found for this project")
+    
+    return response
 
 @router.get("/{project_slug}/file-info")
 async def get_project_file_info(project_slug: str, db: Session = Depends(get_db)):
@@ -192,8 +594,8 @@ async def get_project_file_info(project_slug: str, db: Session = Depends(get_db)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    has_document = bool(project.document_data)
-    file_size = len(project.document_data) if has_document else 0
+    has_document = project.has_document
+    file_size = (project.document_size or 0) if has_document else 0
     
     return {
         "available": has_document,
@@ -203,7 +605,7 @@ async def get_project_file_info(project_slug: str, db: Session = Depends(get_db)
     }
 
 @router.get("/{slug}/download")
-async def download_document(slug: str, db: Session = Depends(get_db)):
+async def download_document(slug: str, request: Request, db: Session = Depends(get_db)):
     """Download project document from database"""
     project = db.query(Project).filter(
         Project.slug == slug,
@@ -216,41 +618,30 @@ async def download_document(slug: str, db: Session = Depends(get_db)):
             detail="Project not found"
         )
     
-    if not project.document_data:
+    filename = project.document_filename or f"{slug}_document"
+    
+    # Return file with attachment disposition
+    response = document_response(db, project, request, "attachment", filename)
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No document available for download"
         )
     
-    # Increment download count
-    project.download_count = (project.download_count or 0) + 1
-    db.commit()
+    # Count a download once: on the full response or the range that starts it
+    if response.status_code == 200 or response.headers.get("content-range", "").startswith("bytes 0-"):
+        counter_buffer.add(project.id, downloads=1)
     
-    # The document_data is already in binary format
-    file_data = project.document_data
-    
-    # Determine content type
-    filename = project.document_filename or f"{slug}_document"
-    content_type = project.document_content_type or "application/octet-stream"
-    
-    # Return file as streaming response with attachment disposition
-    return Response(
-        content=file_data,
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Content-Type": content_type
-        }
-    )
+    return response
 
 # Legacy endpoint for backward compatibility
 @router.post("/{slug}/download")
-async def download_project_post(slug: str, db: Session = Depends(get_db)):
+async def download_project_post(slug: str, request: Request, db: Session = Depends(get_db)):
     """Legacy POST endpoint for download - redirects to GET"""
-    return await download_document(slug, db)
+    return await download_document(slug, request, db)
 
 @router.patch("/{slug}/increment-view")
-async def increment_project_view(slug: str, db: Session = Depends(get_db)):
+async def increment_project_view(slug: str, request: Request, db: Session = Depends(get_db)):
     """Increment project view counter (for AJAX calls)"""
     project = db.query(Project).filter(
         Project.slug == slug,
@@ -263,19 +654,10 @@ async def increment_project_view(slug: str, db: Session = Depends(get_db)):
             detail="Project not found"
         )
     
-    # Increment view counter
-    project.view_count = (project.view_count or 0) + 1
-    
-    try:
-        db.commit()
-        return {
-            "message": "View count incremented", 
-            "view_count": project.view_count,
-            "slug": project.slug
-        }
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update view count"
-        )
+    # Increment view counter; the count includes views not yet flushed by this worker
+    counter_buffer.add(project.id, views=1, visitor=visitor_hash(request))
+    return {
+        "message": "View count incremented", 
+        "view_count": (project.view_count or 0) + counter_buffer.pending(project.id)[0],
+        "slug": project.slug
+    }
@@ -11,8 +11,13 @@ router = APIRouter()
 async def generate_sitemap(db: Session = Depends(get_db)):
     base_url = "https://uhas-research-hub.onrender.com"  
     
-    # Get all published projects
-    projects = db.query(Project).filter(Project.is_published == True).all()
+    # Get all published projects (only the columns the sitemap needs)
+    projects = db.query(
+        Project.slug,
+        Project.created_at,
+        Project.updated_at,
+        Project.document_filename
+    ).filter(Project.is_published == True).all()
     
     sitemap_xml = f'''<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
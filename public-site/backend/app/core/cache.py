@@ -0,0 +1,459 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+from .config import settings
+from .http_cache import make_etag
+
+logger = logging.getLogger(__name__)
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache of bytes values, bounded by their total size
+    
+    Entries expire after ttl_seconds. Values above max_entry_bytes are never
+    cached, so one large document cannot flush the hot images. Keys should
+    include the content hash, so replaced content is a miss rather than a
+    stale hit.
+    """
+    
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl_seconds: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: bytes) -> bool:
+        """Cache a value; returns False when it is too large to be cached"""
+        size = len(value)
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+        return True
+    
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._size = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+    
+    def _remove(self, key: Hashable) -> None:
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+class TTLCache:
+    """
+    Thread-safe LRU of small values with a fixed TTL, bounded by entry count
+    
+    Used for metadata, where staleness is bounded by the TTL rather than
+    by content-hash keys.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+class PublishedProjectIds:
+    """
+    In-memory set of published project ids
+    
+    Reloaded every ttl_seconds. An unknown id also triggers a reload, at most
+    every min_refresh_seconds, so a newly published project shows up at once
+    while bogus ids cannot hammer the database.
+    """
+    
+    def __init__(self, ttl_seconds: int, min_refresh_seconds: int = 5):
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self._ids: Optional[FrozenSet[int]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.refreshes = 0
+    
+    def contains(self, db: Any, project_id: int) -> bool:
+        ids = self._ids
+        if self._needs_refresh(ids, project_id):
+            with self._lock:
+                # Concurrent callers queue here; only the first one reloads
+                ids = self._ids
+                if self._needs_refresh(ids, project_id):
+                    ids = self._load(db)
+        return project_id in ids
+    
+    def refresh(self, db: Any) -> FrozenSet[int]:
+        with self._lock:
+            return self._load(db)
+    
+    def _needs_refresh(self, ids: Optional[FrozenSet[int]], project_id: int) -> bool:
+        age = time.monotonic() - self._loaded_at
+        if ids is None or age > self.ttl_seconds:
+            return True
+        return project_id not in ids and age > self.min_refresh_seconds
+    
+    def _load(self, db: Any) -> FrozenSet[int]:
+        # Called with _lock held
+        from ..models.project import Project
+        
+        ids = frozenset(
+            project_id for (project_id,) in db.query(Project.id).filter(Project.is_published == True)
+        )
+        self._ids = ids
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+        return ids
+    
+    def invalidate(self) -> None:
+        with self._lock:
+            self._ids = None
+    
+    def stats(self) -> Dict[str, Any]:
+        ids = self._ids
+        return {
+            "published_projects": len(ids) if ids is not None else None,
+            "ttl_seconds": self.ttl_seconds,
+            "refreshes": self.refreshes
+        }
+
+class CatalogueVersionWatcher:
+    """
+    This worker's view of catalogue_version, the counter the admin portal
+    bumps whenever public content changes
+    
+    Re-read at most every check_seconds (a primary key lookup); when it
+    has moved, the registered on_change callbacks drop derived state.
+    Result caches include the version in their keys.
+    """
+    
+    def __init__(self, check_seconds: int):
+        self.check_seconds = check_seconds
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], Any]] = []
+        self.checks = 0
+        self.changes = 0
+    
+    def on_change(self, callback: Callable[[], Any]) -> None:
+        self._callbacks.append(callback)
+    
+    def current(self, db: Any) -> int:
+        if self._version is not None and time.monotonic() - self._checked_at <= self.check_seconds:
+            return self._version
+        
+        from ..models.project import CatalogueVersion
+        
+        version = db.query(CatalogueVersion.version).filter(CatalogueVersion.id == 1).scalar() or 0
+        with self._lock:
+            changed = self._version is not None and version != self._version
+            self._version = version
+            self._checked_at = time.monotonic()
+            self.checks += 1
+            if changed:
+                self.changes += 1
+        if changed:
+            for callback in self._callbacks:
+                callback()
+        return version
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._version,
+            "check_seconds": self.check_seconds,
+            "checks": self.checks,
+            "changes": self.changes
+        }
+
+class StaleWhileRevalidateCache:
+    """
+    Rendered responses that are fine to serve slightly stale
+    
+    An entry is fresh for ttl_seconds, then served stale for up to
+    stale_seconds more while one background thread recomputes it with its
+    own session. Only a miss, or an entry past both windows, is computed
+    in the request - once per key: concurrent requests for the same key
+    wait for that result instead of running the query again.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: int, stale_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, str, float]]" = OrderedDict()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+    
+    def get(self, key: Hashable, compute: Callable[[Any], bytes], db: Any) -> Tuple[bytes, str]:
+        """(body, etag) for key; compute(db) renders the body on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                body, etag, computed_at = entry
+                age = time.monotonic() - computed_at
+                if age <= self.ttl_seconds:
+                    self.hits += 1
+                    return body, etag
+                if age <= self.ttl_seconds + self.stale_seconds:
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh, args=(key, compute), name="swr-refresh", daemon=True
+                        ).start()
+                    return body, etag
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        try:
+            with key_lock:
+                with self._lock:
+                    # Filled by whoever held the lock before us
+                    entry = self._entries.get(key)
+                    if entry is not None and time.monotonic() - entry[2] <= self.ttl_seconds:
+                        self.hits += 1
+                        return entry[0], entry[1]
+                    self.misses += 1
+                return self._store(key, compute(db))
+        finally:
+            # Kept while another request still holds it; later requests find the fresh entry
+            self._release_key_lock(key)
+    
+    def _refresh(self, key: Hashable, compute: Callable[[Any], bytes]) -> None:
+        from ..database import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            self._store(key, compute(db))
+            self.refreshes += 1
+        except Exception as e:
+            # Keep serving the stale entry; the next stale hit retries
+            self.failures += 1
+            logger.error(f"❌ Background refresh of {key!r} failed: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._refreshing.discard(key)
+            self._release_key_lock(key)
+    
+    def _release_key_lock(self, key: Hashable) -> None:
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is not None and not key_lock.locked():
+                del self._key_locks[key]
+    
+    def _store(self, key: Hashable, body: bytes) -> Tuple[bytes, str]:
+        etag = make_etag(hashlib.sha256(body).hexdigest())
+        with self._lock:
+            self._entries[key] = (body, etag, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+        return body, etag
+    
+    def expire(self) -> None:
+        """Mark every entry stale: still served, but refreshed on its next hit"""
+        stale_at = time.monotonic() - self.ttl_seconds - 1
+        with self._lock:
+            for key, (body, etag, _) in self._entries.items():
+                self._entries[key] = (body, etag, stale_at)
+    
+    def cache_control(self) -> str:
+        """Cache-Control letting browsers and CDNs apply the same fresh and stale windows"""
+        return f"public, max-age={self.ttl_seconds}, stale-while-revalidate={self.stale_seconds}"
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            refreshing = len(self._refreshing)
+        return {
+            "entries": entries,
+            "refreshing": refreshing,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "failures": self.failures
+        }
+
+# Bytes of database-held images and small documents
+blob_cache = ByteLRUCache(
+    max_bytes=settings.BLOB_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.BLOB_CACHE_MAX_ENTRY_BYTES,
+    ttl_seconds=settings.BLOB_CACHE_TTL_SECONDS
+)
+
+# Image and derivative metadata per image, so a hot thumbnail costs no query at all
+image_meta_cache = TTLCache(
+    max_entries=settings.IMAGE_META_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.IMAGE_META_CACHE_TTL_SECONDS
+)
+
+# Facet counts per filter signature
+facet_cache = TTLCache(
+    max_entries=settings.FACET_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.FACET_CACHE_TTL_SECONDS
+)
+
+published_projects = PublishedProjectIds(ttl_seconds=settings.PUBLISHED_IDS_TTL_SECONDS)
+
+# Serialized project list/search responses, keyed by catalogue version and filters
+search_cache = ByteLRUCache(
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.SEARCH_CACHE_MAX_ENTRY_BYTES,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS
+)
+
+catalogue_version = CatalogueVersionWatcher(check_seconds=settings.CATALOGUE_VERSION_CHECK_SECONDS)
+
+# Homepage stats, filter option lists and featured projects
+site_cache = StaleWhileRevalidateCache(
+    max_entries=settings.SITE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SITE_CACHE_TTL_SECONDS,
+    stale_seconds=settings.SITE_CACHE_STALE_SECONDS
+)
+
+# Entries from older versions can never be hit again; metadata caches
+# without the version in their keys would otherwise serve it until their TTL
+catalogue_version.on_change(search_cache.clear)
+catalogue_version.on_change(facet_cache.clear)
+catalogue_version.on_change(image_meta_cache.clear)
+catalogue_version.on_change(published_projects.invalidate)
+# Site-wide pages are expensive to recompute cold; serve them stale while they refresh
+catalogue_version.on_change(site_cache.expire)
+
+def image_cache_key(image: Any) -> Tuple:
+    """(kind, project id, image id, variant id, content hash) for an image or one of its derivatives"""
+    return ("image", image.project_id, image.parent_id or image.id, image.id, image.sha256)
+
+def document_cache_key(document: Any) -> Tuple:
+    return ("document", document.project_id, document.sha256)
+
+def invalidate_project(project_id: int) -> int:
+    """Drop all cached bytes of a project's images and document"""
+    return blob_cache.invalidate_where(lambda key: key[1] == project_id)
@@ -15,6 +15,34 @@ class Settings(BaseSettings):
     
     # Storage Backend
     STORAGE_BACKEND: str = "database"  # Changed from supabase
+    BLOB_STORE_PATH: str = "blobstore"  # Root of the admin portal's local blob store
+    
+    # In-process cache of hot image/document bytes
+    BLOB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64MB per worker
+    BLOB_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024  # Larger blobs are always streamed
+    BLOB_CACHE_TTL_SECONDS: int = 3600
+    IMAGE_META_CACHE_MAX_ENTRIES: int = 10000
+    IMAGE_META_CACHE_TTL_SECONDS: int = 60  # How long a deleted/unpublished image may still be served
+    PUBLISHED_IDS_TTL_SECONDS: int = 60
+    FACET_CACHE_MAX_ENTRIES: int = 1000
+    FACET_CACHE_TTL_SECONDS: int = 60  # Also the max-age sent to browsers and CDNs
+    SUGGEST_REFRESH_SECONDS: int = 30  # How long a publish/unpublish takes to reach suggestions
+    
+    # View/download increments are buffered per worker and written in batches
+    COUNTER_FLUSH_SECONDS: float = 5.0
+    COUNTER_MAX_PENDING: int = 1000  # Projects with pending increments that trigger an early flush
+    TRUSTED_PROXY_COUNT: int = 1  # Proxies in front of the app that append to X-Forwarded-For; 0 when exposed directly
+    
+    # Project list/search responses, invalidated by the admin portal's catalogue version
+    SEARCH_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # 32MB per worker
+    SEARCH_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+    SEARCH_CACHE_TTL_SECONDS: int = 300  # Bounds staleness of view/download counts in cached pages
+    CATALOGUE_VERSION_CHECK_SECONDS: int = 2  # How long an admin edit may take to reach cached results
+    
+    # Homepage stats, filter lists and featured projects: served stale while refreshed in the background
+    SITE_CACHE_MAX_ENTRIES: int = 256
+    SITE_CACHE_TTL_SECONDS: int = 300  # Also the max-age sent to browsers and CDNs
+    SITE_CACHE_STALE_SECONDS: int = 3600  # How long past the TTL an entry may still be served
     
     # File Upload (Legacy - kept for backward compatibility)
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
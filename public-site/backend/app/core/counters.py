@@ -0,0 +1,201 @@
+import logging
+import threading
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, bindparam, column, func, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .config import settings
+from .hll import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+class CounterBuffer:
+    """
+    Per-worker buffer of view/download increments, flushed in batches
+    
+    Request handlers only add to an in-memory delta per project; a daemon
+    thread writes all pending deltas every flush_seconds (sooner once
+    max_pending projects are waiting) as one
+    UPDATE ... FROM (VALUES ...) with count = count + delta, plus one
+    upsert into project_events_daily in the same transaction, so the
+    lifetime totals and the daily buckets never drift apart. Increments
+    are never lost to read-modify-write races, hot rows see one write per
+    interval, and a failed flush keeps its deltas for the next one.
+    updated_at is left alone: a view is not an edit.
+    
+    Hashed visitor fingerprints go into a HyperLogLog sketch per project
+    and day, merged into the stored sketch under a row lock at flush.
+    """
+    
+    def __init__(self, flush_seconds: float, max_pending: int):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[int, date], List[int]] = {}
+        self._visitors: Dict[Tuple[int, date], HyperLogLog] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failures = 0
+    
+    def add(self, project_id: int, views: int = 0, downloads: int = 0, visitor: Optional[int] = None) -> None:
+        """Count views/downloads; visitor is the 64-bit hash of who viewed, if they count as a unique viewer"""
+        # Bucket by the UTC day the event happened, not the day it is flushed
+        key = (project_id, datetime.now(timezone.utc).date())
+        with self._lock:
+            delta = self._pending.setdefault(key, [0, 0])
+            delta[0] += views
+            delta[1] += downloads
+            if visitor is not None:
+                self._visitors.setdefault(key, HyperLogLog()).add_hash(visitor)
+            pending = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="counter-flush", daemon=True)
+                self._thread.start()
+        if pending >= self.max_pending:
+            self._wake.set()
+    
+    def pending(self, project_id: int) -> Tuple[int, int]:
+        """(views, downloads) of a project not yet written by this worker"""
+        with self._lock:
+            deltas = [delta for (pending_id, _), delta in self._pending.items() if pending_id == project_id]
+        return sum(delta[0] for delta in deltas), sum(delta[1] for delta in deltas)
+    
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+    
+    def flush(self) -> int:
+        """Write all pending deltas in one transaction; returns the number of projects updated"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            sketches, self._visitors = self._visitors, {}
+        # Rows are locked in (project_id, date) order, the same in every
+        # worker, so overlapping flushes queue behind each other instead of
+        # deadlocking
+        days = sorted(
+            (key, views, downloads) for key, (views, downloads) in batch.items() if views or downloads
+        )
+        if not days:
+            return 0
+        
+        from ..database import engine
+        from ..models.project import Project, ProjectEventDaily
+        
+        projects = Project.__table__
+        events = ProjectEventDaily.__table__
+        rows = []
+        try:
+            with engine.begin() as conn:
+                # Views of a project deleted since are dropped, not retried
+                # Locked here, in id order: the UPDATE below may join its VALUES in any order
+                existing = set(conn.execute(
+                    select(projects.c.id).where(
+                        projects.c.id.in_({project_id for (project_id, _), _, _ in days})
+                    ).order_by(projects.c.id).with_for_update()
+                ).scalars())
+                days = [entry for entry in days if entry[0][0] in existing]
+                if not days:
+                    return 0
+                totals: Dict[int, List[int]] = {}
+                for (project_id, _), views, downloads in days:
+                    total = totals.setdefault(project_id, [0, 0])
+                    total[0] += views
+                    total[1] += downloads
+                rows = [(project_id, views, downloads) for project_id, (views, downloads) in sorted(totals.items())]
+                
+                if conn.dialect.name == "postgresql":
+                    deltas = values(
+                        column("project_id", Integer), column("views", Integer), column("downloads", Integer), name="deltas"
+                    ).data(rows)
+                    conn.execute(update(projects).where(projects.c.id == deltas.c.project_id).values(
+                        view_count=func.coalesce(projects.c.view_count, 0) + deltas.c.views,
+                        download_count=func.coalesce(projects.c.download_count, 0) + deltas.c.downloads,
+                        updated_at=projects.c.updated_at
+                    ))
+                else:
+                    # SQLite cannot alias VALUES columns; one executemany instead
+                    conn.execute(update(projects).where(projects.c.id == bindparam("project_id")).values(
+                        view_count=func.coalesce(projects.c.view_count, 0) + bindparam("views"),
+                        download_count=func.coalesce(projects.c.download_count, 0) + bindparam("downloads"),
+                        updated_at=projects.c.updated_at
+                    ), [{"project_id": p, "views": v, "downloads": d} for p, v, d in rows])
+                
+                insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+                stmt = insert(ProjectEventDaily).values([
+                    {"project_id": project_id, "date": day, "views": views, "downloads": downloads}
+                    for (project_id, day), views, downloads in days
+                ])
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=["project_id", "date"],
+                    set_={
+                        "views": ProjectEventDaily.views + stmt.excluded.views,
+                        "downloads": ProjectEventDaily.downloads + stmt.excluded.downloads
+                    }
+                ))
+                
+                keys = [key for key, _, _ in days if key in sketches]
+                if keys:
+                    # The upsert above already holds these rows; FOR UPDATE makes the read explicit
+                    stored = conn.execute(
+                        select(events.c.project_id, events.c.date, events.c.visitors_hll).where(
+                            tuple_(events.c.project_id, events.c.date).in_(keys)
+                        ).with_for_update()
+                    ).all()
+                    merged = {
+                        (project_id, day): HyperLogLog.from_bytes(data).merge(sketches[(project_id, day)])
+                        for project_id, day, data in stored
+                    }
+                    conn.execute(update(events).where(
+                        events.c.project_id == bindparam("b_project_id"),
+                        events.c.date == bindparam("b_date")
+                    ).values(
+                        visitors=bindparam("b_visitors"),
+                        visitors_hll=bindparam("b_visitors_hll")
+                    ), [
+                        {
+                            "b_project_id": project_id,
+                            "b_date": day,
+                            "b_visitors": sketch.count(),
+                            "b_visitors_hll": sketch.to_bytes()
+                        } for (project_id, day), sketch in merged.items()
+                    ])
+        except Exception as e:
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                for key, views, downloads in days:
+                    delta = self._pending.setdefault(key, [0, 0])
+                    delta[0] += views
+                    delta[1] += downloads
+                    if key in sketches:
+                        # Merging is idempotent, so a sketch already merged with the stored one is safe to retry
+                        self._visitors.setdefault(key, HyperLogLog()).merge(sketches[key])
+            self.failures += 1
+            logger.error(f"❌ Counter flush failed for {len(days)} project-days: {e}")
+            return 0
+        
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+        return len(rows)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len({project_id for project_id, _ in self._pending})
+        return {
+            "pending_projects": pending,
+            "flush_seconds": self.flush_seconds,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failures": self.failures
+        }
+
+counter_buffer = CounterBuffer(
+    flush_seconds=settings.COUNTER_FLUSH_SECONDS,
+    max_pending=settings.COUNTER_MAX_PENDING
+)
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+def format_http_date(value: datetime) -> str:
+    """Format a datetime as an IMF-fixdate for Last-Modified and friends"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def make_etag(sha256: Optional[str]) -> Optional[str]:
+    """Strong entity tag from a stored content hash"""
+    return f'"{sha256}"' if sha256 else None
+
+def validator_headers(etag: Optional[str], last_modified: Optional[datetime]) -> Dict[str, str]:
+    """ETag and Last-Modified headers for a representation"""
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    return headers
+
+def accepts_media_type(accept: Optional[str], media_type: str) -> bool:
+    """
+    Whether an Accept header explicitly lists media_type with a non-zero q
+    
+    Wildcards do not count: clients that send only */* are served the
+    stored format.
+    """
+    if not accept:
+        return False
+    for item in accept.split(","):
+        parts = [part.strip() for part in item.split(";")]
+        if parts[0].lower() != media_type:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        return q > 0
+    return False
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since for a GET
+    
+    If-None-Match takes precedence and uses weak comparison; If-Modified-Since
+    is only consulted when no If-None-Match was sent (RFC 9110 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if not etag:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        opaque = etag[2:] if etag.startswith("W/") else etag
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == opaque:
+                return True
+        return False
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return int(last_modified.timestamp()) <= int(since.timestamp())
+    
+    return False
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """304 carrying the validators and caching headers a 200 would have sent"""
+    return Response(status_code=304, headers=headers)
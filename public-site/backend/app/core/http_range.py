@@ -0,0 +1,76 @@
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+_BYTE_RANGE = re.compile(r"^(\d*)-(\d*)$")
+
+def range_not_satisfiable(size: int, detail: str) -> HTTPException:
+    """416 response carrying the resource size, as RFC 9110 asks for"""
+    return HTTPException(
+        status_code=416,
+        detail=detail,
+        headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"}
+    )
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header against a resource of the given size
+    
+    Returns an inclusive (start, end) pair, or None when the whole resource
+    should be sent (no header, another unit, a malformed value, or several
+    ranges, which are not supported). A range that starts past the end of
+    the resource raises 416.
+    """
+    if not range_header:
+        return None
+    
+    unit, _, ranges = range_header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or not ranges:
+        return None
+    if "," in ranges:
+        # Ignoring the header is allowed; 416 is only for unsatisfiable ranges
+        return None
+    
+    match = _BYTE_RANGE.match(ranges.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    
+    if first == "":
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise range_not_satisfiable(size, "Requested range not satisfiable")
+        return max(size - int(last), 0), size - 1
+    
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise range_not_satisfiable(size, "Requested range not satisfiable")
+    return start, min(end, size - 1)
+
+def if_range_matches(if_range: Optional[str], etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Check an If-Range precondition; a mismatch means the full resource is sent
+    
+    Entity tags use strong comparison, so weak tags never match. Dates only
+    match the exact Last-Modified second.
+    """
+    if not if_range:
+        return True
+    
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    
+    if last_modified is None:
+        return False
+    try:
+        date = parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+    return int(date.timestamp()) == int(last_modified.timestamp())
@@ -0,0 +1,110 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, func, literal, tuple_
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models.project import Project
+
+# How totals are reported: a COUNT(*) over the filters, the planner's row
+# estimate (one EXPLAIN, no scan), or not at all
+COUNT_MODES = ("exact", "estimate", "none")
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """Opaque token for the position after a row with this sort key value and id"""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """
+    (sort key value, id) from a cursor token
+    
+    Raises 400 for a malformed token, or one issued for a different ordering
+    (e.g. a relevance cursor replayed without the search).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, last_id = payload["v"], int(payload["id"])
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        cursor_sort = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match this query's ordering")
+    return value, last_id
+
+def paginate(
+    query: Query,
+    sort: str,
+    sort_key: ColumnElement,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of a Project query ordered by sort_key desc, then id desc
+    
+    With a cursor the page starts right after the row it names (a keyset
+    seek, so deep pages cost the same as the first and rows inserted
+    meanwhile neither shift nor repeat results); otherwise skip rows are
+    skipped as before. sort_key must not be NULL. Returns the rows, as the
+    query would have returned them, and the cursor of the next page (None
+    on the last page).
+    """
+    if isinstance(sort_key.type, DateTime) and query.session.get_bind().dialect.name == "sqlite":
+        # SQLite keeps datetimes as text, with or without microseconds
+        # (CURRENT_TIMESTAMP defaults have none); order and seek on one form
+        sort_key = func.strftime("%Y-%m-%d %H:%M:%f", sort_key)
+    
+    query = query.order_by(sort_key.desc(), Project.id.desc())
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        # Bound with the key's type, so the value is compared in the column's stored form
+        query = query.filter(tuple_(sort_key, Project.id) < tuple_(literal(value, type_=sort_key.type), last_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    # One extra row tells whether there is a next page
+    rows = query.add_columns(sort_key).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1][-1], rows[-1][0].id)
+    items = [row[0] if len(row) == 2 else tuple(row[:-1]) for row in rows]
+    return items, next_cursor
+
+def estimate_count(db: Session, query: Query) -> int:
+    """
+    The planner's estimate of a query's row count
+    
+    Read from EXPLAIN, so it costs a plan rather than a scan; accurate to
+    the freshness of the table statistics. Other databases get an exact
+    count.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.count()
+    
+    compiled = query.statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def count_rows(db: Session, query: Query, count: str) -> Tuple[Optional[int], bool]:
+    """(total, is_estimate) for a query under one of COUNT_MODES"""
+    if count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid count mode. Allowed: {', '.join(COUNT_MODES)}")
+    if count == "none":
+        return None, False
+    if count == "estimate":
+        return estimate_count(db, query), db.get_bind().dialect.name == "postgresql"
+    return query.count(), False
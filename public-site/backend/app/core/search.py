@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, cast, func, null, or_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models.project import Keyword, Project, ProjectDocumentText, ProjectKeyword
+
+# Text search configuration; must match the one used by the projects_search_vector trigger
+SEARCH_CONFIG = "english"
+
+# Search scopes: project metadata only, or metadata plus document contents
+SEARCH_SCOPES = ("metadata", "fulltext")
+
+# Page numbers reported per project for a full-text match
+MAX_PAGE_HITS = 20
+
+# Filter sidebar facets: name (also the query parameter) -> column
+FACET_COLUMNS = {
+    "research_area": Project.research_area,
+    "degree_type": Project.degree_type,
+    "institution": Project.institution,
+    "academic_year": Project.academic_year
+}
+
+def is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def apply_text_search(query: Query, db: Session, text: str) -> Tuple[Query, Optional[ColumnElement]]:
+    """
+    Filter a Project query by a free-text search
+    
+    On PostgreSQL the weighted search_vector is matched with
+    websearch_to_tsquery (quoted phrases, OR, -exclusions) through its GIN
+    index. Other databases (local SQLite) fall back to substring matching.
+    Returns the query and a relevance expression to order by (None without
+    PostgreSQL); ordering is left to the caller's pagination.
+    """
+    text = text.strip()
+    if not text:
+        return query, None
+    
+    if is_postgres(db):
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+        query = query.filter(Project.search_vector.op("@@")(ts_query))
+        return query, _as_double(func.ts_rank(Project.search_vector, ts_query))
+    
+    pattern = f"%{text}%"
+    return query.filter(
+        or_(
+            Project.title.ilike(pattern),
+            Project.abstract.ilike(pattern),
+            Project.author_name.ilike(pattern),
+            Project.keywords.ilike(pattern)
+        )
+    ), None
+
+def apply_fulltext_search(query: Query, db: Session, text: str) -> Tuple[Query, Optional[ColumnElement]]:
+    """
+    Filter a Project query by metadata or document contents (scope=fulltext)
+    
+    Rows come back as (Project, page_hits) tuples, page_hits being the
+    matching page numbers in page order (None for metadata-only matches).
+    The relevance expression is metadata rank plus best page rank. Other
+    databases fall back to the metadata search, without page hits.
+    """
+    text = text.strip()
+    if not text:
+        return query.add_columns(null()), None
+    if not is_postgres(db):
+        query, rank = apply_text_search(query, db, text)
+        return query.add_columns(null()), rank
+    
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    page_hits = db.query(
+        ProjectDocumentText.project_id.label("project_id"),
+        func.max(func.ts_rank(ProjectDocumentText.search_vector, ts_query)).label("rank"),
+        func.array_agg(
+            aggregate_order_by(ProjectDocumentText.page_number, ProjectDocumentText.page_number)
+        ).label("pages")
+    ).filter(
+        ProjectDocumentText.search_vector.op("@@")(ts_query)
+    ).group_by(ProjectDocumentText.project_id).subquery()
+    
+    metadata_match = Project.search_vector.op("@@")(ts_query)
+    rank = func.coalesce(func.ts_rank(Project.search_vector, ts_query), 0) + func.coalesce(page_hits.c.rank, 0)
+    query = query.outerjoin(
+        page_hits, page_hits.c.project_id == Project.id
+    ).filter(
+        or_(metadata_match, page_hits.c.project_id.isnot(None))
+    ).add_columns(page_hits.c.pages)
+    return query, _as_double(rank)
+
+def _as_double(rank: ColumnElement) -> ColumnElement:
+    # ts_rank is a float4; as a double its text form round-trips exactly, so
+    # a rank carried in a pagination cursor compares equal to the row's own
+    return cast(rank, Float(precision=53))
+
+def attach_page_hits(rows) -> List[Project]:
+    """Unpack (Project, page_hits) rows, setting project.page_hits for the response"""
+    projects = []
+    for project, pages in rows:
+        project.page_hits = list(pages or [])[:MAX_PAGE_HITS]
+        projects.append(project)
+    return projects
+
+def normalize_search(text: Optional[str]) -> Optional[str]:
+    """A search string as cache keys compare it: lowercased, whitespace collapsed, None when empty"""
+    return " ".join((text or "").split()).lower() or None
+
+def normalize_keyword(text: str) -> str:
+    """The form keywords are stored in: lowercased, whitespace collapsed"""
+    return " ".join(text.split()).lower()
+
+def keyword_criterion(db: Session, keyword: str) -> ColumnElement:
+    """Projects tagged with exactly this keyword, through the project_keywords index"""
+    return Project.id.in_(
+        db.query(ProjectKeyword.project_id).join(
+            Keyword, Keyword.id == ProjectKeyword.keyword_id
+        ).filter(Keyword.name == normalize_keyword(keyword))
+    )
+
+def keyword_cloud(db: Session, limit: int, research_area: Optional[str] = None) -> List[Dict]:
+    """The most used keywords of published projects, with their project counts"""
+    query = db.query(
+        Keyword.name, Keyword.label, func.count(ProjectKeyword.project_id).label("count")
+    ).join(
+        ProjectKeyword, ProjectKeyword.keyword_id == Keyword.id
+    ).join(
+        Project, and_(Project.id == ProjectKeyword.project_id, Project.is_published == True)
+    )
+    if research_area:
+        query = query.filter(Project.research_area == research_area)
+    rows = query.group_by(Keyword.id, Keyword.name, Keyword.label).order_by(
+        func.count(ProjectKeyword.project_id).desc(), Keyword.name
+    ).limit(limit).all()
+    return [{"keyword": row.label, "name": row.name, "count": row.count} for row in rows]
+
+def facet_counts(query: Query, db: Session, filters: Dict[str, Optional[str]]) -> Dict[str, List[Dict]]:
+    """
+    Project counts per value of each facet in FACET_COLUMNS
+    
+    query is the already searched and published-only base. Each facet is
+    counted under every active filter except its own, so the sidebar still
+    offers the alternatives to a selected value. On PostgreSQL this is a
+    single scan: GROUPING SETS over the facet columns, with one
+    count(*) FILTER per facet. Other databases run one GROUP BY per facet.
+    """
+    criteria = {name: FACET_COLUMNS[name] == value for name, value in filters.items() if value}
+    
+    def count_for(name: str) -> ColumnElement:
+        others = [criterion for other, criterion in criteria.items() if other != name]
+        count = func.count()
+        return count.filter(and_(*others)) if others else count
+    
+    facets = {name: [] for name in FACET_COLUMNS}
+    if is_postgres(db):
+        columns = list(FACET_COLUMNS.values())
+        rows = query.with_entities(
+            *columns,
+            *(func.grouping(column) for column in columns),
+            *(count_for(name) for name in FACET_COLUMNS)
+        ).group_by(func.grouping_sets(*columns)).all()
+        width = len(columns)
+        for row in rows:
+            # grouping() is 0 for the column this row is grouped by
+            index = list(row[width:2 * width]).index(0)
+            value, count = row[index], row[2 * width + index]
+            if value is not None and count:
+                facets[list(FACET_COLUMNS)[index]].append({"value": value, "count": count})
+    else:
+        for name, column in FACET_COLUMNS.items():
+            rows = query.with_entities(column, count_for(name)).group_by(column).all()
+            facets[name] = [{"value": value, "count": count} for value, count in rows if value is not None and count]
+    
+    for values in facets.values():
+        values.sort(key=lambda facet: (-facet["count"], facet["value"]))
+    return facets
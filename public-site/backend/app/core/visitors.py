@@ -0,0 +1,39 @@
+import re
+from typing import Optional
+
+from fastapi import Request
+
+from .config import settings
+from .hll import hash_value
+
+# User agents that never count as unique viewers
+CRAWLER_PATTERN = re.compile(
+    r"bot|crawl|spider|slurp|archiver|facebookexternalhit|embedly|preview|headless|curl|wget|python-requests|httpx",
+    re.IGNORECASE
+)
+
+def client_ip(request: Request) -> str:
+    """
+    Client address as seen by the outermost trusted proxy
+    
+    Each proxy appends the address it received from, so the hop
+    TRUSTED_PROXY_COUNT places from the right is the first one a client
+    cannot forge; anything left of it is whatever the client sent.
+    """
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if settings.TRUSTED_PROXY_COUNT > 0 and hops:
+        return hops[-min(settings.TRUSTED_PROXY_COUNT, len(hops))]
+    return request.client.host if request.client else ""
+
+def visitor_hash(request: Request) -> Optional[int]:
+    """
+    64-bit hash of the client address and user agent, for unique-viewer sketches
+    
+    None for crawlers and clients that send no user agent. Only the hash
+    ever reaches a sketch, and a sketch keeps no more than its leading
+    zero count.
+    """
+    user_agent = request.headers.get("user-agent", "")
+    if not user_agent or CRAWLER_PATTERN.search(user_agent):
+        return None
+    return hash_value(f"{client_ip(request)}|{user_agent}")
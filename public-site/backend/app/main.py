@@ -6,6 +6,9 @@ import os
 from .api import projects, sitemap
 from .database import engine
 from .models.base import Base
+from .core.cache import blob_cache, catalogue_version, facet_cache, image_meta_cache, published_projects, search_cache, site_cache
+from .core.counters import counter_buffer
+from .services.suggest_index import suggest_index
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -23,12 +26,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
 app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
 app.include_router(sitemap.router, prefix="/api", tags=["sitemap"])
 
+@app.on_event("startup")
+async def build_suggest_index():
+    """Load the suggest index before the first keystroke arrives"""
+    from .database import SessionLocal
+    db = SessionLocal()
+    try:
+        suggest_index.sync(db)
+    finally:
+        db.close()
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -38,6 +52,21 @@ async def health_check():
         "description": "Images and documents are served from database"
     }
 
+@app.get("/api/metrics/cache")
+async def cache_metrics():
+    """Hit/miss/eviction counters of this worker's in-process caches"""
+    return {
+        "blob_cache": blob_cache.stats(),
+        "image_meta_cache": image_meta_cache.stats(),
+        "facet_cache": facet_cache.stats(),
+        "search_cache": search_cache.stats(),
+        "site_cache": site_cache.stats(),
+        "catalogue_version": catalogue_version.stats(),
+        "suggest_index": suggest_index.stats(),
+        "published_projects": published_projects.stats(),
+        "counters": counter_buffer.stats()
+    }
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -66,6 +95,11 @@ async def startup_event():
     print("API Docs: /docs")
     print("=" * 60)
 
+@app.on_event("shutdown")
+async def flush_counters():
+    """Write buffered view/download counts before the worker exits"""
+    counter_buffer.flush()
+
 # Optional: Add debug endpoint to check database connection
 @app.get("/api/debug/db-check")
 async def check_database():
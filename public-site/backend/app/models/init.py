@@ -1,4 +1,4 @@
 from .base import Base
-from .project import Project, ProjectImage
+from .project import Project, ProjectImage, ProjectDocument, ProjectDocumentText, ProjectSimilar, Keyword, ProjectKeyword, CatalogueVersion, ProjectEventDaily
 
-__all__ = ['Base', 'Project', 'ProjectImage']
+__all__ = ['Base', 'Project', 'ProjectImage', 'ProjectDocument', 'ProjectDocumentText', 'ProjectSimilar', 'Keyword', 'ProjectKeyword', 'CatalogueVersion', 'ProjectEventDaily']
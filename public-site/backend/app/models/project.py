@@ -1,9 +1,16 @@
-from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, func, LargeBinary, JSON, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, Boolean, Integer, BigInteger, Float, Date, DateTime, func, LargeBinary, JSON, ForeignKey, Index, or_
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from .base import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+        # Serves the newest-first listings and their keyset cursors
+        Index("ix_projects_created_at_id", "created_at", "id"),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -38,10 +45,14 @@ class Project(Base):
     meta_description = Column(Text)
     meta_keywords = Column(Text)
     
+    # Full-text search document: title (A), keywords (B), abstract (C), author (D).
+    # Maintained by the projects_search_vector trigger, never written from Python
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+    
     # Database File Storage Fields
+    # The bytes live in project_documents so this row stays small
     document_filename = Column(String, nullable=True)
     document_size = Column(Integer, nullable=True)
-    document_data = Column(LargeBinary, nullable=True)
     document_content_type = Column(String, nullable=True)
     document_storage = Column(String, default="database")
     
@@ -57,7 +68,24 @@ class Project(Base):
     created_by_id = Column(Integer, nullable=True)
     
     # Relationship to images
-    image_records = relationship("ProjectImage", back_populates="project", order_by="ProjectImage.order_index")
+    image_records = relationship(
+        "ProjectImage",
+        primaryjoin="and_(Project.id == ProjectImage.project_id, ProjectImage.parent_id.is_(None))",
+        back_populates="project",
+        order_by="ProjectImage.order_index"
+    )
+    
+    # Document blob stored in its own table
+    document = relationship("ProjectDocument", back_populates="project", uselist=False)
+    
+    @hybrid_property
+    def has_document(self):
+        """Whether a document is attached, derived from metadata (never loads the blob)"""
+        return self.document_filename is not None or self.document_size is not None
+    
+    @has_document.expression
+    def has_document(cls):
+        return or_(cls.document_filename.isnot(None), cls.document_size.isnot(None))
 
 
 class ProjectImage(Base):
@@ -74,8 +102,20 @@ class ProjectImage(Base):
     content_type = Column(String, default="image/png")
     image_size = Column(Integer, nullable=True)
     
-    # Image data stored in database
-    image_data = Column(LargeBinary, nullable=False)
+    # Image data stored in database (deferred - only loaded when serving the image)
+    # NULL when the image lives in the local blob store
+    image_data = deferred(Column(LargeBinary, nullable=True))
+    sha256 = Column(String(64), nullable=True, index=True)
+    storage = Column(String, default="database")
+    
+    # Derivatives are resized copies of an original, stored as sibling rows;
+    # parent_id is NULL on originals
+    parent_id = Column(Integer, ForeignKey("project_images.id", ondelete="CASCADE"), nullable=True, index=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    # Set on originals once derivatives have been attempted, including ones
+    # where no WebP beat the original, so the backfill does not revisit them
+    derivatives_generated = Column(Boolean, default=False, nullable=False)
     
     # Order and featured status
     order_index = Column(Integer, default=0)
@@ -86,3 +126,117 @@ class ProjectImage(Base):
     
     # Relationship back to project
     project = relationship("Project", back_populates="image_records")
+
+
+class ProjectDocument(Base):
+    __tablename__ = "project_documents"
+    
+    # One document per project, keyed by the project id
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Document bytes (deferred - only loaded when serving the document)
+    # NULL when projects.document_storage is "local"; the file is then named by sha256
+    data = deferred(Column(LargeBinary, nullable=True))
+    size = Column(Integer, nullable=False)
+    content_type = Column(String, nullable=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    # sha256 of the version whose text was last extracted (possibly to
+    # nothing, e.g. .doc/.rtf), so reindexing skips it without reading the file
+    text_indexed_sha256 = Column(String(64), nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationship back to project
+    project = relationship("Project", back_populates="document")
+
+
+class ProjectDocumentText(Base):
+    __tablename__ = "project_document_text"
+    __table_args__ = (
+        Index("ix_project_document_text_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    
+    # One row per page of a project's document (pseudo-pages for DOCX/TXT);
+    # removed together with the document
+    project_id = Column(Integer, ForeignKey("project_documents.project_id", ondelete="CASCADE"), primary_key=True)
+    page_number = Column(Integer, primary_key=True)
+    
+    # Version of the document the text was extracted from
+    document_sha256 = Column(String(64), nullable=False)
+    
+    # zlib-compressed UTF-8 page text and its search vector
+    text_compressed = deferred(Column(LargeBinary, nullable=False))
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ProjectSimilar(Base):
+    __tablename__ = "project_similar"
+    
+    # Precomputed nearest neighbours of a published project by TF-IDF cosine
+    # similarity of title, abstract and keywords; rank 1 is the closest
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    similar_project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Keyword(Base):
+    __tablename__ = "keywords"
+    
+    # One row per distinct research keyword; name is the normalised
+    # (lowercased, single-spaced) form, label the first spelling seen
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
+    label = Column(String(100), nullable=False)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ProjectKeyword(Base):
+    __tablename__ = "project_keywords"
+    __table_args__ = (
+        # Projects by keyword; the primary key serves keywords by project
+        Index("ix_project_keywords_keyword_id", "keyword_id", "project_id"),
+    )
+    
+    # Projects.keywords split into rows, kept in sync by the admin portal
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    keyword_id = Column(Integer, ForeignKey("keywords.id", ondelete="CASCADE"), primary_key=True)
+
+
+class CatalogueVersion(Base):
+    __tablename__ = "catalogue_version"
+    
+    # A single row (id 1) whose version the admin portal bumps in the same
+    # transaction as any change to what public listings show; the public
+    # site keys its result caches on it
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ProjectEventDaily(Base):
+    __tablename__ = "project_events_daily"
+    __table_args__ = (
+        # Site-wide and per-research-area rollups scan by day; the primary
+        # key serves one project's series
+        Index("ix_project_events_daily_date", "date", "project_id"),
+    )
+    
+    # Views and downloads per project per UTC day, upserted by the counter
+    # flush in the same transaction as the lifetime totals on projects
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+    downloads = Column(Integer, nullable=False, default=0)
+    
+    # Estimated distinct viewers, from the zlib-compressed HyperLogLog sketch
+    # of hashed visitor fingerprints merged in by every worker's flush
+    visitors = Column(Integer, nullable=False, default=0)
+    visitors_hll = Column(LargeBinary, nullable=True)
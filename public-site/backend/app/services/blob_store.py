@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from ..core.config import settings
+
+class LocalBlobStore:
+    """
+    Read side of the admin portal's content-addressed blob store
+    
+    Blobs are named by their sha256 and fanned out as ab/cd/<sha256>.
+    """
+    name = "local"
+    
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+    
+    def path_for(self, sha256: str) -> Path:
+        """Get the path of a blob from its sha256"""
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+    
+    def exists(self, sha256: str) -> bool:
+        return self.path_for(sha256).is_file()
+
+# Initialize store
+local_blob_store = LocalBlobStore(settings.BLOB_STORE_PATH)
@@ -0,0 +1,110 @@
+from typing import Iterator, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.cache import blob_cache, document_cache_key
+from ..models.project import Project, ProjectDocument
+from .blob_store import local_blob_store
+
+# Documents are streamed to clients in chunks of this size
+CHUNK_SIZE = 256 * 1024
+
+def get_document(db: Session, project_id: int) -> Optional[ProjectDocument]:
+    """Load a project's document metadata without its bytes"""
+    return db.query(ProjectDocument).filter(ProjectDocument.project_id == project_id).first()
+
+def is_available(db: Session, project: Project, document: ProjectDocument) -> bool:
+    """
+    Check that the bytes behind a document row can be served
+    
+    Runs before Content-Length is sent, so a missing blob is a 404 rather
+    than a body cut short.
+    """
+    if project.document_storage == "local":
+        return local_blob_store.exists(document.sha256)
+    return db.query(ProjectDocument.project_id).filter(
+        ProjectDocument.project_id == project.id,
+        ProjectDocument.sha256 == document.sha256,
+        ProjectDocument.data.isnot(None)
+    ).first() is not None
+
+def cached_bytes(db: Session, project: Project, document: ProjectDocument) -> Optional[bytes]:
+    """
+    A whole database-held document from the blob cache, loaded on a miss
+    
+    Returns None for locally stored documents and ones too large to cache,
+    which are streamed instead.
+    """
+    if project.document_storage == "local" or document.size > blob_cache.max_entry_bytes:
+        return None
+    
+    cache_key = document_cache_key(document)
+    data = blob_cache.get(cache_key)
+    if data is None:
+        data = db.query(ProjectDocument.data).filter(
+            ProjectDocument.project_id == project.id,
+            ProjectDocument.sha256 == document.sha256
+        ).scalar()
+        if data is None:
+            return None
+        blob_cache.set(cache_key, data)
+    return data
+
+def iter_range(project: Project, document: ProjectDocument, start: int, length: int) -> Iterator[bytes]:
+    """
+    Stream a byte range of a stored document in CHUNK_SIZE pieces
+    
+    Memory per download stays at one chunk whatever the document size.
+    Database blobs are paged out with substring() (project_documents.data
+    uses EXTERNAL storage, so each read only touches the TOAST chunks it
+    covers); local blobs are read from a seek.
+    """
+    # Copy what the generator needs now: the request session may be closed
+    # or committed (expiring these objects) before the body is sent
+    if project.document_storage == "local":
+        return _iter_file_range(str(local_blob_store.path_for(document.sha256)), start, length)
+    return _iter_database_range(project.id, document.sha256, start, length)
+
+def _iter_file_range(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def _iter_database_range(project_id: int, sha256: str, start: int, length: int) -> Iterator[bytes]:
+    # A sync generator: Starlette iterates it in the threadpool, so the
+    # blocking reads never stall the event loop. It outlives the request,
+    # so it needs its own session, and commits after every read so a slow
+    # client does not hold a pooled connection idle in transaction.
+    from ..database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        offset = start
+        remaining = length
+        while remaining > 0:
+            size = min(CHUNK_SIZE, remaining)
+            # Matching on sha256 aborts the stream instead of splicing two
+            # versions together if the document is replaced mid-download
+            chunk = db.query(
+                func.substring(ProjectDocument.data, offset + 1, size)
+            ).filter(
+                ProjectDocument.project_id == project_id,
+                ProjectDocument.sha256 == sha256
+            ).scalar()
+            db.commit()
+            if not chunk:
+                # Raising aborts the connection; ending cleanly would pass a
+                # short body off as complete under the sent Content-Length
+                raise IOError(f"Document of project {project_id} changed or vanished mid-download")
+            offset += len(chunk)
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        db.close()
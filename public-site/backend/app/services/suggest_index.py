@@ -0,0 +1,247 @@
+import bisect
+import heapq
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.cache import catalogue_version
+from ..core.config import settings
+from ..models.project import Project
+
+logger = logging.getLogger(__name__)
+
+# Longest query that is matched; longer input is cut to this
+MAX_QUERY_LENGTH = 100
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace, the form keys and queries are compared in"""
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+class SuggestIndex:
+    """
+    In-memory prefix index of published project titles, names and keywords
+    
+    Every phrase is keyed from each of its words, so "learn" completes
+    "Machine Learning in Agriculture". Keys live in a sorted list searched
+    with bisect, and a completion's weight is the view count of the
+    projects carrying it. Top-k answers are memoised per prefix until the
+    next change.
+    
+    The index follows the database by diffing (id, updated_at, view_count)
+    of published projects every refresh_seconds: only new, changed and
+    unpublished projects are re-read, so publishing in the admin portal
+    shows up here within one refresh. Refreshes run on a background
+    thread while requests keep reading the current index.
+    """
+    
+    def __init__(self, refresh_seconds: int, max_cached_prefixes: int = 10000):
+        self.refresh_seconds = refresh_seconds
+        self.max_cached_prefixes = max_cached_prefixes
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # (kind, text) -> {project_id: weight}
+        self._completions: Dict[Tuple[str, str], Dict[int, int]] = {}
+        # project_id -> (updated_at, view_count, slug, completions)
+        self._projects: Dict[int, Tuple[Any, int, str, List[Tuple[str, str]]]] = {}
+        # Sorted (key, kind, text); one per word position of each completion
+        self._keys: List[Tuple[str, str, str]] = []
+        self._top: Dict[Tuple[str, int], List[Dict]] = {}
+        self._synced_at = 0.0
+        self.syncs = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def suggest(self, db: Session, q: str, limit: int) -> List[Dict]:
+        """Top completions for a prefix, heaviest first"""
+        if not self.syncs and not self._synced_at:
+            # Nothing to serve yet; the startup build has not run
+            self.sync(db)
+        elif time.monotonic() - self._synced_at > self.refresh_seconds:
+            self._sync_in_background()
+        
+        prefix = normalize(q[:MAX_QUERY_LENGTH])
+        if not prefix:
+            return []
+        
+        with self._lock:
+            cached = self._top.get((prefix, limit))
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+            
+            start = bisect.bisect_left(self._keys, (prefix,))
+            candidates: Set[Tuple[str, str]] = set()
+            for key, kind, text in self._keys[start:]:
+                if not key.startswith(prefix):
+                    break
+                candidates.add((kind, text))
+            
+            best = heapq.nlargest(limit, candidates, key=lambda completion: (self._weight(completion), completion[1]))
+            result = [self._describe(completion) for completion in best]
+            if len(self._top) >= self.max_cached_prefixes:
+                self._top.clear()
+            self._top[(prefix, limit)] = result
+            return result
+    
+    def sync(self, db: Session) -> None:
+        """Apply published/unpublished/edited projects and view counts since the last sync"""
+        # One sync at a time; requests arriving meanwhile use the current index
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._apply_changes(db)
+        finally:
+            self._sync_lock.release()
+    
+    def _sync_in_background(self) -> None:
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            threading.Thread(target=self._background_sync, name="suggest-sync", daemon=True).start()
+        except Exception:
+            self._sync_lock.release()
+            raise
+    
+    def _background_sync(self) -> None:
+        from ..database import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            self._apply_changes(db)
+        finally:
+            db.close()
+            self._sync_lock.release()
+    
+    def _apply_changes(self, db: Session) -> None:
+        try:
+            rows = db.query(Project.id, Project.updated_at, Project.view_count).filter(
+                Project.is_published == True
+            ).all()
+            current = {project_id: (updated_at, view_count or 0) for project_id, updated_at, view_count in rows}
+            
+            with self._lock:
+                known = {project_id: entry[:2] for project_id, entry in self._projects.items()}
+            removed = [project_id for project_id in known if project_id not in current]
+            reweighed = [
+                project_id for project_id, (updated_at, view_count) in current.items()
+                if project_id in known and known[project_id][0] == updated_at and known[project_id][1] != view_count
+            ]
+            changed = [
+                project_id for project_id, (updated_at, _) in current.items()
+                if project_id not in known or known[project_id][0] != updated_at
+            ]
+            
+            projects = []
+            if changed:
+                projects = db.query(
+                    Project.id, Project.slug, Project.title, Project.author_name, Project.supervisor, Project.keywords
+                ).filter(Project.id.in_(changed)).all()
+            
+            with self._lock:
+                for project_id in removed + changed:
+                    self._remove(project_id)
+                for project in projects:
+                    updated_at, view_count = current[project.id]
+                    self._add(project, updated_at, view_count)
+                if projects:
+                    # Appended keys are one unsorted run; Timsort merges it in linear time
+                    self._keys.sort()
+                for project_id in reweighed:
+                    self._reweigh(project_id, current[project_id][1])
+                if removed or changed or reweighed:
+                    self._top.clear()
+                self._synced_at = time.monotonic()
+                self.syncs += 1
+            
+            if removed or changed:
+                logger.info(f"🔎 Suggest index synced: +{len(changed)} -{len(removed)} projects")
+        except Exception as e:
+            # Keep serving the current index; the next refresh retries
+            logger.error(f"❌ Suggest index sync failed: {e}")
+            self._synced_at = time.monotonic()
+    
+    def expire(self) -> None:
+        """Refresh on the next request instead of waiting out refresh_seconds"""
+        self._synced_at = 0.0
+    
+    def _add(self, project: Any, updated_at: Any, view_count: int) -> None:
+        phrases = [("title", project.title), ("author", project.author_name), ("supervisor", project.supervisor)]
+        phrases += [("keyword", keyword) for keyword in (project.keywords or "").split(",")]
+        
+        completions = []
+        for kind, text in phrases:
+            text = " ".join((text or "").split())
+            if not text:
+                continue
+            completion = (kind, text)
+            if completion in completions:
+                continue
+            completions.append(completion)
+            holders = self._completions.setdefault(completion, {})
+            if not holders:
+                words = normalize(text).split()
+                for i in range(len(words)):
+                    self._keys.append((" ".join(words[i:]), kind, text))
+            holders[project.id] = view_count
+        self._projects[project.id] = (updated_at, view_count, project.slug, completions)
+    
+    def _remove(self, project_id: int) -> None:
+        entry = self._projects.pop(project_id, None)
+        if entry is None:
+            return
+        for completion in entry[3]:
+            holders = self._completions.get(completion)
+            if holders is None:
+                continue
+            holders.pop(project_id, None)
+            if not holders:
+                del self._completions[completion]
+                kind, text = completion
+                words = normalize(text).split()
+                for i in range(len(words)):
+                    key = (" ".join(words[i:]), kind, text)
+                    index = bisect.bisect_left(self._keys, key)
+                    if index < len(self._keys) and self._keys[index] == key:
+                        del self._keys[index]
+    
+    def _reweigh(self, project_id: int, view_count: int) -> None:
+        updated_at, _, slug, completions = self._projects[project_id]
+        self._projects[project_id] = (updated_at, view_count, slug, completions)
+        for completion in completions:
+            self._completions[completion][project_id] = view_count
+    
+    def _weight(self, completion: Tuple[str, str]) -> int:
+        # One per project, so unviewed projects still rank by how common they are
+        return sum(view_count + 1 for view_count in self._completions[completion].values())
+    
+    def _describe(self, completion: Tuple[str, str]) -> Dict:
+        kind, text = completion
+        holders = self._completions[completion]
+        suggestion = {"text": text, "kind": kind, "projects": len(holders)}
+        # A title leads straight to its project
+        if kind == "title" and len(holders) == 1:
+            suggestion["slug"] = self._projects[next(iter(holders))][2]
+        return suggestion
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "projects": len(self._projects),
+                "completions": len(self._completions),
+                "keys": len(self._keys),
+                "cached_prefixes": len(self._top),
+                "refresh_seconds": self.refresh_seconds,
+                "syncs": self.syncs,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+suggest_index = SuggestIndex(refresh_seconds=settings.SUGGEST_REFRESH_SECONDS)
+catalogue_version.on_change(suggest_index.expire)
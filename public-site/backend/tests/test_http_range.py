@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.http_range import if_range_matches, parse_range
+
+SIZE = 1000
+ETAG = '"abc123"'
+LAST_MODIFIED = datetime(2026, 10, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=500-", (500, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=999-999", (999, 999)),
+    (" Bytes = 10-19 ", (10, 19)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    "items=0-10",
+    "bytes=",
+    "bytes=-",
+    "bytes=abc",
+    "bytes=100-50",
+    "bytes=0-10,20-30",
+    "bytes=0-10, 2000-3000",
+])
+def test_ignored_ranges_send_the_whole_resource(header):
+    assert parse_range(header, SIZE) is None
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", SIZE),
+    ("bytes=5000-6000", SIZE),
+    ("bytes=-0", SIZE),
+    ("bytes=-10", 0),
+])
+def test_unsatisfiable_ranges_raise_416(header, size):
+    with pytest.raises(HTTPException) as error:
+        parse_range(header, size)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == f"bytes */{size}"
+
+def test_if_range_without_header_matches():
+    assert if_range_matches(None, ETAG, LAST_MODIFIED)
+
+def test_if_range_etag():
+    assert if_range_matches(ETAG, ETAG, LAST_MODIFIED)
+    assert not if_range_matches('"other"', ETAG, LAST_MODIFIED)
+    # Weak tags never match under strong comparison
+    assert not if_range_matches('W/"abc123"', ETAG, LAST_MODIFIED)
+
+def test_if_range_date():
+    assert if_range_matches("Thu, 01 Oct 2026 12:00:00 GMT", ETAG, LAST_MODIFIED)
+    assert not if_range_matches("Thu, 01 Oct 2026 12:00:01 GMT", ETAG, LAST_MODIFIED)
+    assert not if_range_matches("Thu, 01 Oct 2026 12:00:00 GMT", ETAG, None)
+    assert not if_range_matches("not a date", ETAG, LAST_MODIFIED)
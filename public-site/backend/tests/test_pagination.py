@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import paginate
+from app.models.base import Base
+from app.models.project import Project
+
+def test_created_cursor_walks_pages_on_sqlite():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    
+    # Server-default timestamps (no microseconds) mixed with explicit ones
+    for i in range(3):
+        db.add(Project(title=f"Default {i}", slug=f"default-{i}", author_name="A"))
+    for i in range(3):
+        db.add(Project(
+            title=f"Explicit {i}", slug=f"explicit-{i}", author_name="A",
+            created_at=datetime(2024, 1, 1, 12, 0, 0, 500000 + i)
+        ))
+    db.commit()
+    
+    expected = [p.id for p in db.query(Project).order_by(Project.created_at.desc(), Project.id.desc())]
+    query = db.query(Project)
+    first, cursor = paginate(query, "created", Project.created_at, 2)
+    second, cursor = paginate(query, "created", Project.created_at, 2, cursor=cursor)
+    third, cursor = paginate(query, "created", Project.created_at, 2, cursor=cursor)
+    
+    assert [p.id for p in first + second + third] == expected
+    assert cursor is None
@@ -42,6 +42,7 @@ import {
   Image as ImageIcon
 } from '@mui/icons-material';
 import { apiService } from '../services/api';
+import { RelatedProject } from '../types';
 import DocumentViewer from '../components/DocumentViewer';
 import SEOHead from '../components/SEOHead';
 import StructuredData from '../components/StructuredData';
@@ -80,11 +81,15 @@ interface Project {
   image_records?: ProjectImage[];
 }
 
-// Add helper function for image URLs
-const getImageUrl = (projectId: number, imageId: number): string => {
-  return `${process.env.REACT_APP_API_URL}/projects/${projectId}/images/${imageId}`;
+// Add helper function for image URLs (width picks a resized derivative)
+const getImageUrl = (projectId: number, imageId: number, width?: number): string => {
+  const url = `${process.env.REACT_APP_API_URL}/projects/${projectId}/images/${imageId}`;
+  return width ? `${url}?w=${width}` : url;
 };
 
+// Gallery tiles are small; request a derivative instead of the full image
+const THUMBNAIL_WIDTH = 640;
+
 // Updated Image Gallery Component
 const ImageGallery: React.FC<{ 
   imageRecords: ProjectImage[];
@@ -170,7 +175,7 @@ const ImageGallery: React.FC<{
                 </Box>
               ) : (
                 <img
-                  src={getImageUrl(projectId, image.id)}
+                  src={getImageUrl(projectId, image.id, THUMBNAIL_WIDTH)}
                   alt={image.filename}
                   loading="lazy"
                   style={{ 
@@ -305,10 +310,12 @@ const ProjectDetailPage: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [downloading, setDownloading] = useState(false);
+  const [relatedProjects, setRelatedProjects] = useState<RelatedProject[]>([]);
 
   useEffect(() => {
     if (slug) {
       loadProject(slug);
+      apiService.getRelatedProjects(slug).then(setRelatedProjects);
     }
   }, [slug]);
 
@@ -794,6 +801,47 @@ const ProjectDetailPage: React.FC = () => {
               </Paper>
             )}
 
+            {/* Related Research */}
+            {relatedProjects.length > 0 && (
+              <Paper sx={{ 
+                p: { xs: 2, sm: 4 }, 
+                mb: { xs: 2, sm: 4 }, 
+                borderRadius: 4,
+                border: '2px solid #c8e6c9',
+                boxShadow: '0 4px 16px rgba(27, 94, 32, 0.1)',
+                background: 'linear-gradient(135deg, #ffffff 0%, #f1f8e9 100%)'
+              }}>
+                <Box sx={{ display: 'flex', alignItems: 'center', gap: 2, mb: { xs: 2, sm: 3 } }}>
+                  <Avatar sx={{ bgcolor: '#388e3c', width: { xs: 32, sm: 40 }, height: { xs: 32, sm: 40 } }}>
+                    <ResearchIcon sx={{ fontSize: { xs: 20, sm: 24 } }} />
+                  </Avatar>
+                  <Typography variant={isMobile ? "h6" : "h5"} sx={{ color: '#1b5e20', fontWeight: 'bold' }}>
+                    Related Research
+                  </Typography>
+                </Box>
+                {relatedProjects.map((related) => (
+                  <Box 
+                    key={related.id}
+                    onClick={() => navigate(`/projects/${related.slug}`)}
+                    sx={{ 
+                      py: 1.5, 
+                      cursor: 'pointer',
+                      borderBottom: '1px solid #e8f5e9',
+                      '&:last-child': { borderBottom: 'none' },
+                      '&:hover .related-title': { textDecoration: 'underline' }
+                    }}
+                  >
+                    <Typography className="related-title" sx={{ color: '#1b5e20', fontWeight: 600, fontSize: { xs: '0.9rem', sm: '1rem' } }}>
+                      {related.title}
+                    </Typography>
+                    <Typography variant="body2" sx={{ color: '#2e7d32' }}>
+                      {[related.author_name, related.institution, related.academic_year].filter(Boolean).join(' · ')}
+                    </Typography>
+                  </Box>
+                ))}
+              </Paper>
+            )}
+
             {/* Additional Research Information */}
             <Paper sx={{ 
               p: { xs: 2, sm: 4 }, 
@@ -7,6 +7,10 @@ import {
   ProjectImage,
   SearchFilters,
   SearchResponse,
+  FacetCounts,
+  Suggestion,
+  RelatedProject,
+  KeywordCount,
   getProjectImageUrl,
   getFeaturedImageUrl
 } from '../types';
@@ -39,6 +43,9 @@ class ApiService {
     search?: string;
     research_area?: string;
     degree_type?: string;
+    institution?: string;
+    academic_year?: string;
+    keyword?: string;
   }): Promise<Project[]> {
     try {
       const queryParams = new URLSearchParams();
@@ -47,6 +54,9 @@ class ApiService {
       if (params?.search) queryParams.append('search', params.search);
       if (params?.research_area) queryParams.append('research_area', params.research_area);
       if (params?.degree_type) queryParams.append('degree_type', params.degree_type);
+      if (params?.institution) queryParams.append('institution', params.institution);
+      if (params?.academic_year) queryParams.append('academic_year', params.academic_year);
+      if (params?.keyword) queryParams.append('keyword', params.keyword);
 
       const response = await this.api.get(`/api/projects?${queryParams}`);
       return response.data;
@@ -115,6 +125,55 @@ class ApiService {
     }
   }
 
+  async getFacets(filters: SearchFilters = {}): Promise<FacetCounts> {
+    try {
+      const queryParams = new URLSearchParams();
+      if (filters.query) queryParams.append('search', filters.query);
+      if (filters.research_area) queryParams.append('research_area', filters.research_area);
+      if (filters.degree_type) queryParams.append('degree_type', filters.degree_type);
+      if (filters.institution) queryParams.append('institution', filters.institution);
+      if (filters.academic_year) queryParams.append('academic_year', filters.academic_year);
+
+      const response = await this.api.get(`/api/projects/facets?${queryParams}`);
+      return response.data;
+    } catch (error) {
+      console.error('Failed to fetch facets:', error);
+      throw new Error('Failed to fetch facets');
+    }
+  }
+
+  async getKeywordCloud(limit: number = 50, researchArea?: string): Promise<KeywordCount[]> {
+    try {
+      const response = await this.api.get('/api/projects/keywords/cloud', {
+        params: { limit, research_area: researchArea }
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Failed to fetch keyword cloud:', error);
+      throw new Error('Failed to fetch keyword cloud');
+    }
+  }
+
+  async getSuggestions(q: string, limit: number = 8): Promise<Suggestion[]> {
+    try {
+      const response = await this.api.get('/api/projects/suggest', { params: { q, limit } });
+      return response.data;
+    } catch (error) {
+      console.error('Failed to fetch suggestions:', error);
+      return [];
+    }
+  }
+
+  async getRelatedProjects(slug: string, limit: number = 5): Promise<RelatedProject[]> {
+    try {
+      const response = await this.api.get(`/api/projects/${slug}/related`, { params: { limit } });
+      return response.data;
+    } catch (error) {
+      console.error('Failed to fetch related projects:', error);
+      return [];
+    }
+  }
+
   async downloadProject(slug: string): Promise<void> {
     try {
       const response = await this.api.get(`/api/projects/${slug}/download`, {
@@ -89,6 +89,42 @@ export interface SearchResponse {
   filters: SearchFilters;
 }
 
+export interface FacetCount {
+  value: string;
+  count: number;
+}
+
+export interface FacetCounts {
+  research_area: FacetCount[];
+  degree_type: FacetCount[];
+  institution: FacetCount[];
+  academic_year: FacetCount[];
+}
+
+export interface Suggestion {
+  text: string;
+  kind: 'title' | 'author' | 'supervisor' | 'keyword';
+  projects: number;
+  slug?: string;
+}
+
+export interface RelatedProject {
+  id: number;
+  title: string;
+  slug: string;
+  author_name: string;
+  research_area?: string;
+  institution?: string;
+  academic_year?: string;
+  score: number;
+}
+
+export interface KeywordCount {
+  keyword: string;
+  name: string;
+  count: number;
+}
+
 export interface SiteStats {
   total_projects: number;
   total_institutions: number;
@@ -131,19 +167,22 @@ export const IMAGE_CONSTANTS = {
 } as const;
 
 // Helper function to get image URL
-export function getProjectImageUrl(projectId: number, imageId: number): string {
+export function getProjectImageUrl(projectId: number, imageId: number, width?: number): string {
   const baseUrl = process.env.REACT_APP_API_URL || '';
   
   // Remove trailing slash if present
   const cleanBaseUrl = baseUrl.replace(/\/$/, '');
   
+  // Optional width selects a resized derivative
+  const query = width ? `?w=${width}` : '';
+  
   // Check if baseUrl already contains /api
   if (cleanBaseUrl.includes('/api')) {
-    return `${cleanBaseUrl}/projects/${projectId}/images/${imageId}`;
+    return `${cleanBaseUrl}/projects/${projectId}/images/${imageId}${query}`;
   }
   
   // Otherwise add /api
-  return `${cleanBaseUrl}/api/projects/${projectId}/images/${imageId}`;
+  return `${cleanBaseUrl}/api/projects/${projectId}/images/${imageId}${query}`;
 }
 
 // Helper function to get featured image URL
@@ -152,10 +191,10 @@ export function getFeaturedImageUrl(project: Project | ProjectSummary): string |
     // Find featured image from image_records
     const featuredImage = project.image_records.find(img => img.is_featured);
     if (featuredImage) {
-      return getProjectImageUrl(project.id, featuredImage.id);
+      return getProjectImageUrl(project.id, featuredImage.id, 640);
     }
     // If no featured image, return first image
-    return getProjectImageUrl(project.id, project.image_records[0].id);
+    return getProjectImageUrl(project.id, project.image_records[0].id, 640);
   }
   
   // Fallback to legacy images array